@@ -461,6 +461,15 @@ def calculate_momentum_score(ticker: str, price_df: pd.DataFrame, lookback_short
         return {"momentum_score": 0, "momentum": 0, "rsi": 50, "trend": "neutral", "error": str(e)}
 
 
+def _download_prices(tickers: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+    """해외 종목 가격 DataFrame (predict의 증분 가격 저장소 공유, 사용 불가 시 yf.download)"""
+    try:
+        from data_fetcher import get_price_frame
+    except ImportError:
+        return yf.download(tickers, start=start_date, end=end_date, progress=False, threads=True)
+    return get_price_frame(list(tickers), start_date, end_date)
+
+
 def get_benchmark_return(ticker: str, start_date: str, end_date: str) -> Optional[float]:
     """벤치마크 수익률 계산 (한국/해외 자동 분기)"""
     try:
@@ -474,7 +483,7 @@ def get_benchmark_return(ticker: str, start_date: str, end_date: str) -> Optiona
             last_close = prices[-1]["close"]
             return ((last_close - first_close) / first_close) * 100.0
 
-        df = yf.download(ticker, start=start_date, end=end_date, progress=False)
+        df = _download_prices([ticker], start_date, end_date)
         if df.empty:
             return None
 
@@ -588,13 +597,7 @@ def generate_momentum_signals(
     try:
         df = pd.DataFrame()
         if us_tickers:
-            df = yf.download(
-                us_tickers,
-                start=start_date.strftime("%Y-%m-%d"),
-                end=analysis_date,
-                progress=False,
-                threads=True,
-            )
+            df = _download_prices(us_tickers, start_date.strftime("%Y-%m-%d"), analysis_date)
 
         # 한국 티커용 가격 데이터 병합
         if kr_tickers:
@@ -890,15 +893,9 @@ class BacktestEngine:
 
         df = pd.DataFrame()
 
-        # 해외 티커: yfinance
+        # 해외 티커: yfinance (증분 가격 저장소 경유)
         if us_tickers:
-            df = yf.download(
-                us_tickers,
-                start=start_str,
-                end=self.end_date,
-                progress=False,
-                threads=True,
-            )
+            df = _download_prices(us_tickers, start_str, self.end_date)
 
         # 한국 티커: PyKRX
         if kr_tickers:
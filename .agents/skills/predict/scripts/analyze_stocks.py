@@ -30,6 +30,9 @@ Stock Analyzer - End-to-End 종목 분석 및 순위 산정 (Yahoo Finance + DAR
     # 캐시 삭제
     python analyze_stocks.py --clear-cache
 
+    # 기존 JSON 파일 캐시를 SQLite 캐시로 가져오기
+    python analyze_stocks.py --migrate-cache
+
     # Wikipedia/PyKRX에서 최신 티커 목록 갱신
     python analyze_stocks.py --index sp500 --update-tickers
 """
@@ -39,10 +42,14 @@ import argparse
 from datetime import datetime
 
 import config
-from cache import clear_cache, get_cache_stats, cache_stats
+from cache import (
+    clear_cache, get_cache_stats, migrate_json_cache, wait_for_refreshes,
+    cache_stats, tier_stats, freshness_stats, memory_cache,
+)
 from data_fetcher import get_index_tickers, sort_tickers_by_market_cap
 from analysis import run_batch_analysis
 from reporting import print_results
+from singleflight import flight_stats
 from ticker_utils import is_korean_index, is_korean_ticker
 
 
@@ -92,6 +99,8 @@ def main():
     parser.add_argument("--no-cache", action="store_true", help="캐시 사용 안 함 (항상 API 호출)")
     parser.add_argument("--clear-cache", action="store_true", help="캐시 삭제 후 종료")
     parser.add_argument("--cache-stats", action="store_true", help="캐시 통계 출력 후 종료")
+    parser.add_argument("--migrate-cache", action="store_true", help="기존 JSON 파일 캐시를 SQLite 캐시로 가져온 후 종료")
+    parser.add_argument("--remove-json-cache", action="store_true", help="--migrate-cache 후 JSON 캐시 파일 삭제")
     parser.add_argument("--update-tickers", action="store_true", help="Wikipedia/PyKRX에서 최신 티커 목록 갱신")
 
     args = parser.parse_args()
@@ -101,12 +110,21 @@ def main():
         clear_cache()
         sys.exit(0)
 
+    if args.migrate_cache:
+        result = migrate_json_cache(remove_files=args.remove_json_cache)
+        print(f"\n📦 캐시 마이그레이션 완료")
+        print(f"   - JSON 파일: {result['scanned']}개")
+        print(f"   - 가져온 항목: {result['imported']}개 (건너뜀 {result['skipped']}개)")
+        sys.exit(0)
+
     if args.cache_stats:
         stats = get_cache_stats()
-        print(f"\n📦 캐시 통계")
-        print(f"   - 캐시 파일 수: {stats['total_files']}개")
+        print(f"\n📦 캐시 통계 ({stats['backend']})")
+        print(f"   - 캐시 항목 수: {stats['total_entries']}개")
         print(f"   - 캐시 크기: {stats['total_size_mb']} MB")
         print(f"   - 캐시된 날짜: {', '.join(stats['dates'][:5]) if stats['dates'] else '없음'}")
+        for cache_type, count in sorted(stats['by_type'].items()):
+            print(f"   - {cache_type}: {count}개")
         sys.exit(0)
 
     # 캐시 비활성화
@@ -163,6 +181,15 @@ def main():
         if total_requests > 0:
             hit_rate = cache_stats["hits"] / total_requests * 100
             print(f"\n💾 캐시 통계: {cache_stats['hits']}/{total_requests} 히트 ({hit_rate:.0f}%), API 호출 {cache_stats['misses']}회 절감")
+        lookups = tier_stats["memory_hits"] + tier_stats["disk_hits"] + tier_stats["disk_misses"]
+        if lookups > 0:
+            print(f"   - 메모리: {tier_stats['memory_hits']}/{lookups} 히트 ({tier_stats['memory_hits'] / lookups * 100:.0f}%), "
+                  f"{len(memory_cache)}개 항목 {memory_cache.bytes / 1024 / 1024:.1f} MB, 축출 {tier_stats['memory_evictions']}회")
+            print(f"   - 디스크: {tier_stats['disk_hits']}/{tier_stats['disk_hits'] + tier_stats['disk_misses']} 히트")
+        if flight_stats["shared"]:
+            print(f"   - 동시 요청 병합: {flight_stats['shared']}회 (진행 중인 조회 결과 공유)")
+        if freshness_stats["stale"]:
+            print(f"   - 오래된 항목 {freshness_stats['stale']}개 즉시 사용 (백그라운드 갱신)")
 
     # 파일 저장
     strategy_methods = {
@@ -184,6 +211,11 @@ def main():
             json.dump(output_data, f, indent=2, ensure_ascii=False)
         print(f"\n결과 저장됨: {args.output}")
 
+    # 결과를 모두 낸 뒤 백그라운드 캐시 갱신 마무리 (다음 실행에서 사용)
+    if freshness_stats["stale"]:
+        wait_for_refreshes()
+        print(f"🔄 캐시 갱신 {freshness_stats['refreshed']}개 완료, 실패 {freshness_stats['refresh_failed']}개")
+
 
 if __name__ == "__main__":
     main()
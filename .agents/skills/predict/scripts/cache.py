@@ -1,88 +1,688 @@
 """
-파일 기반 캐시 시스템
+캐시 시스템 (플러그형 백엔드)
 
-날짜별 디렉토리 구조로 캐시를 관리합니다.
-캐시 키는 MD5 해시로 생성되며, JSON 형식으로 저장됩니다.
+기본 백엔드는 단일 SQLite 파일(.cache/cache.db)이며, 기존의 날짜별 JSON 파일
+구조(.cache/<date>/<md5>.json)도 "json" 백엔드로 계속 사용할 수 있습니다.
+캐시 키는 기존과 동일한 MD5 해시(16자리)를 사용하므로, 기존 JSON 캐시를
+migrate_json_cache()로 가져오면 그대로 히트합니다.
+
+디스크 백엔드 앞에는 항목 수/바이트로 제한되는 메모리 LRU 계층이 있어,
+한 번의 실행 안에서 같은 키를 다시 읽을 때 파일 열기/JSON 파싱을 건너뜁니다.
+
+cached_fetch()는 cache_type별 신선도 정책(config.CACHE_POLICIES)을 적용합니다.
+오래된(stale) 항목은 즉시 반환하고 백그라운드에서 갱신합니다.
+
+백엔드 선택: 환경변수 PREDICT_CACHE_BACKEND = "sqlite"(기본) | "json"
 """
 import os
+import abc
 import json
+import time
+import sqlite3
 import hashlib
 import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-from config import CACHE_DIR, CACHE_ENABLED
+import config
 
 # 캐시 히트/미스 카운터
 cache_stats = {"hits": 0, "misses": 0}
 
+# 계층별 조회 통계 (memory_hits + disk_hits + disk_misses = 전체 조회)
+tier_stats = {"memory_hits": 0, "disk_hits": 0, "disk_misses": 0, "memory_evictions": 0}
+
+# 신선도 판정 통계 (cached_fetch) 및 백그라운드 갱신 결과
+freshness_stats = {"fresh": 0, "stale": 0, "expired": 0, "refreshed": 0, "refresh_failed": 0}
+
+# (값, 저장 시각 epoch 초)
+Entry = Tuple[object, float]
+
+
+class EntryInfo(NamedTuple):
+    """디스크 캐시 항목 메타데이터 (정리/통계용)"""
+    key_hash: str
+    cache_type: Optional[str]
+    date: str
+    size: int
+    updated_at: float
+    last_used: float
+
+# SQLite IN 절에 한 번에 넣는 키 수 (SQLITE_MAX_VARIABLE_NUMBER 이하)
+_BATCH_SIZE = 500
+
+
+class CacheKey(NamedTuple):
+    """캐시 항목 식별자 (hash는 기존 JSON 캐시 파일명과 동일)"""
+    cache_type: str
+    ticker: str
+    date: str
+    extra: str = ""
+
+    @property
+    def hash(self) -> str:
+        key = f"{self.cache_type}_{self.ticker}_{self.date}_{self.extra}"
+        return hashlib.md5(key.encode()).hexdigest()[:16]
+
+
+# ============================================================================
+# 메모리 계층
+# ============================================================================
+
+class MemoryLRU:
+    """항목 수와 근사 바이트로 제한되는 스레드 안전 LRU
+
+    저장된 값은 호출자 간에 공유되므로 읽기 전용으로 다뤄야 합니다.
+    """
 
-def _ensure_cache_dir():
-    """캐시 디렉토리 생성"""
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._lock = threading.Lock()
+        # 해시 -> (값, 크기, 저장 시각)
+        self._items: "OrderedDict[str, Tuple[object, int, float]]" = OrderedDict()
 
+    def get(self, key: CacheKey):
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
 
-def _get_cache_path(cache_type: str, ticker: str, date: str, extra: str = "") -> str:
-    """캐시 파일 경로 생성"""
-    key = f"{cache_type}_{ticker}_{date}_{extra}"
-    filename = hashlib.md5(key.encode()).hexdigest()[:16] + ".json"
-    return os.path.join(CACHE_DIR, date, filename)
+    def get_entry(self, key: CacheKey) -> Optional[Entry]:
+        with self._lock:
+            item = self._items.get(key.hash)
+            if item is None:
+                return None
+            self._items.move_to_end(key.hash)
+            return item[0], item[2]
 
+    def put(self, key: CacheKey, data, size: Optional[int] = None, updated_at: Optional[float] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        if size is None:
+            size = _approx_size(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key.hash, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._items[key.hash] = (data, size, updated_at if updated_at is not None else time.time())
+            self.bytes += size
+            while len(self._items) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._items.popitem(last=False)
+                self.bytes -= evicted_size
+                tier_stats["memory_evictions"] += 1
 
-def _read_cache(cache_path: str):
-    """캐시 파일 읽기"""
-    if not CACHE_ENABLED:
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _approx_size(data) -> int:
+    try:
+        return len(json.dumps(data, ensure_ascii=False))
+    except (TypeError, ValueError):
+        return 0
+
+
+memory_cache = MemoryLRU(config.MEMORY_CACHE_MAX_ENTRIES, int(config.MEMORY_CACHE_MAX_MB * 1024 * 1024))
+
+
+# ============================================================================
+# 백엔드
+# ============================================================================
+
+class CacheBackend(abc.ABC):
+    """캐시 백엔드 인터페이스"""
+    name = "base"
+
+    def get(self, key: CacheKey):
+        return self.get_many([key]).get(key)
+
+    def put(self, key: CacheKey, data) -> None:
+        self.put_many([(key, data)])
+
+    def get_many(self, keys: Iterable[CacheKey]) -> Dict[CacheKey, object]:
+        """여러 키 일괄 조회 (없는 키는 결과에서 제외)"""
+        return {key: data for key, (data, _) in self.get_entries(keys).items()}
+
+    @abc.abstractmethod
+    def get_entries(self, keys: Iterable[CacheKey]) -> Dict[CacheKey, Entry]:
+        """get_many와 같되 값과 함께 저장 시각 반환"""
+
+    def find_recent(self, key: CacheKey, since: str) -> Optional[Entry]:
+        """같은 cache_type/ticker/extra 중 날짜가 [since, key.date)인 가장 최근 항목 (미지원 시 None)"""
         return None
+
+    @abc.abstractmethod
+    def iter_entries(self) -> Iterable[EntryInfo]:
+        """전체 항목 메타데이터 (값은 읽지 않음)"""
+
+    @abc.abstractmethod
+    def delete_entries(self, entries: Iterable[EntryInfo]) -> int:
+        """항목 삭제, 삭제한 항목 수 반환"""
+
+    def compact(self) -> None:
+        """삭제 후 디스크 공간 회수"""
+        pass
+
+    @abc.abstractmethod
+    def put_many(self, items: Iterable[Tuple[CacheKey, object]]) -> int:
+        """여러 항목 일괄 저장 (같은 키는 덮어씀), 저장한 항목 수 반환"""
+
+    @abc.abstractmethod
+    def stats(self) -> dict:
+        """항목 수/크기 등 백엔드 통계"""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """단일 SQLite 파일 캐시 (cache_type/ticker/date 인덱스, 원자적 upsert)"""
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        key TEXT PRIMARY KEY,
+        cache_type TEXT,
+        ticker TEXT,
+        date TEXT NOT NULL,
+        extra TEXT,
+        payload TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        accessed_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS ix_cache_entries_type ON cache_entries (cache_type);
+    CREATE INDEX IF NOT EXISTS ix_cache_entries_ticker ON cache_entries (ticker);
+    CREATE INDEX IF NOT EXISTS ix_cache_entries_date ON cache_entries (date);
+    """
+
+    UPSERT = """
+    INSERT INTO cache_entries (key, cache_type, ticker, date, extra, payload, size, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET
+        cache_type = COALESCE(excluded.cache_type, cache_entries.cache_type),
+        ticker = COALESCE(excluded.ticker, cache_entries.ticker),
+        extra = COALESCE(excluded.extra, cache_entries.extra),
+        date = excluded.date,
+        payload = excluded.payload,
+        size = excluded.size,
+        updated_at = excluded.updated_at
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # 분석 워커 스레드가 공유하는 단일 연결 (쓰기는 어차피 직렬화됨)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+            if "accessed_at" not in columns:
+                # 이전 스키마: 마지막 사용 시각 컬럼 추가 (없으면 updated_at으로 간주)
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN accessed_at REAL")
+            self._conn = conn
+        return self._conn
+
+    def get_entries(self, keys):
+        keys = list(keys)
+        by_hash = {key.hash: key for key in keys}
+        found = {}
+        hashes = list(by_hash)
+        now = time.time()
+        touch_before = now - config.CACHE_TOUCH_INTERVAL_MINUTES * 60
+        touched = []
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(hashes), _BATCH_SIZE):
+                chunk = hashes[i:i + _BATCH_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, payload, updated_at, accessed_at FROM cache_entries WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key_hash, payload, updated_at, accessed_at in rows:
+                    found[by_hash[key_hash]] = (json.loads(payload), updated_at)
+                    if accessed_at is None or accessed_at < touch_before:
+                        touched.append((now, key_hash))
+            if touched:
+                # LRU 정리용 마지막 사용 시각 기록 (간격이 지난 항목만 모아 한 번에 쓰기)
+                with conn:
+                    conn.executemany("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", touched)
+        return found
+
+    def find_recent(self, key, since):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload, updated_at FROM cache_entries "
+                "WHERE cache_type = ? AND ticker = ? AND extra = ? AND date >= ? AND date < ? "
+                "ORDER BY date DESC, updated_at DESC LIMIT 1",
+                (key.cache_type, key.ticker, key.extra, since, key.date),
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def iter_entries(self):
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, cache_type, date, size, updated_at, COALESCE(accessed_at, updated_at) FROM cache_entries"
+            ).fetchall()
+        return [EntryInfo(*row) for row in rows]
+
+    def delete_entries(self, entries):
+        rows = [(entry.key_hash,) for entry in entries]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("DELETE FROM cache_entries WHERE key = ?", rows)
+        return len(rows)
+
+    def compact(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+
+    def put_many(self, items):
+        now = time.time()
+        rows = []
+        for key, data in items:
+            payload = json.dumps(data, ensure_ascii=False)
+            rows.append((key.hash, key.cache_type, key.ticker, key.date, key.extra, payload, len(payload.encode()), now))
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            # 한 트랜잭션으로 커밋 (중간 실패 시 전체 롤백)
+            with conn:
+                conn.executemany(self.UPSERT, rows)
+        return len(rows)
+
+    def import_rows(self, rows: List[Tuple[str, str, str]]) -> int:
+        """기존 JSON 캐시 가져오기: (해시, 날짜, payload) 목록, 이미 있는 키는 유지"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO cache_entries (key, cache_type, ticker, date, extra, payload, size, updated_at) "
+                    "VALUES (?, NULL, NULL, ?, NULL, ?, ?, ?)",
+                    [(key_hash, date, payload, len(payload.encode()), now) for key_hash, date, payload in rows],
+                )
+                return conn.total_changes - before
+
+    def stats(self):
+        with self._lock:
+            conn = self._connection()
+            total_entries, total_size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+            dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM cache_entries ORDER BY date DESC")]
+            by_type = dict(conn.execute(
+                "SELECT COALESCE(cache_type, '(migrated)'), COUNT(*) FROM cache_entries GROUP BY 1"
+            ).fetchall())
+        return {
+            "backend": self.name,
+            "total_entries": total_entries,
+            "total_size_mb": round(total_size / 1024 / 1024, 2),
+            "dates": dates,
+            "by_type": by_type,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class JsonFileCacheBackend(CacheBackend):
+    """기존 방식: 항목마다 .cache/<date>/<hash>.json 파일 하나"""
+    name = "json"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: CacheKey) -> str:
+        return os.path.join(self.root, key.date, key.hash + ".json")
+
+    def get_entries(self, keys):
+        found = {}
+        now = time.time()
+        touch_before = now - config.CACHE_TOUCH_INTERVAL_MINUTES * 60
+        for key in keys:
+            path = self._path(key)
+            try:
+                if os.path.exists(path):
+                    st = os.stat(path)
+                    with open(path, 'r', encoding='utf-8') as f:
+                        # 파일 수정 시각 = 저장 시각
+                        found[key] = (json.load(f), st.st_mtime)
+                    # 접근 시각 = 마지막 사용 시각 (noatime 마운트에서도 남도록 직접 기록, 간격이 지났을 때만)
+                    if st.st_atime < touch_before:
+                        os.utime(path, (now, st.st_mtime))
+            except Exception:
+                pass
+        return found
+
+    def iter_entries(self):
+        entries = []
+        for date_dir, date_path, files in _iter_date_dirs(self.root):
+            for filename in files:
+                try:
+                    st = os.stat(os.path.join(date_path, filename))
+                except OSError:
+                    continue
+                # 파일명만으로는 cache_type을 알 수 없음
+                entries.append(EntryInfo(
+                    filename[:-len(".json")], None, date_dir, st.st_size, st.st_mtime, max(st.st_atime, st.st_mtime)
+                ))
+        return entries
+
+    def delete_entries(self, entries):
+        deleted = 0
+        for entry in entries:
+            try:
+                os.remove(os.path.join(self.root, entry.date, entry.key_hash + ".json"))
+                deleted += 1
+            except OSError:
+                pass
+        return deleted
+
+    def put_many(self, items):
+        written = 0
+        for key, data in items:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 임시 파일에 쓴 뒤 교체 (동시 실행 시 깨진 JSON 방지)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            written += 1
+        return written
+
+    def stats(self):
+        total_files = 0
+        total_size = 0
+        dates = []
+        for date_dir, _, files in _iter_date_dirs(self.root):
+            dates.append(date_dir)
+            total_files += len(files)
+            total_size += sum(os.path.getsize(os.path.join(self.root, date_dir, f)) for f in files)
+        return {
+            "backend": self.name,
+            "total_entries": total_files,
+            "total_size_mb": round(total_size / 1024 / 1024, 2),
+            "dates": sorted(dates, reverse=True),
+            "by_type": {},
+        }
+
+
+def _iter_date_dirs(root: str):
+    """(날짜 디렉토리, 경로, JSON 파일 목록) 순회 (tickers_*.json 등 루트 파일은 제외)"""
+    if not os.path.exists(root):
+        return
+    for date_dir in os.listdir(root):
+        date_path = os.path.join(root, date_dir)
+        if os.path.isdir(date_path):
+            yield date_dir, date_path, [f for f in os.listdir(date_path) if f.endswith(".json")]
+
+
+def _create_backend() -> CacheBackend:
+    if config.CACHE_BACKEND == "json":
+        return JsonFileCacheBackend(config.CACHE_DIR)
+    return SQLiteCacheBackend(os.path.join(config.CACHE_DIR, config.CACHE_DB_FILENAME))
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> CacheBackend:
+    """현재 캐시 백엔드 (첫 사용 시 생성)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend()
+        return _backend
+
+
+# ============================================================================
+# 모듈 API (data_fetcher, financial_datasets_api에서 사용)
+# ============================================================================
+
+def _cache_key(cache_type: str, ticker: str, date: str, extra: str = "") -> CacheKey:
+    """캐시 키 생성"""
+    return CacheKey(cache_type, ticker, date, extra or "")
+
+
+def _read_cache(key: CacheKey):
+    """캐시 읽기: 메모리 → 디스크 순 (없거나 실패 시 None)"""
+    # config 모듈을 통해 읽어야 --no-cache가 런타임에 반영됨
+    if not config.CACHE_ENABLED:
+        return None
+    return _read_cache_many([key]).get(key)
+
+
+def _write_cache(key: CacheKey, data):
+    """캐시 쓰기: 메모리와 디스크 모두 (디스크 실패는 무시)"""
+    _write_cache_many([(key, data)])
+
+
+def _read_cache_many(keys: List[CacheKey]) -> Dict[CacheKey, object]:
+    """여러 키 일괄 읽기 (히트한 키만 반환), 메모리에 없는 키만 디스크에서 한 번에 조회"""
+    return {key: data for key, (data, _) in _read_cache_entries(keys).items()}
+
+
+def _read_cache_entries(keys: List[CacheKey]) -> Dict[CacheKey, Entry]:
+    """_read_cache_many와 같되 값과 함께 저장 시각 반환"""
+    if not config.CACHE_ENABLED:
+        return {}
+    found = {}
+    missing = []
+    for key in keys:
+        entry = memory_cache.get_entry(key)
+        if entry is not None:
+            found[key] = entry
+        else:
+            missing.append(key)
+    tier_stats["memory_hits"] += len(found)
+    if not missing:
+        return found
+
     try:
-        if os.path.exists(cache_path):
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        from_disk = get_backend().get_entries(missing)
     except Exception:
-        pass
-    return None
+        from_disk = {}
+    for key, (data, updated_at) in from_disk.items():
+        memory_cache.put(key, data, updated_at=updated_at)
+    tier_stats["disk_hits"] += len(from_disk)
+    tier_stats["disk_misses"] += len(missing) - len(from_disk)
+    found.update(from_disk)
+    return found
 
 
-def _write_cache(cache_path: str, data):
-    """캐시 파일 쓰기"""
-    if not CACHE_ENABLED:
+def _write_cache_many(items: List[Tuple[CacheKey, object]]):
+    """여러 항목 일괄 쓰기 (디스크는 한 트랜잭션)"""
+    if not config.CACHE_ENABLED:
         return
+    for key, data in items:
+        memory_cache.put(key, data)
     try:
-        cache_dir = os.path.dirname(cache_path)
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False)
+        get_backend().put_many(items)
     except Exception:
         pass
 
 
+# ============================================================================
+# 신선도 정책 (stale-while-revalidate)
+# ============================================================================
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def cached_fetch(key: CacheKey, fetch: Callable[[], object]):
+    """
+    신선도 정책에 따른 캐시 조회
+
+    - fresh: 캐시 값 반환
+    - stale: 캐시 값을 즉시 반환하고 백그라운드에서 fetch()로 갱신
+    - 만료/없음: fetch()를 호출하고 결과가 비어 있지 않으면 저장한 뒤 반환
+
+    정확한 키가 없으면 정책의 reuse_days 이내 이전 날짜 항목을 찾아 같은 기준으로 판정합니다.
+    과거 날짜 키에 정확히 저장된 항목은 그 날짜의 스냅샷으로 보고 만료시키지 않습니다.
+    정책이 없는 cache_type은 기존처럼 정확한 키만 기간 제한 없이 사용합니다.
+    """
+    data, state = _lookup(key)
+    if state in ("fresh", "stale"):
+        cache_stats["hits"] += 1
+        if state == "stale":
+            _schedule_refresh(key, fetch)
+        return data
+
+    cache_stats["misses"] += 1
+    result = fetch()
+    if result:
+        _write_cache(key, result)
+    return result
+
+
+def _lookup(key: CacheKey) -> Tuple[object, Optional[str]]:
+    """(값, "fresh" | "stale" | "expired") 또는 (None, None)"""
+    if not config.CACHE_ENABLED:
+        return None, None
+    policy = config.CACHE_POLICIES.get(key.cache_type)
+
+    entry = _read_cache_entries([key]).get(key)
+    if entry is not None and (policy is None or key.date < date.today().isoformat()):
+        freshness_stats["fresh"] += 1
+        return entry[0], "fresh"
+
+    if entry is None and policy and policy["reuse_days"] > 0:
+        since = (datetime.strptime(key.date, "%Y-%m-%d") - timedelta(days=policy["reuse_days"])).strftime("%Y-%m-%d")
+        try:
+            entry = get_backend().find_recent(key, since)
+        except Exception:
+            entry = None
+    if entry is None:
+        return None, None
+
+    data, updated_at = entry
+    age = time.time() - updated_at
+    if age <= policy["fresh"]:
+        state = "fresh"
+    elif age <= policy["fresh"] + policy["stale"]:
+        state = "stale"
+    else:
+        state = "expired"
+    freshness_stats[state] += 1
+    return data, state
+
+
+def _schedule_refresh(key: CacheKey, fetch: Callable[[], object]) -> None:
+    """백그라운드 갱신 예약 (같은 키가 이미 갱신 중이면 무시)"""
+    global _refresh_executor
+    with _refresh_lock:
+        if key.hash in _refreshing:
+            return
+        _refreshing.add(key.hash)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=config.CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+            )
+        _refresh_executor.submit(_refresh, key, fetch)
+
+
+def _refresh(key: CacheKey, fetch: Callable[[], object]) -> None:
+    try:
+        result = fetch()
+        if result:
+            _write_cache(key, result)
+            freshness_stats["refreshed"] += 1
+        else:
+            freshness_stats["refresh_failed"] += 1
+    except Exception:
+        freshness_stats["refresh_failed"] += 1
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(key.hash)
+
+
+def wait_for_refreshes() -> None:
+    """진행 중인 백그라운드 갱신이 끝날 때까지 대기"""
+    global _refresh_executor
+    with _refresh_lock:
+        executor, _refresh_executor = _refresh_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def migrate_json_cache(remove_files: bool = False) -> dict:
+    """기존 .cache/<date>/<hash>.json 파일을 SQLite 캐시로 가져오기
+
+    해시가 그대로 키가 되므로 가져온 항목은 기존과 같은 조회에서 히트합니다.
+    이미 SQLite에 있는 키는 덮어쓰지 않습니다.
+    """
+    backend = get_backend()
+    if not isinstance(backend, SQLiteCacheBackend):
+        raise RuntimeError("SQLite 백엔드에서만 마이그레이션할 수 있습니다 (PREDICT_CACHE_BACKEND=sqlite).")
+
+    scanned = imported = skipped = 0
+    for date_dir, date_path, files in _iter_date_dirs(config.CACHE_DIR):
+        rows = []
+        for filename in files:
+            scanned += 1
+            try:
+                with open(os.path.join(date_path, filename), 'r', encoding='utf-8') as f:
+                    payload = json.dumps(json.load(f), ensure_ascii=False)
+            except Exception:
+                skipped += 1
+                continue
+            rows.append((filename[:-len(".json")], date_dir, payload))
+        imported += backend.import_rows(rows)
+        if remove_files:
+            shutil.rmtree(date_path, ignore_errors=True)
+
+    return {"scanned": scanned, "imported": imported, "skipped": skipped}
+
+
 def clear_cache():
     """캐시 디렉토리 삭제"""
-    if os.path.exists(CACHE_DIR):
-        shutil.rmtree(CACHE_DIR)
-        print(f"캐시 삭제 완료: {CACHE_DIR}")
+    global _backend
+    wait_for_refreshes()
+    memory_cache.clear()
+    # 가격 저장소 파일도 CACHE_DIR 안에 있으므로 연결을 먼저 닫음
+    from price_store import close_store
+    close_store()
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+    if os.path.exists(config.CACHE_DIR):
+        shutil.rmtree(config.CACHE_DIR)
+        print(f"캐시 삭제 완료: {config.CACHE_DIR}")
     else:
         print("삭제할 캐시가 없습니다.")
 
 
 def get_cache_stats():
     """캐시 통계 반환"""
-    if not os.path.exists(CACHE_DIR):
-        return {"total_files": 0, "total_size_mb": 0, "dates": []}
-
-    total_files = 0
-    total_size = 0
-    dates = []
-
-    for date_dir in os.listdir(CACHE_DIR):
-        date_path = os.path.join(CACHE_DIR, date_dir)
-        if os.path.isdir(date_path):
-            dates.append(date_dir)
-            for f in os.listdir(date_path):
-                total_files += 1
-                total_size += os.path.getsize(os.path.join(date_path, f))
-
-    return {
-        "total_files": total_files,
-        "total_size_mb": round(total_size / 1024 / 1024, 2),
-        "dates": sorted(dates, reverse=True)
-    }
+    return get_backend().stats()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+predict 캐시 관리 CLI
+
+캐시 저장소 전체(조회 캐시, 증분 가격 저장소, ranking_algorithm 신호 캐시, 인덱스 티커 목록)를
+한 곳에서 조회하고 정리합니다.
+
+사용법:
+    python cache_cli.py stats                  # 출처/타입/날짜별 사용량
+    python cache_cli.py gc --max-mb 1024       # 오래 안 쓴 항목부터 용량 예산까지 삭제
+    python cache_cli.py prune --type news_yf_v2=14   # 타입별 보존 기간이 지난 항목 삭제
+    (gc/prune 공통: --dry-run으로 삭제 대상만 확인, --hot-hours로 보호 구간 조정)
+
+최근 config.CACHE_GC_HOT_HOURS시간 안에 사용한 항목은 gc/prune 모두 건드리지 않습니다.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import config
+import price_store
+from cache import get_backend
+from ranking_algorithm import CACHE_DIR as SIGNAL_CACHE_DIR
+
+_DAY = 24 * 60 * 60
+
+
+class Item(NamedTuple):
+    """정리 단위 하나 (캐시 항목, 종목 가격 파일, 신호 파일, 티커 목록 파일)"""
+    source: str            # "cache" | "prices" | "signals" | "tickers"
+    kind: str              # cache_type 또는 출처 이름 (prune 보존 기간 조회 키)
+    date: Optional[str]    # 캐시 키 날짜 (cache만)
+    size: int
+    updated_at: float
+    last_used: float
+    ref: object            # 삭제에 필요한 원본 (EntryInfo, 티커, 파일 경로)
+
+
+# ============================================================================
+# 수집
+# ============================================================================
+
+def collect_items() -> List[Item]:
+    """모든 출처의 항목 목록"""
+    items = []
+
+    for entry in get_backend().iter_entries():
+        kind = entry.cache_type or "(migrated)"
+        items.append(Item("cache", kind, entry.date, entry.size, entry.updated_at, entry.last_used, entry))
+
+    for ticker, size, last_used in price_store.get_store().usage():
+        items.append(Item("prices", "prices", None, size, last_used, last_used, ticker))
+
+    items.extend(_file_items("signals", str(SIGNAL_CACHE_DIR), lambda name: name.endswith(".json")))
+    items.extend(_file_items("tickers", config.CACHE_DIR, lambda name: name.startswith("tickers_") and name.endswith(".json")))
+    return items
+
+
+def _file_items(source: str, directory: str, match: Callable[[str], bool]) -> List[Item]:
+    if not os.path.isdir(directory):
+        return []
+    items = []
+    for filename in os.listdir(directory):
+        if not match(filename):
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        items.append(Item(source, source, None, st.st_size, st.st_mtime, max(st.st_atime, st.st_mtime), path))
+    return items
+
+
+def delete_items(items: List[Item]) -> int:
+    """항목 삭제 (출처별로 처리), 삭제한 항목 수 반환"""
+    deleted = 0
+    entries = [item.ref for item in items if item.source == "cache"]
+    if entries:
+        backend = get_backend()
+        deleted += backend.delete_entries(entries)
+        backend.compact()
+
+    store = price_store.get_store()
+    for item in items:
+        if item.source == "prices":
+            store.clear(item.ref)
+            deleted += 1
+        elif item.source in ("signals", "tickers"):
+            try:
+                os.remove(item.ref)
+                deleted += 1
+            except OSError:
+                pass
+    return deleted
+
+
+# ============================================================================
+# 정리 정책
+# ============================================================================
+
+def select_lru(items: List[Item], max_bytes: int, hot_since: float) -> List[Item]:
+    """총 크기가 max_bytes 이하가 될 때까지 마지막 사용이 오래된 순으로 선택 (최근 사용 항목 제외)"""
+    excess = sum(item.size for item in items) - max_bytes
+    selected = []
+    for item in sorted(items, key=lambda item: item.last_used):
+        if excess <= 0 or item.last_used >= hot_since:
+            break
+        selected.append(item)
+        excess -= item.size
+    return selected
+
+
+def select_expired(items: List[Item], max_age_days: Dict[str, float], hot_since: float, now: float) -> List[Item]:
+    """타입별 보존 기간(저장 시각 기준)이 지난 항목 선택 (최근 사용 항목 제외, 가격 이력은 대상 아님)"""
+    selected = []
+    for item in items:
+        if item.source == "prices" or item.last_used >= hot_since:
+            continue
+        days = max_age_days.get(item.kind, config.CACHE_PRUNE_DEFAULT_DAYS)
+        if now - item.updated_at > days * _DAY:
+            selected.append(item)
+    return selected
+
+
+# ============================================================================
+# 출력
+# ============================================================================
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def _when(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+
+def print_stats(items: List[Item], top_dates: int) -> None:
+    total = sum(item.size for item in items)
+    budget = int(config.CACHE_MAX_MB * 1024 * 1024)
+    print(f"\n📦 캐시 사용량: {_mb(total)} / 예산 {_mb(budget)} ({len(items)}개 항목)")
+
+    print("\n출처별:")
+    by_source = defaultdict(lambda: [0, 0])
+    for item in items:
+        by_source[item.source][0] += 1
+        by_source[item.source][1] += item.size
+    for source, (count, size) in sorted(by_source.items(), key=lambda kv: -kv[1][1]):
+        print(f"   - {source}: {count}개, {_mb(size)}")
+
+    cache_items = [item for item in items if item.source == "cache"]
+    if cache_items:
+        print("\n타입별 (조회 캐시):")
+        by_type = defaultdict(list)
+        for item in cache_items:
+            by_type[item.kind].append(item)
+        for kind, group in sorted(by_type.items(), key=lambda kv: -sum(i.size for i in kv[1])):
+            oldest = min(i.updated_at for i in group)
+            print(f"   - {kind}: {len(group)}개, {_mb(sum(i.size for i in group))}, "
+                  f"가장 오래된 저장 {_when(oldest)}, 마지막 사용 {_when(max(i.last_used for i in group))}")
+
+        print(f"\n날짜별 (최근 {top_dates}개):")
+        by_date = defaultdict(lambda: [0, 0])
+        for item in cache_items:
+            by_date[item.date][0] += 1
+            by_date[item.date][1] += item.size
+        for day in sorted(by_date, reverse=True)[:top_dates]:
+            count, size = by_date[day]
+            print(f"   - {day}: {count}개, {_mb(size)}")
+        if len(by_date) > top_dates:
+            print(f"   ... 외 {len(by_date) - top_dates}개 날짜")
+
+    files = [
+        os.path.join(config.CACHE_DIR, name)
+        for name in (config.CACHE_DB_FILENAME, config.CACHE_DB_FILENAME + "-wal", config.PRICE_STORE_FILENAME)
+    ]
+    on_disk = sum(os.path.getsize(path) for path in files if os.path.exists(path))
+    print(f"\nSQLite 파일 크기: {_mb(on_disk)} (삭제 후 gc/prune이 VACUUM으로 회수)")
+
+
+def print_selection(action: str, selected: List[Item], dry_run: bool) -> None:
+    size = sum(item.size for item in selected)
+    label = "삭제 예정" if dry_run else "삭제"
+    print(f"\n🧹 {action}: {len(selected)}개 항목 {label} ({_mb(size)})")
+    by_kind = defaultdict(lambda: [0, 0])
+    for item in selected:
+        by_kind[(item.source, item.kind)][0] += 1
+        by_kind[(item.source, item.kind)][1] += item.size
+    for (source, kind), (count, kind_size) in sorted(by_kind.items()):
+        name = source if source == kind else f"{source}/{kind}"
+        print(f"   - {name}: {count}개, {_mb(kind_size)}")
+
+
+# ============================================================================
+# 진입점
+# ============================================================================
+
+def _parse_type_days(values: List[str]) -> Dict[str, float]:
+    days = dict(config.CACHE_PRUNE_DAYS)
+    for value in values or []:
+        kind, sep, amount = value.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"--type은 TYPE=DAYS 형식이어야 합니다: {value}")
+        days[kind] = float(amount)
+    return days
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="predict 캐시 사용량 조회 및 정리",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stats_parser = subparsers.add_parser("stats", help="출처/타입/날짜별 사용량 출력")
+    stats_parser.add_argument("--dates", type=int, default=10, help="표시할 최근 날짜 수")
+
+    gc_parser = subparsers.add_parser("gc", help="오래 사용하지 않은 항목부터 용량 예산까지 삭제")
+    gc_parser.add_argument("--max-mb", type=float, default=config.CACHE_MAX_MB, help="용량 예산 (MB)")
+
+    prune_parser = subparsers.add_parser("prune", help="타입별 보존 기간이 지난 항목 삭제")
+    prune_parser.add_argument(
+        "--type", action="append", metavar="TYPE=DAYS",
+        help="타입별 보존 기간 재지정 (반복 가능, 예: news_yf_v2=14, signals=3)",
+    )
+
+    for sub in (gc_parser, prune_parser):
+        sub.add_argument("--hot-hours", type=float, default=config.CACHE_GC_HOT_HOURS,
+                         help="최근 N시간 안에 사용한 항목은 삭제하지 않음")
+        sub.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 출력")
+
+    args = parser.parse_args()
+    items = collect_items()
+
+    if args.command == "stats":
+        print_stats(items, args.dates)
+        return
+
+    now = time.time()
+    hot_since = now - args.hot_hours * 60 * 60
+    if args.command == "gc":
+        selected = select_lru(items, int(args.max_mb * 1024 * 1024), hot_since)
+        action = f"LRU 정리 (예산 {args.max_mb:g} MB)"
+    else:
+        try:
+            max_age_days = _parse_type_days(args.type)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+        selected = select_expired(items, max_age_days, hot_since, now)
+        action = "보존 기간 정리"
+
+    print_selection(action, selected, args.dry_run)
+    if args.dry_run or not selected:
+        return
+
+    deleted = delete_items(selected)
+    remaining = sum(item.size for item in items) - sum(item.size for item in selected)
+    print(f"   ✅ {deleted}개 삭제 완료, 남은 사용량 {_mb(remaining)}")
+    if args.command == "gc" and remaining > args.max_mb * 1024 * 1024:
+        print(f"   ⚠️  최근 {args.hot_hours:g}시간 안에 사용한 항목만 남아 예산을 초과합니다.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,52 @@ import os
 
 CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
 CACHE_ENABLED = True  # 글로벌 캐시 활성화 플래그
+CACHE_BACKEND = os.getenv("PREDICT_CACHE_BACKEND", "sqlite")  # "sqlite"(단일 파일, 기본) | "json"(항목별 파일)
+CACHE_DB_FILENAME = "cache.db"  # CACHE_DIR 안의 SQLite 캐시 파일명
+MEMORY_CACHE_MAX_ENTRIES = 4096  # 디스크 캐시 앞단 메모리 LRU 최대 항목 수 (0이면 비활성화)
+MEMORY_CACHE_MAX_MB = 256  # 메모리 LRU 최대 크기 (JSON 직렬화 크기 기준 근사치)
+PRICE_STORE_FILENAME = "prices.db"  # CACHE_DIR 안의 증분 가격 저장소 파일명 (조회 완료 구간)
+PRICE_STORE_BARS_DIRNAME = "prices"  # CACHE_DIR 안의 종목별 컬럼형 일봉(.npy) 디렉토리
+PRICE_STORE_SETTLE_DAYS = 2  # 최근 N일은 확정되지 않은 것으로 보고 매번 다시 조회 (시차/장중 대응)
+PRICE_STORE_CHECK_DAYS = 7  # 증분 조회 시 이미 저장된 직전 N일도 함께 받아 종가 비교 (분할/배당 재보정 감지)
+PRICE_STORE_REBASE_TOLERANCE = 0.0005  # 저장된 종가와 이 비율 이상 다르면 기준이 바뀐 것으로 보고 전체 재조회
+CACHE_REFRESH_WORKERS = 2  # 오래된(stale) 캐시 항목을 백그라운드에서 갱신하는 스레드 수
+CACHE_MAX_MB = float(os.getenv("PREDICT_CACHE_MAX_MB", "2048"))  # cache_cli.py gc 기본 용량 예산 (캐시+가격+신호)
+CACHE_GC_HOT_HOURS = 24  # 최근 N시간 안에 사용한 항목은 gc/prune 대상에서 제외
+CACHE_TOUCH_INTERVAL_MINUTES = 60  # 마지막 사용 시각은 이 간격보다 오래됐을 때만 기록 (읽을 때마다 쓰기 방지)
+
+# cache_type별 신선도 정책 (cache.cached_fetch)
+#   fresh: 저장 후 이 시간(초) 동안은 그대로 사용
+#   stale: fresh 이후 이 시간 동안은 캐시 값을 즉시 반환하고 백그라운드에서 갱신 (이후는 동기 재조회)
+#   reuse_days: 해당 날짜 항목이 없으면 최근 N일 이내 날짜의 항목을 같은 기준으로 재사용
+# 가격은 price_store가 구간 단위로 관리하므로 여기에 없습니다 (PRICE_STORE_SETTLE_DAYS 참고).
+_HOUR = 60 * 60
+_DAY = 24 * _HOUR
+CACHE_POLICIES = {
+    # 재무 지표: 분기 단위로 바뀌지만 시가총액/밸류에이션 배수는 주가를 따라감
+    "metrics_yf": {"fresh": 1 * _DAY, "stale": 6 * _DAY, "reuse_days": 7},
+    "metrics_kr": {"fresh": 1 * _DAY, "stale": 6 * _DAY, "reuse_days": 7},
+    "fd_snapshot": {"fresh": 1 * _DAY, "stale": 6 * _DAY, "reuse_days": 7},
+    # 컨센서스 추정치: 주 단위로 거의 변하지 않음
+    "fd_analyst": {"fresh": 7 * _DAY, "stale": 23 * _DAY, "reuse_days": 30},
+    # 뉴스: 같은 날 재실행에도 새 기사를 반영
+    "news_yf_v2": {"fresh": 1 * _HOUR, "stale": 1 * _DAY, "reuse_days": 1},
+    "insider_yf_v2": {"fresh": 12 * _HOUR, "stale": 2 * _DAY, "reuse_days": 3},
+}
+
+# cache_cli.py prune: 저장 후 N일이 지난 항목 삭제 (최근에 사용한 항목은 제외)
+# signals는 ranking_algorithm의 ~/.cache/predict 신호 캐시, tickers는 인덱스 티커 목록 파일
+CACHE_PRUNE_DAYS = {
+    "news_yf_v2": 30,
+    "insider_yf_v2": 60,
+    "metrics_yf": 90,
+    "metrics_kr": 90,
+    "fd_snapshot": 90,
+    "fd_analyst": 180,
+    "signals": 7,
+    "tickers": 7,
+}
+CACHE_PRUNE_DEFAULT_DAYS = 365  # 위에 없는 타입 (마이그레이션된 항목 포함)
 
 # ============================================================================
 # Yahoo Finance Rate Limiting 설정
@@ -3,18 +3,22 @@ Yahoo Finance / 한국 주식 데이터 조회 모듈
 
 재무 지표, 가격, 뉴스, 내부자 거래, 인덱스 구성종목 데이터를 수집합니다.
 모든 API 호출은 rate_limiter의 안전한 래퍼를 통해 수행되며,
-결과는 cache 모듈을 통해 파일 기반 캐싱됩니다.
+결과는 cache 모듈을 통해 캐싱됩니다. 가격은 price_store의 종목별 증분 저장소에 병합됩니다.
 
 한국 주식(6자리 숫자 종목코드)은 자동으로 DART + PyKRX로 라우팅됩니다.
 """
 import os
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pandas as pd
 
+import config
+import price_store
 from config import CACHE_DIR, CACHE_ENABLED
-from cache import _get_cache_path, _read_cache, _write_cache, cache_stats
+from cache import _cache_key, cache_stats, cached_fetch
+from price_series import ADJUSTED, PriceSeries
+from singleflight import single_flight
 from rate_limiter import (
     safe_get_ticker_info,
     safe_get_ticker_news,
@@ -157,42 +161,26 @@ def _fetch_company_news_yf(ticker: str, limit: int = 50) -> list:
 # 캐시된 데이터 조회 (내부자 거래, 뉴스)
 # ============================================================================
 
+@single_flight("insider")
 def get_insider_trades(ticker: str, end_date: str, limit: int = 100) -> list:
     """캐시된 내부자 거래 데이터 조회"""
     if is_korean_ticker(ticker):
         from korean_data_fetcher import get_insider_trades_kr
         return get_insider_trades_kr(normalize_korean_ticker(ticker), end_date, limit)
 
-    cache_path = _get_cache_path("insider_yf_v2", ticker, end_date, "")
-    cached = _read_cache(cache_path)
-    if cached is not None:
-        cache_stats["hits"] += 1
-        return cached
-
-    cache_stats["misses"] += 1
-    result = _fetch_insider_trades_yf(ticker, limit)
-    if result:
-        _write_cache(cache_path, result)
-    return result
+    cache_key = _cache_key("insider_yf_v2", ticker, end_date, "")
+    return cached_fetch(cache_key, lambda: _fetch_insider_trades_yf(ticker, limit))
 
 
+@single_flight("news")
 def get_company_news(ticker: str, end_date: str, limit: int = 50) -> list:
     """캐시된 뉴스 데이터 조회"""
     if is_korean_ticker(ticker):
         from korean_data_fetcher import get_company_news_kr
         return get_company_news_kr(normalize_korean_ticker(ticker), end_date, limit)
 
-    cache_path = _get_cache_path("news_yf_v2", ticker, end_date, "")
-    cached = _read_cache(cache_path)
-    if cached is not None:
-        cache_stats["hits"] += 1
-        return cached
-
-    cache_stats["misses"] += 1
-    result = _fetch_company_news_yf(ticker, limit)
-    if result:
-        _write_cache(cache_path, result)
-    return result
+    cache_key = _cache_key("news_yf_v2", ticker, end_date, "")
+    return cached_fetch(cache_key, lambda: _fetch_company_news_yf(ticker, limit))
 
 
 # ============================================================================
@@ -467,39 +455,90 @@ def _fetch_financial_metrics_yf(ticker: str) -> dict:
 # 가격 데이터
 # ============================================================================
 
-def _fetch_prices_yf(ticker: str, start_date: str, end_date: str) -> list:
+def _fetch_prices_yf(ticker: str, start_date: str, end_date: str) -> PriceSeries:
     """Yahoo Finance에서 가격 데이터 가져오기 (단일 티커)"""
     try:
         df = safe_get_ticker_history(ticker, start_date, end_date)
 
         if df is None or df.empty:
-            return []
+            return PriceSeries()
 
-        prices = []
-        for date, row in df.iterrows():
-            prices.append({
-                "time": date.strftime("%Y-%m-%d"),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": int(row["Volume"]),
-            })
-        return prices
+        return PriceSeries.from_frame(df, basis=ADJUSTED)
     except Exception:
-        return []
+        return PriceSeries()
+
+
+def _next_day(date_str: str) -> str:
+    return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def _previous_day(date_str: str) -> str:
+    return (datetime.strptime(date_str, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def _download_prices_inclusive(tickers: list, start_date: str, end_date: str) -> dict:
+    """가격 저장소용 원격 배치 조회 ([start, end] 양 끝 포함)"""
+    # yfinance는 end 미포함이므로 하루 뒤까지 요청 (한국 소스는 하루 더 받아도 무해)
+    return _batch_download_prices(tickers, start_date, _next_day(end_date))
 
 
 def batch_fetch_prices(tickers: list, start_date: str, end_date: str) -> dict:
     """
-    여러 종목의 가격 데이터를 한 번에 가져오기 (배치 처리)
+    여러 종목의 가격 데이터를 한 번에 가져오기 (증분 가격 저장소 경유)
+
+    저장소에 없는 날짜 구간만 원격에서 받아오며, 구간이 같은 종목끼리 한 번에 배치 조회합니다.
+    종료일 규칙은 원격 소스와 같습니다 (해외: end 미포함, 한국: end 포함).
+
+    Returns:
+        dict: {ticker: PriceSeries} 형태의 딕셔너리
+    """
+    if not tickers:
+        return {}
+    if not config.CACHE_ENABLED:
+        return _batch_download_prices(tickers, start_date, end_date)
+
+    result = {}
+    kr_tickers = {normalize_korean_ticker(t): t for t in tickers if is_korean_ticker(t)}
+    us_tickers = [t for t in tickers if not is_korean_ticker(t)]
+    if kr_tickers:
+        kr_result = price_store.batch_get_prices(list(kr_tickers), start_date, end_date, _download_prices_inclusive)
+        result.update({kr_tickers[t]: prices for t, prices in kr_result.items()})
+    if us_tickers:
+        result.update(price_store.batch_get_prices(us_tickers, start_date, _previous_day(end_date), _download_prices_inclusive))
+    return result
+
+
+def get_price_frame(tickers: list, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    yf.download(tickers, start, end)와 같은 형태의 가격 DataFrame (증분 가격 저장소 경유)
+
+    종목이 하나면 Open/High/Low/Close/Volume 컬럼, 여러 개면 (컬럼, 종목) 멀티인덱스입니다.
+    backtesting/scripts/backtest.py가 같은 저장소를 공유하기 위해 사용합니다.
+    """
+    prices = batch_fetch_prices(tickers, start_date, end_date)
+    frames = {}
+    for ticker in tickers:
+        if not prices.get(ticker):
+            continue
+        frames[ticker] = PriceSeries.coerce(prices[ticker]).to_frame()
+
+    if not frames:
+        return pd.DataFrame()
+    if len(tickers) == 1:
+        return frames[tickers[0]]
+    return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+
+def _batch_download_prices(tickers: list, start_date: str, end_date: str) -> dict:
+    """
+    여러 종목의 가격 데이터를 원격에서 한 번에 가져오기 (배치 처리)
 
     한국 티커와 해외 티커를 자동으로 분리하여 각각의 데이터소스로 라우팅합니다.
     - 해외: yf.download() (멀티 티커 배치)
     - 한국: PyKRX (순차 호출)
 
     Returns:
-        dict: {ticker: [price_list]} 형태의 딕셔너리
+        dict: {ticker: PriceSeries} 형태의 딕셔너리
     """
     if not tickers:
         return {}
@@ -512,13 +551,12 @@ def batch_fetch_prices(tickers: list, start_date: str, end_date: str) -> dict:
 
     # 한국 티커 처리
     if kr_tickers:
-        from korean_data_fetcher import batch_fetch_prices_kr
-        kr_normalized = [normalize_korean_ticker(t) for t in kr_tickers]
-        kr_result = batch_fetch_prices_kr(kr_normalized, start_date, end_date)
-        # 원래 티커명으로 매핑 (정규화 전 이름 유지)
-        for orig, norm in zip(kr_tickers, kr_normalized):
-            if norm in kr_result:
-                result[orig] = kr_result[norm]
+        from korean_data_fetcher import get_price_series_kr
+        # 원래 티커명으로 매핑 (정규화 전 이름 유지), 가격 기준(basis)을 유지하도록 종목별 컬럼형 조회
+        for orig in kr_tickers:
+            prices = get_price_series_kr(normalize_korean_ticker(orig), start_date, end_date)
+            if prices:
+                result[orig] = prices
 
     # 해외 티커가 없으면 한국 결과만 반환
     if not us_tickers:
@@ -532,6 +570,8 @@ def batch_fetch_prices(tickers: list, start_date: str, end_date: str) -> dict:
             start=start_date,
             end=end_date,
             group_by='ticker',
+            # Ticker.history()와 같은 수정주가 기준 (yfinance 버전마다 기본값이 다름)
+            auto_adjust=True,
         )
 
         if df is None or df.empty:
@@ -541,19 +581,10 @@ def batch_fetch_prices(tickers: list, start_date: str, end_date: str) -> dict:
         # 단일 티커인 경우 컬럼 구조가 다름
         if len(us_tickers) == 1:
             ticker = us_tickers[0]
-            prices = []
-            for date, row in df.iterrows():
-                try:
-                    prices.append({
-                        "time": date.strftime("%Y-%m-%d"),
-                        "open": float(row["Open"]),
-                        "high": float(row["High"]),
-                        "low": float(row["Low"]),
-                        "close": float(row["Close"]),
-                        "volume": int(row["Volume"]),
-                    })
-                except (KeyError, ValueError, TypeError):
-                    continue
+            # 최신 yfinance는 단일 티커도 (ticker, column) 멀티인덱스로 반환
+            if isinstance(df.columns, pd.MultiIndex) and ticker in df.columns.get_level_values(0):
+                df = df[ticker]
+            prices = PriceSeries.from_frame(df, basis=ADJUSTED)
             if prices:
                 result[ticker] = prices
         else:
@@ -567,22 +598,8 @@ def batch_fetch_prices(tickers: list, start_date: str, end_date: str) -> dict:
                     if ticker_df.empty or ticker_df['Close'].isna().all():
                         continue
 
-                    prices = []
-                    for date, row in ticker_df.iterrows():
-                        try:
-                            if pd.isna(row["Close"]):
-                                continue
-                            prices.append({
-                                "time": date.strftime("%Y-%m-%d"),
-                                "open": float(row["Open"]) if not pd.isna(row["Open"]) else 0,
-                                "high": float(row["High"]) if not pd.isna(row["High"]) else 0,
-                                "low": float(row["Low"]) if not pd.isna(row["Low"]) else 0,
-                                "close": float(row["Close"]),
-                                "volume": int(row["Volume"]) if not pd.isna(row["Volume"]) else 0,
-                            })
-                        except (KeyError, ValueError, TypeError):
-                            continue
-
+                    # 종가 결측 행은 제외, 나머지 결측은 0
+                    prices = PriceSeries.from_frame(ticker_df, basis=ADJUSTED)
                     if prices:
                         result[ticker] = prices
                 except Exception:
@@ -600,75 +617,64 @@ def batch_fetch_prices(tickers: list, start_date: str, end_date: str) -> dict:
 # 캐시된 데이터 조회 (재무 지표, 가격)
 # ============================================================================
 
+@single_flight("metrics")
 def get_financial_metrics(ticker, end_date, period="ttm", limit=10):
     """캐시된 financial metrics 조회 (Yahoo Finance / 한국 DART+PyKRX)"""
     if is_korean_ticker(ticker):
         from korean_data_fetcher import get_financial_metrics_kr
         kr_ticker = normalize_korean_ticker(ticker)
-        cache_path = _get_cache_path("metrics_kr", kr_ticker, end_date, "")
-        cached = _read_cache(cache_path)
-        if cached is not None:
-            cache_stats["hits"] += 1
-            return [cached]
-        cache_stats["misses"] += 1
-        result = get_financial_metrics_kr(kr_ticker, end_date)
-        if result:
-            _write_cache(cache_path, result)
-            return [result]
-        return []
+        cache_key = _cache_key("metrics_kr", kr_ticker, end_date, "")
+        result = cached_fetch(cache_key, lambda: get_financial_metrics_kr(kr_ticker, end_date))
+        return [result] if result else []
 
-    cache_path = _get_cache_path("metrics_yf", ticker, end_date, "")
-    cached = _read_cache(cache_path)
-    if cached is not None:
-        cache_stats["hits"] += 1
-        return [cached]
+    cache_key = _cache_key("metrics_yf", ticker, end_date, "")
+    result = cached_fetch(cache_key, lambda: _fetch_metrics_with_fallback(ticker, end_date))
+    return [result] if result else []
 
-    cache_stats["misses"] += 1
+
+def _fetch_metrics_with_fallback(ticker, end_date):
+    """Yahoo Finance 재무 지표, 실패 시 financial-datasets 스냅샷으로 fallback"""
     result = _fetch_financial_metrics_yf(ticker)
     if result:
-        _write_cache(cache_path, result)
-        return [result]
-
-    # YF 실패 시 financial-datasets 스냅샷으로 fallback
+        return result
     try:
         from financial_datasets_api import get_metrics_snapshot_fallback
-        result = get_metrics_snapshot_fallback(ticker, end_date)
-        if result:
-            _write_cache(cache_path, result)
-            return [result]
+        return get_metrics_snapshot_fallback(ticker, end_date)
     except Exception:
-        pass
+        return None
+
+
+def _stored_prices(ticker, start_date, end_date, fetch):
+    """증분 가격 저장소 조회 (원격 조회가 없었으면 캐시 히트로 집계)"""
+    fetched = False
 
-    return []
+    def counting_fetch(t, s, e):
+        nonlocal fetched
+        fetched = True
+        return fetch(t, s, e)
 
+    prices = price_store.get_prices(ticker, start_date, end_date, counting_fetch)
+    cache_stats["misses" if fetched else "hits"] += 1
+    return prices
 
+
+@single_flight("prices")
 def get_prices(ticker, start_date, end_date):
-    """캐시된 가격 데이터 조회 (Yahoo Finance / 한국 PyKRX)"""
+    """가격 데이터 조회 (Yahoo Finance / 한국 PyKRX), 저장소에 없는 날짜만 원격 조회"""
     if is_korean_ticker(ticker):
-        from korean_data_fetcher import get_prices_kr
+        from korean_data_fetcher import get_price_series_kr
         kr_ticker = normalize_korean_ticker(ticker)
-        cache_path = _get_cache_path("prices_kr", kr_ticker, end_date, start_date)
-        cached = _read_cache(cache_path)
-        if cached is not None:
-            cache_stats["hits"] += 1
-            return cached
-        cache_stats["misses"] += 1
-        result = get_prices_kr(kr_ticker, start_date, end_date)
-        if result:
-            _write_cache(cache_path, result)
-        return result
-
-    cache_path = _get_cache_path("prices_yf", ticker, end_date, start_date)
-    cached = _read_cache(cache_path)
-    if cached is not None:
-        cache_stats["hits"] += 1
-        return cached
-
-    cache_stats["misses"] += 1
-    result = _fetch_prices_yf(ticker, start_date, end_date)
-    if result:
-        _write_cache(cache_path, result)
-    return result
+        if not config.CACHE_ENABLED:
+            return get_price_series_kr(kr_ticker, start_date, end_date)
+        return _stored_prices(kr_ticker, start_date, end_date, get_price_series_kr)
+
+    if not config.CACHE_ENABLED:
+        return _fetch_prices_yf(ticker, start_date, end_date)
+    # yfinance는 end 미포함: 저장소 구간은 전날까지, 원격 조회는 하루 뒤까지
+    return _stored_prices(
+        ticker, start_date, _previous_day(end_date),
+        lambda t, s, e: _fetch_prices_yf(t, s, _next_day(e)),
+    )
 
 
 # ============================================================================
@@ -5,6 +5,7 @@
 점수를 계산하는 함수들을 제공합니다. 시가총액 카테고리 분류 및 보너스도 포함됩니다.
 """
 from config import NEGATIVE_KEYWORDS, POSITIVE_KEYWORDS
+from price_series import PriceSeries
 
 
 # ============================================================================
@@ -290,9 +291,10 @@ def calculate_momentum_score(prices):
     factors = []
 
     try:
-        current = prices[-1].get('close', 0)
-        price_20d = prices[-20].get('close', current) if len(prices) >= 20 else current
-        price_60d = prices[-60].get('close', current) if len(prices) >= 60 else current
+        closes = PriceSeries.coerce(prices).closes
+        current = float(closes[-1])
+        price_20d = float(closes[-20]) if len(closes) >= 20 else current
+        price_60d = float(closes[-60]) if len(closes) >= 60 else current
 
         # 1개월 모멘텀
         mom_1m = (current - price_20d) / price_20d if price_20d else 0
@@ -331,35 +333,26 @@ def calculate_enhanced_momentum_score(prices, lookback_short=20, lookback_long=6
         return 5.0, {"short_momentum": 0, "long_momentum": 0, "rsi": 50, "trend": "neutral"}
 
     try:
-        closes = [p.get('close', 0) for p in prices]
-        if not closes or closes[-1] == 0:
+        closes = PriceSeries.coerce(prices).closes
+        if not len(closes) or closes[-1] == 0:
             return 5.0, {"short_momentum": 0, "long_momentum": 0, "rsi": 50, "trend": "neutral"}
 
-        current = closes[-1]
+        current = float(closes[-1])
 
         # 단기 모멘텀 (20일)
-        short_price = closes[-lookback_short] if len(closes) >= lookback_short else closes[0]
+        short_price = float(closes[-lookback_short] if len(closes) >= lookback_short else closes[0])
         short_momentum = (current - short_price) / short_price if short_price > 0 else 0
 
         # 장기 모멘텀 (60일)
-        long_price = closes[-lookback_long] if len(closes) >= lookback_long else closes[0]
+        long_price = float(closes[-lookback_long] if len(closes) >= lookback_long else closes[0])
         long_momentum = (current - long_price) / long_price if long_price > 0 else 0
 
         # RSI 계산 (14일)
         rsi = 50
         if len(closes) >= 15:
-            gains = []
-            losses = []
-            for i in range(-14, 0):
-                change = closes[i] - closes[i-1]
-                if change > 0:
-                    gains.append(change)
-                    losses.append(0)
-                else:
-                    gains.append(0)
-                    losses.append(abs(change))
-            avg_gain = sum(gains) / 14
-            avg_loss = sum(losses) / 14
+            changes = closes[-15:][1:] - closes[-15:][:-1]
+            avg_gain = float(changes[changes > 0].sum()) / 14
+            avg_loss = float(-changes[changes < 0].sum()) / 14
             if avg_loss > 0:
                 rs = avg_gain / avg_loss
                 rsi = 100 - (100 / (1 + rs))
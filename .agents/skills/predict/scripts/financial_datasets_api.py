@@ -13,7 +13,7 @@ import json
 import urllib.request
 import urllib.error
 
-from cache import _get_cache_path, _read_cache, _write_cache, cache_stats
+from cache import _cache_key, cached_fetch
 
 _API_BASE = "https://api.financialdatasets.ai"
 _API_KEY: str | None = None  # 지연 초기화
@@ -67,13 +67,12 @@ def get_analyst_estimates(ticker: str, end_date: str) -> dict | None:
     if not _get_api_key():
         return None
 
-    cache_path = _get_cache_path("fd_analyst", ticker, end_date, "")
-    cached = _read_cache(cache_path)
-    if cached is not None:
-        cache_stats["hits"] += 1
-        return cached
+    cache_key = _cache_key("fd_analyst", ticker, end_date, "")
+    return cached_fetch(cache_key, lambda: _fetch_analyst_estimates(ticker))
 
-    cache_stats["misses"] += 1
+
+def _fetch_analyst_estimates(ticker: str) -> dict | None:
+    """애널리스트 추정치 원격 조회 (캐시 미경유)"""
     data = _api_get("/financials/analyst-estimates", {"ticker": ticker, "period": "annual", "limit": "2"})
 
     if not data or not data.get("analyst_estimates"):
@@ -106,8 +105,6 @@ def get_analyst_estimates(ticker: str, end_date: str) -> dict | None:
         "consensus_revenue": latest.get("estimated_revenue_avg"),
         "consensus_eps": latest.get("estimated_eps_avg"),
     }
-
-    _write_cache(cache_path, result)
     return result
 
 
@@ -125,13 +122,12 @@ def get_metrics_snapshot_fallback(ticker: str, end_date: str) -> dict | None:
     if not _get_api_key():
         return None
 
-    cache_path = _get_cache_path("fd_snapshot", ticker, end_date, "")
-    cached = _read_cache(cache_path)
-    if cached is not None:
-        cache_stats["hits"] += 1
-        return cached
+    cache_key = _cache_key("fd_snapshot", ticker, end_date, "")
+    return cached_fetch(cache_key, lambda: _fetch_metrics_snapshot(ticker))
 
-    cache_stats["misses"] += 1
+
+def _fetch_metrics_snapshot(ticker: str) -> dict | None:
+    """재무 지표 스냅샷 원격 조회 (캐시 미경유)"""
     data = _api_get("/financial-metrics/snapshot", {"ticker": ticker})
 
     if not data or not data.get("snapshot"):
@@ -231,6 +227,4 @@ def get_metrics_snapshot_fallback(ticker: str, end_date: str) -> dict | None:
         "research_and_development": None,
         "research_and_development_ratio": s.get("research_and_development_ratio"),
     }
-
-    _write_cache(cache_path, result)
     return result
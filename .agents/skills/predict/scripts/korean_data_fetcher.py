@@ -32,6 +32,10 @@ import pandas as pd
 import requests
 
 from dotenv import load_dotenv
+
+from price_series import ADJUSTED, RAW, PriceSeries
+from singleflight import single_flight
+
 load_dotenv()
 
 
@@ -765,31 +769,18 @@ def get_financial_metrics_kr(ticker: str, end_date: str) -> dict:
 # 공개 함수: 가격 데이터
 # ============================================================================
 
-def _prices_from_fdr(ticker: str, start_date: str, end_date: str) -> list:
+def _prices_from_fdr(ticker: str, start_date: str, end_date: str) -> PriceSeries:
     """FDR에서 수정주가 OHLCV 데이터 가져오기"""
     fdr = _get_fdr()
     df = fdr.DataReader(ticker, start_date, end_date)
 
     if df is None or df.empty:
-        return []
+        return PriceSeries()
 
-    prices = []
-    for date, row in df.iterrows():
-        try:
-            prices.append({
-                "time": date.strftime("%Y-%m-%d"),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": int(row["Volume"]),
-            })
-        except (KeyError, ValueError, TypeError):
-            continue
-    return prices
+    return PriceSeries.from_frame(df, basis=ADJUSTED)
 
 
-def _prices_from_pykrx(ticker: str, start_date: str, end_date: str) -> list:
+def _prices_from_pykrx(ticker: str, start_date: str, end_date: str) -> PriceSeries:
     """PyKRX에서 미보정 OHLCV 데이터 가져오기"""
     pykrx = _get_pykrx()
     start_str = start_date.replace("-", "")
@@ -798,30 +789,17 @@ def _prices_from_pykrx(ticker: str, start_date: str, end_date: str) -> list:
     df = pykrx.get_market_ohlcv_by_date(start_str, end_str, ticker)
 
     if df is None or df.empty:
-        return []
+        return PriceSeries()
 
-    prices = []
-    for date, row in df.iterrows():
-        try:
-            prices.append({
-                "time": date.strftime("%Y-%m-%d"),
-                "open": float(row["시가"]),
-                "high": float(row["고가"]),
-                "low": float(row["저가"]),
-                "close": float(row["종가"]),
-                "volume": int(row["거래량"]),
-            })
-        except (KeyError, ValueError, TypeError):
-            continue
-    return prices
+    return PriceSeries.from_frame(df, columns=("시가", "고가", "저가", "종가", "거래량"), basis=RAW)
 
 
-def get_prices_kr(ticker: str, start_date: str, end_date: str) -> list:
+def get_price_series_kr(ticker: str, start_date: str, end_date: str) -> PriceSeries:
     """
-    한국 주식 가격 데이터 가져오기 (FDR → KRX → PyKRX 3단계 폴백)
+    한국 주식 가격 데이터를 컬럼형으로 가져오기 (FDR → PyKRX 폴백)
 
-    FDR은 수정주가(adjusted price)를 자동 반영하여 액면분할/합병 보정된 데이터를 제공합니다.
-    KRX API와 PyKRX는 미보정 원시 가격을 반환하므로 폴백으로만 사용합니다.
+    predict 내부(증분 가격 저장소, 스코어링)용입니다. 외부 호출부는 get_prices_kr를 사용합니다.
+    결과의 basis는 FDR이면 수정주가, PyKRX 폴백이면 원시 가격입니다.
 
     Args:
         ticker: 6자리 종목코드
@@ -829,7 +807,7 @@ def get_prices_kr(ticker: str, start_date: str, end_date: str) -> list:
         end_date: 종료 날짜 (YYYY-MM-DD)
 
     Returns:
-        list[dict]: [{time, open, high, low, close, volume}, ...]
+        PriceSeries: 컬럼형 일봉 (series[i]는 {time, open, high, low, close, volume})
     """
     # KRX REST API는 단일 날짜만 지원하므로 가격 체인에서 제외
     result = _fetch_with_fallback(
@@ -837,7 +815,25 @@ def get_prices_kr(ticker: str, start_date: str, end_date: str) -> list:
         fallback_fn=lambda: _prices_from_pykrx(ticker, start_date, end_date),
         label=f"가격({ticker})",
     )
-    return result or []
+    return result or PriceSeries()
+
+
+def get_prices_kr(ticker: str, start_date: str, end_date: str) -> list:
+    """
+    한국 주식 가격 데이터 가져오기 (FDR → KRX → PyKRX 3단계 폴백)
+
+    FDR은 수정주가(adjusted price)를 자동 반영하여 액면분할/합병 보정된 데이터를 제공합니다.
+    KRX API와 PyKRX는 미보정 원시 가격을 반환하므로 폴백으로만 사용합니다.
+
+    Args:
+        ticker: 6자리 종목코드
+        start_date: 시작 날짜 (YYYY-MM-DD)
+        end_date: 종료 날짜 (YYYY-MM-DD)
+
+    Returns:
+        list[dict]: [{time, open, high, low, close, volume}, ...]
+    """
+    return get_price_series_kr(ticker, start_date, end_date).to_bars()
 
 
 def batch_fetch_prices_kr(tickers: list, start_date: str, end_date: str) -> dict:
@@ -924,6 +920,7 @@ def get_insider_trades_kr(ticker: str, end_date: str, limit: int = 100) -> list:
 # 공개 함수: 뉴스 (네이버 뉴스 + DART 공시 병합)
 # ============================================================================
 
+@single_flight("pykrx_name")
 def _get_company_name(ticker: str) -> str:
     """PyKRX에서 종목코드로 회사명 조회"""
     try:
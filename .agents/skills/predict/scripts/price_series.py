@@ -0,0 +1,220 @@
+"""
+컬럼형 가격 시계열
+
+일봉 이력을 {"time","open","high","low","close","volume"} 딕셔너리 리스트 대신
+하나의 (6, N) float64 NumPy 배열(행: 날짜/시가/고가/저가/종가/거래량)로 보관합니다.
+날짜는 1970-01-01 기준 일수이며 오름차순입니다.
+
+- 스코어링은 series.closes처럼 컬럼 배열을 바로 읽습니다.
+- DataFrame에서 iterrows 없이 컬럼 단위로 생성합니다.
+- 디스크에는 종목별 .npy 파일로 저장하며 mmap으로 필요한 부분만 읽습니다.
+- series[i]는 기존 형식의 딕셔너리를 반환하므로 기존 호출부도 그대로 동작합니다.
+- 원격 조회 결과에는 가격 기준(basis: 수정주가/원시가격)을 표시해 저장소가 기준이 섞이지 않게 합니다.
+"""
+import os
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+DATE, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+FIELDS = ("open", "high", "low", "close", "volume")
+FRAME_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# 가격 기준 (분할/배당 보정 여부)
+ADJUSTED = "adjusted"  # 수정주가 (yfinance auto_adjust, FDR)
+RAW = "raw"            # 미보정 원시 가격 (PyKRX)
+
+
+def _day(value: str) -> int:
+    """YYYY-MM-DD → 1970-01-01 기준 일수"""
+    return int(np.datetime64(value[:10], "D").astype(np.int64))
+
+
+def _day_str(day) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+class PriceSeries:
+    """한 종목의 일봉 이력 (컬럼 배열)"""
+
+    __slots__ = ("data", "basis")
+
+    def __init__(self, data: Optional[np.ndarray] = None, basis: Optional[str] = None):
+        self.data = np.empty((6, 0)) if data is None else data
+        # 원격 조회 결과의 가격 기준 (ADJUSTED/RAW, 모르면 None). 구간/병합 결과에는 전달되지 않음
+        self.basis = basis
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, df, columns: Iterable[str] = FRAME_COLUMNS, basis: Optional[str] = None) -> "PriceSeries":
+        """OHLCV DataFrame(날짜 인덱스)에서 생성. 종가가 없는 행은 버리고 나머지 결측은 0"""
+        if df is None or df.empty:
+            return cls(basis=basis)
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            # 거래소 현지 날짜 유지 (UTC 변환 시 한국 종목은 하루 밀림)
+            index = index.tz_localize(None)
+
+        data = np.empty((6, len(df)))
+        data[DATE] = np.asarray(index.values).astype("datetime64[D]").astype(np.int64)
+        for row, column in zip(range(OPEN, VOLUME + 1), columns):
+            data[row] = df[column].to_numpy(dtype=float, na_value=np.nan)
+
+        data = data[:, ~np.isnan(data[CLOSE])]
+        data[OPEN:] = np.nan_to_num(data[OPEN:])
+        series = cls._sorted(data)
+        series.basis = basis
+        return series
+
+    @classmethod
+    def from_bars(cls, bars: List[dict]) -> "PriceSeries":
+        """기존 딕셔너리 리스트에서 생성"""
+        rows = [
+            (_day(bar["time"]), bar.get("open") or 0, bar.get("high") or 0, bar.get("low") or 0,
+             bar["close"], bar.get("volume") or 0)
+            for bar in bars
+            if bar.get("time") and bar.get("close") is not None
+        ]
+        if not rows:
+            return cls()
+        return cls._sorted(np.array(rows, dtype=float).T)
+
+    @classmethod
+    def coerce(cls, prices) -> "PriceSeries":
+        """PriceSeries는 그대로, 딕셔너리 리스트는 변환"""
+        if isinstance(prices, cls):
+            return prices
+        return cls.from_bars(prices or [])
+
+    @classmethod
+    def _sorted(cls, data: np.ndarray) -> "PriceSeries":
+        # 날짜순 정렬 후 같은 날짜는 뒤에 온 행을 남김
+        order = np.argsort(data[DATE], kind="stable")
+        data = data[:, order]
+        keep = np.append(data[DATE, 1:] != data[DATE, :-1], True)
+        return cls(np.ascontiguousarray(data[:, keep]))
+
+    # ------------------------------------------------------------------
+    # 컬럼 접근
+    # ------------------------------------------------------------------
+
+    @property
+    def days(self) -> np.ndarray:
+        return self.data[DATE].astype(np.int64)
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.days.astype("datetime64[D]")
+
+    @property
+    def opens(self) -> np.ndarray:
+        return self.data[OPEN]
+
+    @property
+    def highs(self) -> np.ndarray:
+        return self.data[HIGH]
+
+    @property
+    def lows(self) -> np.ndarray:
+        return self.data[LOW]
+
+    @property
+    def closes(self) -> np.ndarray:
+        return self.data[CLOSE]
+
+    @property
+    def volumes(self) -> np.ndarray:
+        return self.data[VOLUME]
+
+    # ------------------------------------------------------------------
+    # 리스트 호환 (기존 list[dict] 호출부용)
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return PriceSeries(self.data[:, item])
+        column = self.data[:, item]
+        return {
+            "time": _day_str(column[DATE]),
+            "open": float(column[OPEN]),
+            "high": float(column[HIGH]),
+            "low": float(column[LOW]),
+            "close": float(column[CLOSE]),
+            "volume": int(column[VOLUME]),
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "PriceSeries([])"
+        return f"PriceSeries({len(self)} bars, {_day_str(self.data[DATE, 0])}..{_day_str(self.data[DATE, -1])})"
+
+    def to_bars(self) -> List[dict]:
+        return list(self)
+
+    def to_frame(self):
+        """yf.download 형태 DataFrame (Date 인덱스, Open/High/Low/Close/Volume 컬럼)"""
+        import pandas as pd
+
+        frame = pd.DataFrame(self.data[OPEN:].T, columns=list(FRAME_COLUMNS), index=pd.DatetimeIndex(self.dates, name="Date"))
+        frame["Volume"] = frame["Volume"].astype(np.int64)
+        return frame
+
+    # ------------------------------------------------------------------
+    # 구간 / 병합
+    # ------------------------------------------------------------------
+
+    def between(self, start: str, end: str) -> "PriceSeries":
+        """[start, end] 양 끝 포함 구간 (이진 탐색)"""
+        dates = self.data[DATE]
+        lo = np.searchsorted(dates, _day(start), side="left")
+        hi = np.searchsorted(dates, _day(end), side="right")
+        return PriceSeries(self.data[:, lo:hi])
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """두 시계열 병합 (같은 날짜는 other 값 우선)"""
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        return PriceSeries._sorted(np.concatenate([self.data, other.data], axis=1))
+
+    # ------------------------------------------------------------------
+    # 파일 입출력
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """.npy로 저장 (임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 봄)"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(self.data, dtype=np.float64))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, start: Optional[str] = None, end: Optional[str] = None) -> "PriceSeries":
+        """.npy 로드. 구간을 주면 mmap으로 열어 해당 열만 복사해서 읽음"""
+        if not os.path.exists(path):
+            return cls()
+        if start is None and end is None:
+            return cls(np.load(path))
+        mapped = cls(np.load(path, mmap_mode="r"))
+        window = mapped.between(start or "0001-01-01", end or "9999-12-31")
+        # 파일이 교체되어도 안전하도록 필요한 열만 메모리로 복사
+        return cls(np.array(window.data))
@@ -0,0 +1,347 @@
+"""
+증분 가격 저장소
+
+종목별 일봉 이력을 컬럼형 .npy 파일(price_series.PriceSeries)에 병합 저장하고,
+이미 조회한 날짜 구간을 SQLite 파일에 기록합니다. 요청 구간 중 비어 있는 부분(보통 최근 하루이틀)만 원격에서 가져오고
+나머지는 로컬 데이터를 잘라서 반환합니다.
+
+구간은 모두 양 끝 포함([start, end])이며 날짜는 YYYY-MM-DD 문자열입니다.
+원격 조회 함수의 종료일 규칙(yfinance는 end 미포함)은 호출하는 쪽(data_fetcher)에서 맞춥니다.
+
+수정주가는 분할/배당이 생기면 과거 값 전체가 다시 계산되므로, 증분 조회 때 이미 저장된 직전
+PRICE_STORE_CHECK_DAYS일도 함께 받아 종가를 비교합니다. 값이 달라졌거나 가격 기준(수정주가/원시 가격,
+예: FDR 실패 후 PyKRX 폴백)이 종목에 기록된 기준과 다르면 저장 이력을 버리고 요청 구간 전체를 다시 받습니다.
+"""
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+import config
+from price_series import PriceSeries
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_coverage (
+    ticker TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    PRIMARY KEY (ticker, start_date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS price_basis (
+    ticker TEXT PRIMARY KEY,
+    basis TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+Interval = Tuple[str, str]
+Bars = Union[PriceSeries, List[dict]]
+
+
+def _to_date(value: str) -> date:
+    return datetime.strptime(value[:10], "%Y-%m-%d").date()
+
+
+def _shift(value: str, days: int) -> str:
+    return (_to_date(value) + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _has_weekday(start: str, end: str) -> bool:
+    day, last = _to_date(start), _to_date(end)
+    while day <= last:
+        if day.weekday() < 5:
+            return True
+        day += timedelta(days=1)
+    return False
+
+
+def _merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """겹치거나 하루 차이로 붙은 구간 병합"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= _shift(merged[-1][1], 1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class PriceStore:
+    """종목별 병합 일봉 이력(.npy) + 조회 완료 구간 기록(SQLite)"""
+
+    def __init__(self, path: str, bars_dir: str):
+        self.path = path
+        self.bars_dir = bars_dir
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._migrate_row_bars(conn)
+            self._conn = conn
+        return self._conn
+
+    def _migrate_row_bars(self, conn: sqlite3.Connection) -> None:
+        """이전 형식(SQLite price_bars 행 저장)의 일봉을 종목별 .npy로 옮기고 테이블 삭제"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_bars'"
+        ).fetchone()
+        if not exists:
+            return
+        tickers = [row[0] for row in conn.execute("SELECT DISTINCT ticker FROM price_bars")]
+        for ticker in tickers:
+            rows = conn.execute(
+                "SELECT date, open, high, low, close, volume FROM price_bars WHERE ticker = ?", (ticker,)
+            ).fetchall()
+            bars = [
+                {"time": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+                for d, o, h, l, c, v in rows
+            ]
+            self._load(ticker).merge(PriceSeries.from_bars(bars)).save(self._bars_path(ticker))
+        with conn:
+            conn.execute("DROP TABLE price_bars")
+
+    def _bars_path(self, ticker: str) -> str:
+        # 파일명에 쓸 수 없는 문자(^, / 등)는 _로 치환
+        return os.path.join(self.bars_dir, re.sub(r"[^A-Za-z0-9._-]", "_", ticker) + ".npy")
+
+    def _load(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> PriceSeries:
+        return PriceSeries.load(self._bars_path(ticker), start, end)
+
+    def missing_intervals(self, ticker: str, start: str, end: str) -> List[Interval]:
+        """[start, end] 중 아직 조회하지 않은 구간 목록"""
+        with self._lock:
+            covered = self._connection().execute(
+                "SELECT start_date, end_date FROM price_coverage "
+                "WHERE ticker = ? AND end_date >= ? AND start_date <= ? ORDER BY start_date",
+                (ticker, start, end),
+            ).fetchall()
+
+        missing = []
+        cursor = start
+        for covered_start, covered_end in covered:
+            if covered_start > cursor:
+                missing.append((cursor, min(_shift(covered_start, -1), end)))
+            cursor = max(cursor, _shift(covered_end, 1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def check_start(self, ticker: str, start: str) -> str:
+        """start부터 조회할 때 실제 원격 조회 시작일 (직전 날짜가 저장돼 있으면 비교용으로 앞당김)"""
+        previous = _shift(start, -1)
+        with self._lock:
+            covered = self._connection().execute(
+                "SELECT 1 FROM price_coverage WHERE ticker = ? AND start_date <= ? AND end_date >= ?",
+                (ticker, previous, previous),
+            ).fetchone()
+        return _shift(start, -config.PRICE_STORE_CHECK_DAYS) if covered else start
+
+    def add(self, ticker: str, bars: Bars, start: str, end: str) -> bool:
+        """조회 결과 저장 (같은 날짜는 덮어씀) 후 확정된 날짜까지만 조회 완료로 기록
+
+        최근 PRICE_STORE_SETTLE_DAYS일은 장중이거나 아직 반영되지 않았을 수 있어
+        완료로 기록하지 않으므로 다음 요청에서 다시 조회합니다. 평일이 낀 구간의
+        빈 결과는 조회 실패일 수 있으므로 역시 완료로 기록하지 않습니다.
+
+        bars에 start 이전(check_start로 앞당긴) 날짜가 있으면 저장된 종가와 비교합니다.
+        가격 기준이 바뀌었으면 종목의 저장 이력을 모두 버리고 False를 반환합니다 (호출자가 전체 재조회).
+        """
+        series = PriceSeries.coerce(bars)
+        settled_end = min(end, (date.today() - timedelta(days=config.PRICE_STORE_SETTLE_DAYS)).strftime("%Y-%m-%d"))
+
+        with self._lock:
+            conn = self._connection()
+            if len(series) and self._rebased(conn, ticker, series, start):
+                self._drop(conn, ticker)
+                return False
+            if len(series):
+                # 일봉 파일을 먼저 교체한 뒤 구간을 기록 (중단되어도 구간만 다시 조회됨)
+                self._load(ticker).merge(series).save(self._bars_path(ticker))
+            with conn:
+                if series.basis:
+                    conn.execute("INSERT OR REPLACE INTO price_basis VALUES (?, ?)", (ticker, series.basis))
+                if start <= settled_end and (len(series) or not _has_weekday(start, settled_end)):
+                    existing = conn.execute(
+                        "SELECT start_date, end_date FROM price_coverage WHERE ticker = ?", (ticker,)
+                    ).fetchall()
+                    conn.execute("DELETE FROM price_coverage WHERE ticker = ?", (ticker,))
+                    conn.executemany(
+                        "INSERT INTO price_coverage VALUES (?, ?, ?)",
+                        [(ticker, s, e) for s, e in _merge_intervals(existing + [(start, settled_end)])],
+                    )
+        return True
+
+    def _rebased(self, conn: sqlite3.Connection, ticker: str, series: PriceSeries, start: str) -> bool:
+        """새 조회 결과가 저장된 이력과 다른 가격 기준인지 (기준 이름 또는 확정 구간 종가 비교)"""
+        row = conn.execute("SELECT basis FROM price_basis WHERE ticker = ?", (ticker,)).fetchone()
+        if row and series.basis and row[0] != series.basis:
+            return True
+
+        # start 이전 날짜는 이미 확정 저장된 구간 (start부터는 미확정 일봉과 겹칠 수 있어 비교하지 않음)
+        check = series.between("0001-01-01", _shift(start, -1))
+        if not len(check):
+            return False
+        stored = self._load(ticker, str(check.dates[0]), str(check.dates[-1]))
+        _, stored_idx, check_idx = np.intersect1d(stored.days, check.days, return_indices=True)
+        if not len(stored_idx):
+            return False
+        return not np.allclose(
+            check.closes[check_idx], stored.closes[stored_idx], rtol=config.PRICE_STORE_REBASE_TOLERANCE, atol=0
+        )
+
+    def _drop(self, conn: sqlite3.Connection, ticker: str) -> None:
+        with conn:
+            conn.execute("DELETE FROM price_coverage WHERE ticker = ?", (ticker,))
+            conn.execute("DELETE FROM price_basis WHERE ticker = ?", (ticker,))
+        if os.path.exists(self._bars_path(ticker)):
+            os.remove(self._bars_path(ticker))
+
+    def get(self, ticker: str, start: str, end: str) -> PriceSeries:
+        """[start, end] 일봉"""
+        with self._lock:
+            self._connection()
+            return self._load(ticker, start, end)
+
+    def clear(self, ticker: Optional[str] = None) -> None:
+        with self._lock:
+            conn = self._connection()
+            if ticker:
+                self._drop(conn, ticker)
+            else:
+                with conn:
+                    conn.execute("DELETE FROM price_coverage")
+                    conn.execute("DELETE FROM price_basis")
+                shutil.rmtree(self.bars_dir, ignore_errors=True)
+
+    def usage(self) -> List[Tuple[str, int, float]]:
+        """종목별 일봉 파일 (티커, 바이트, 마지막 사용 시각)
+
+        마지막 사용 시각은 파일 접근/수정 시각 중 늦은 쪽입니다 (mmap 읽기도 접근 시각을 갱신).
+        구간 기록이 없는 파일은 파일명을 티커로 반환합니다.
+        """
+        with self._lock:
+            tickers = [row[0] for row in self._connection().execute("SELECT DISTINCT ticker FROM price_coverage")]
+        by_path = {self._bars_path(ticker): ticker for ticker in tickers}
+        if not os.path.isdir(self.bars_dir):
+            return []
+        files = []
+        for filename in os.listdir(self.bars_dir):
+            if not filename.endswith(".npy"):
+                continue
+            path = os.path.join(self.bars_dir, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((by_path.get(path, filename[:-len(".npy")]), st.st_size, max(st.st_atime, st.st_mtime)))
+        return files
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ============================================================================
+# 증분 조회
+# ============================================================================
+
+def get_prices(ticker: str, start: str, end: str, fetch: Callable[[str, str, str], Bars]) -> PriceSeries:
+    """[start, end] 가격: 비어 있는 구간만 fetch(ticker, s, e)로 가져와 병합 후 잘라서 반환"""
+    store = get_store()
+    if not _fill(store, ticker, start, end, fetch):
+        # 가격 기준이 바뀌어 저장 이력을 버렸으므로 요청 구간 전체를 새 기준으로 다시 조회
+        _fill(store, ticker, start, end, fetch)
+    return store.get(ticker, start, end)
+
+
+def _fill(store: PriceStore, ticker: str, start: str, end: str, fetch: Callable[[str, str, str], Bars]) -> bool:
+    for missing_start, missing_end in store.missing_intervals(ticker, start, end):
+        bars = fetch(ticker, store.check_start(ticker, missing_start), missing_end)
+        if not store.add(ticker, bars, missing_start, missing_end):
+            return False
+    return True
+
+
+def batch_get_prices(
+    tickers: List[str],
+    start: str,
+    end: str,
+    fetch_many: Callable[[List[str], str, str], Dict[str, Bars]],
+) -> Dict[str, PriceSeries]:
+    """여러 종목 가격: 비어 있는 구간이 같은 종목끼리 묶어 fetch_many 한 번으로 가져옴"""
+    store = get_store()
+    rebased = _fill_many(store, tickers, start, end, fetch_many)
+    if rebased:
+        # 가격 기준이 바뀐 종목은 저장 이력을 버렸으므로 요청 구간 전체를 다시 조회
+        _fill_many(store, rebased, start, end, fetch_many)
+
+    result = {}
+    for ticker in tickers:
+        prices = store.get(ticker, start, end)
+        if prices:
+            result[ticker] = prices
+    return result
+
+
+def _fill_many(
+    store: PriceStore,
+    tickers: List[str],
+    start: str,
+    end: str,
+    fetch_many: Callable[[List[str], str, str], Dict[str, Bars]],
+) -> List[str]:
+    """비어 있는 구간을 (조회 시작일, 구간) 단위로 묶어 조회, 가격 기준이 바뀐 종목 목록 반환"""
+    groups: Dict[Tuple[str, str, str], List[str]] = {}
+    for ticker in tickers:
+        for missing_start, missing_end in store.missing_intervals(ticker, start, end):
+            key = (store.check_start(ticker, missing_start), missing_start, missing_end)
+            groups.setdefault(key, []).append(ticker)
+
+    rebased = []
+    for (fetch_start, missing_start, missing_end), group in groups.items():
+        fetched = fetch_many(group, fetch_start, missing_end) or {}
+        for ticker in group:
+            if ticker in rebased:
+                continue
+            if not store.add(ticker, fetched.get(ticker, []), missing_start, missing_end):
+                rebased.append(ticker)
+    return rebased
+
+
+_store: Optional[PriceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> PriceStore:
+    """공유 가격 저장소 (첫 사용 시 생성)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore(
+                os.path.join(config.CACHE_DIR, config.PRICE_STORE_FILENAME),
+                os.path.join(config.CACHE_DIR, config.PRICE_STORE_BARS_DIRNAME),
+            )
+        return _store
+
+
+def close_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
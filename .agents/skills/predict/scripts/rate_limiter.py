@@ -14,6 +14,7 @@ import yfinance as yf
 import pandas as pd
 
 from config import YF_REQUEST_DELAY, YF_MAX_RETRIES, YF_RETRY_BASE_DELAY, YF_JITTER_MAX, DART_RATE_LIMIT, DART_RATE_WINDOW
+from singleflight import single_flight
 
 # 전역 락 (동시 요청 제어)
 _yf_request_lock = threading.Lock()
@@ -63,6 +64,7 @@ def _retry_on_rate_limit(func, *args, max_retries=YF_MAX_RETRIES, **kwargs):
     return None
 
 
+@single_flight("yf_info")
 def safe_get_ticker_info(ticker: str) -> dict:
     """안전하게 티커 정보 가져오기 (재시도 로직 포함)"""
     def _fetch():
@@ -75,6 +77,7 @@ def safe_get_ticker_info(ticker: str) -> dict:
         return {}
 
 
+@single_flight("yf_news")
 def safe_get_ticker_news(ticker: str) -> list:
     """안전하게 티커 뉴스 가져오기 (재시도 로직 포함)"""
     def _fetch():
@@ -87,6 +90,7 @@ def safe_get_ticker_news(ticker: str) -> list:
         return []
 
 
+@single_flight("yf_insider")
 def safe_get_insider_transactions(ticker: str):
     """안전하게 내부자 거래 가져오기 (재시도 로직 포함)"""
     def _fetch():
@@ -99,6 +103,7 @@ def safe_get_insider_transactions(ticker: str):
         return None
 
 
+@single_flight("yf_history")
 def safe_get_ticker_history(ticker: str, start: str, end: str) -> pd.DataFrame:
     """안전하게 가격 히스토리 가져오기 (재시도 로직 포함)"""
     def _fetch():
@@ -112,6 +117,7 @@ def safe_get_ticker_history(ticker: str, start: str, end: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+@single_flight("yf_financials")
 def safe_get_financials(ticker: str):
     """안전하게 재무제표 가져오기 (재시도 로직 포함)"""
     def _fetch():
@@ -124,6 +130,7 @@ def safe_get_financials(ticker: str):
         return None
 
 
+@single_flight("yf_balance_sheet")
 def safe_get_balance_sheet(ticker: str):
     """안전하게 대차대조표 가져오기 (재시도 로직 포함)"""
     def _fetch():
@@ -136,6 +143,7 @@ def safe_get_balance_sheet(ticker: str):
         return None
 
 
+@single_flight("yf_download")
 def safe_batch_download(tickers: list, start: str, end: str, **kwargs) -> pd.DataFrame:
     """안전하게 배치 다운로드 (재시도 로직 포함)"""
     def _fetch():
@@ -0,0 +1,105 @@
+"""
+동시 요청 병합 (single-flight)
+
+같은 키 (출처, 티커, 파라미터)로 동시에 들어온 요청 중 첫 요청만 실제로 실행하고,
+나머지는 진행 중인 요청의 결과를 기다렸다가 그대로 받습니다.
+스레드 풀에서 같은 종목을 동시에 조회할 때 Yahoo/DART 중복 호출과 중복 캐시 쓰기를 막습니다.
+
+결과는 요청 간에 공유되므로 캐시 값과 마찬가지로 읽기 전용으로 다뤄야 합니다.
+완료된 결과는 보관하지 않습니다 (보관은 cache 모듈의 역할).
+"""
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+# 병합 통계 (실제 실행 / 다른 요청 결과 공유)
+flight_stats = {"calls": 0, "shared": 0}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "owner")
+
+    def __init__(self, owner: int):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.owner = owner
+
+
+class SingleFlight:
+    """키별 진행 중 호출 테이블"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """key로 진행 중인 호출이 있으면 그 결과를 기다리고, 없으면 fn()을 실행"""
+        me = threading.get_ident()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call(me)
+                leader = True
+                flight_stats["calls"] += 1
+            elif call.owner == me:
+                # 같은 스레드의 재귀 호출은 기다리면 교착되므로 바로 실행
+                leader = None
+            else:
+                leader = False
+                flight_stats["shared"] += 1
+
+        if leader is None:
+            return fn()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+# 전역 인스턴스
+flight = SingleFlight()
+
+
+def single_flight(source: str):
+    """
+    함수 호출을 (source, 위치 인자, 키워드 인자) 키로 병합하는 데코레이터
+
+    기본값을 채워 인자를 정규화하므로 f("AAPL", limit=2)와 f("AAPL", 2)는 같은 키입니다.
+    인자는 해시 가능해야 합니다 (티커, 날짜, 숫자 등). 리스트 인자는 튜플로 바꿔 키를 만듭니다.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (source, _freeze(tuple(bound.arguments.items())))
+            return flight.do(key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return tuple(sorted(value))
+    return value
@@ -60,11 +60,12 @@ def upgrade():
             sa.Column('market_conditions', sa.JSON, nullable=True),
         )
         
-        # Create indexes for the new table
-        op.create_index('ix_hedge_fund_flow_run_cycles_flow_run_id', 'hedge_fund_flow_run_cycles', ['flow_run_id'])
-        op.create_index('ix_hedge_fund_flow_run_cycles_cycle_number', 'hedge_fund_flow_run_cycles', ['cycle_number'])
-        op.create_index('ix_hedge_fund_flow_run_cycles_status', 'hedge_fund_flow_run_cycles', ['status'])
-        op.create_index('ix_hedge_fund_flow_run_cycles_started_at', 'hedge_fund_flow_run_cycles', ['started_at'])
+        # Create indexes for the new table (index=True above already created some of them)
+        existing_indexes = {index['name'] for index in sa.inspect(conn).get_indexes('hedge_fund_flow_run_cycles')}
+        for column in ('flow_run_id', 'cycle_number', 'status', 'started_at'):
+            index_name = f'ix_hedge_fund_flow_run_cycles_{column}'
+            if index_name not in existing_indexes:
+                op.create_index(index_name, 'hedge_fund_flow_run_cycles', [column])
 
 
 def downgrade():
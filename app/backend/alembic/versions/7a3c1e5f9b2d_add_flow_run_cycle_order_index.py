@@ -0,0 +1,72 @@
+"""Add unique composite (flow_run_id, cycle_number) index to hedge_fund_flow_run_cycles
+
+Revision ID: 7a3c1e5f9b2d
+Revises: d5e78f9a1b2c
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c1e5f9b2d'
+down_revision: Union[str, None] = 'd5e78f9a1b2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = 'ix_hedge_fund_flow_run_cycles_run_cycle'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'hedge_fund_flow_run_cycles' not in inspector.get_table_names():
+        return
+
+    existing_indexes = {index['name']: index for index in inspector.get_indexes('hedge_fund_flow_run_cycles')}
+    existing = existing_indexes.get(INDEX_NAME)
+    if existing is not None and existing.get('unique'):
+        return
+    if existing is not None:
+        # Databases that ran the earlier non-unique version of this revision
+        op.drop_index(INDEX_NAME, table_name='hedge_fund_flow_run_cycles')
+
+    _renumber_duplicate_cycles(conn)
+    op.create_index(INDEX_NAME, 'hedge_fund_flow_run_cycles', ['flow_run_id', 'cycle_number'], unique=True)
+
+
+def _renumber_duplicate_cycles(conn) -> None:
+    """Move cycles that share a (flow_run_id, cycle_number) after the run's last cycle, keeping the oldest in place."""
+    duplicates = conn.execute(sa.text(
+        "SELECT flow_run_id, cycle_number FROM hedge_fund_flow_run_cycles "
+        "GROUP BY flow_run_id, cycle_number HAVING COUNT(*) > 1"
+    )).fetchall()
+    for flow_run_id, cycle_number in duplicates:
+        ids = [row[0] for row in conn.execute(sa.text(
+            "SELECT id FROM hedge_fund_flow_run_cycles WHERE flow_run_id = :run AND cycle_number = :number ORDER BY id"
+        ), {"run": flow_run_id, "number": cycle_number})]
+        next_number = conn.execute(sa.text(
+            "SELECT MAX(cycle_number) FROM hedge_fund_flow_run_cycles WHERE flow_run_id = :run"
+        ), {"run": flow_run_id}).scalar() + 1
+        for cycle_id in ids[1:]:
+            conn.execute(sa.text(
+                "UPDATE hedge_fund_flow_run_cycles SET cycle_number = :number WHERE id = :id"
+            ), {"number": next_number, "id": cycle_id})
+            next_number += 1
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'hedge_fund_flow_run_cycles' not in inspector.get_table_names():
+        return
+
+    existing_indexes = [index['name'] for index in inspector.get_indexes('hedge_fund_flow_run_cycles')]
+    if INDEX_NAME in existing_indexes:
+        op.drop_index(INDEX_NAME, table_name='hedge_fund_flow_run_cycles')
@@ -0,0 +1,52 @@
+"""Add retention policy to hedge_fund_flows and archive pointer columns to hedge_fund_flow_runs
+
+Revision ID: 8b4d2f6a0c3e
+Revises: 7a3c1e5f9b2d
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4d2f6a0c3e'
+down_revision: Union[str, None] = '7a3c1e5f9b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    flow_columns = [col['name'] for col in inspector.get_columns('hedge_fund_flows')]
+    if 'retention_policy' not in flow_columns:
+        op.add_column('hedge_fund_flows', sa.Column('retention_policy', sa.JSON(), nullable=True))
+
+    run_columns = [col['name'] for col in inspector.get_columns('hedge_fund_flow_runs')]
+    if 'archived_at' not in run_columns:
+        op.add_column('hedge_fund_flow_runs', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+    if 'archive_path' not in run_columns:
+        op.add_column('hedge_fund_flow_runs', sa.Column('archive_path', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    run_columns = [col['name'] for col in inspector.get_columns('hedge_fund_flow_runs')]
+    with op.batch_alter_table('hedge_fund_flow_runs') as batch_op:
+        if 'archive_path' in run_columns:
+            batch_op.drop_column('archive_path')
+        if 'archived_at' in run_columns:
+            batch_op.drop_column('archived_at')
+
+    flow_columns = [col['name'] for col in inspector.get_columns('hedge_fund_flows')]
+    if 'retention_policy' in flow_columns:
+        with op.batch_alter_table('hedge_fund_flows') as batch_op:
+            batch_op.drop_column('retention_policy')
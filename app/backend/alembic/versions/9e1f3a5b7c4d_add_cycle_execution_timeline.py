@@ -0,0 +1,39 @@
+"""Add execution_timeline to hedge_fund_flow_run_cycles
+
+Revision ID: 9e1f3a5b7c4d
+Revises: 8b4d2f6a0c3e
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1f3a5b7c4d'
+down_revision: Union[str, None] = '8b4d2f6a0c3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    columns = [col['name'] for col in inspector.get_columns('hedge_fund_flow_run_cycles')]
+    if 'execution_timeline' not in columns:
+        op.add_column('hedge_fund_flow_run_cycles', sa.Column('execution_timeline', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    columns = [col['name'] for col in inspector.get_columns('hedge_fund_flow_run_cycles')]
+    if 'execution_timeline' in columns:
+        with op.batch_alter_table('hedge_fund_flow_run_cycles') as batch_op:
+            batch_op.drop_column('execution_timeline')
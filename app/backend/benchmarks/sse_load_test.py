@@ -0,0 +1,317 @@
+"""
+Load-test the streaming hedge-fund endpoints with many concurrent SSE clients.
+
+The backend is started in-process (uvicorn on its own thread and event loop) and every
+agent is served by the built-in "Fake" model provider, so runs need neither LLM providers
+nor the financial data API. Per client the harness records time to first event, the gaps
+between events and the total completion time; process-wide it samples RSS and the
+server event loop's scheduling lag. The report is printed and optionally written as JSON
+so results can be compared across commits. The server uses a temporary SQLite database
+(see --db-path), so the real hedge_fund.db is never migrated or written.
+
+Usage (from the repository root):
+    poetry run python -m app.backend.benchmarks.sse_load_test --clients 50 --output sse.json
+    poetry run python -m app.backend.benchmarks.sse_load_test --endpoint backtest --clients 10 --days 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+DEFAULT_ANALYSTS = "warren_buffett,michael_burry,technical_analyst,fundamentals_analyst,sentiment_analyst"
+
+# How often the server loop is probed for lag and RSS is sampled
+SAMPLE_INTERVAL = 0.05
+
+
+def build_request(args: argparse.Namespace) -> Dict:
+    """Request body with every agent on the fake provider (fully offline)."""
+    analysts = [key.strip() for key in args.analysts.split(",") if key.strip()]
+    # Node ids use the same "<agent key>_<6 char suffix>" shape as the frontend
+    analyst_ids = [f"{key}_{index:06d}" for index, key in enumerate(analysts)]
+    portfolio_manager_id = "portfolio_manager_pm0000"
+
+    body = {
+        "tickers": [ticker.strip() for ticker in args.tickers.split(",") if ticker.strip()],
+        "graph_nodes": [{"id": node_id} for node_id in analyst_ids + [portfolio_manager_id]],
+        "graph_edges": [
+            {"id": f"edge_{node_id}", "source": node_id, "target": portfolio_manager_id} for node_id in analyst_ids
+        ],
+        "model_name": "fake",
+        "model_provider": "Fake",
+        "fake_llm": {
+            "latency_distribution": args.latency_distribution,
+            "latency_ms": args.latency_ms,
+            "latency_jitter_ms": args.latency_jitter_ms,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        },
+    }
+
+    end = date.fromisoformat(args.end_date) if args.end_date else date.today()
+    if args.endpoint == "backtest":
+        # Business days only, so --days is roughly the number of simulated trading days
+        start = end - timedelta(days=int(args.days * 7 / 5) + 1)
+        body.update({"start_date": start.isoformat(), "end_date": end.isoformat()})
+    else:
+        body.update({"end_date": end.isoformat()})
+    return body
+
+
+class ServerThread:
+    """Runs the backend app under uvicorn on a background thread with its own event loop."""
+
+    def __init__(self, port: int):
+        import uvicorn
+
+        from app.backend.main import app
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = threading.Thread(target=self._run, name="uvicorn", daemon=True)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self, timeout: float = 60.0):
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Backend failed to start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self._thread.join(timeout=30)
+
+
+async def measure_loop_lag(samples: List[float], stop: threading.Event):
+    """Runs on the server loop: how late a periodic wake-up fires (ms) is the loop's scheduling lag."""
+    while not stop.is_set():
+        expected = time.perf_counter() + SAMPLE_INTERVAL
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        samples.append(max(0.0, (time.perf_counter() - expected) * 1000))
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable).
+
+    Server and clients share the process, but client-side state is small and constant per
+    client, so growth across a run is dominated by the server.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return maxrss / 1024 / 1024 if sys.platform == "darwin" else maxrss / 1024
+
+
+async def sample_memory(samples: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        samples.append(rss_mb())
+        await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+async def run_client(client, url: str, body: Dict, start_gate: asyncio.Event) -> Dict:
+    """Open one SSE stream and time its events."""
+    await start_gate.wait()
+    started = time.perf_counter()
+    result = {"ttfe_ms": None, "gaps_ms": [], "completion_ms": None, "events": 0, "status": "ok", "error": None}
+    last_event = None
+    event_type = None
+    try:
+        async with client.stream("POST", url, json=body) as response:
+            if response.status_code != 200:
+                await response.aread()
+                result.update(status="http_error", error=f"{response.status_code}: {response.text[:200]}")
+                return result
+
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event_type = line[len("event:"):].strip()
+                    continue
+                if not line.startswith("data:"):
+                    continue
+
+                now = time.perf_counter()
+                if last_event is None:
+                    result["ttfe_ms"] = (now - started) * 1000
+                else:
+                    result["gaps_ms"].append((now - last_event) * 1000)
+                last_event = now
+                result["events"] += 1
+
+                if event_type == "error":
+                    result.update(status="error_event", error=line[len("data:"):].strip()[:200])
+                elif event_type == "complete":
+                    break
+            else:
+                if result["status"] == "ok" and event_type != "complete":
+                    result.update(status="incomplete", error="stream ended without a complete event")
+    except Exception as e:
+        result.update(status="exception", error=f"{type(e).__name__}: {e}")
+    finally:
+        result["completion_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+async def run_load(args: argparse.Namespace, server: ServerThread) -> Dict:
+    import httpx
+
+    url = f"http://127.0.0.1:{args.port}/hedge-fund/{args.endpoint}"
+    body = build_request(args)
+
+    stop = asyncio.Event()
+    server_stop = threading.Event()
+    lag_samples: List[float] = []
+    memory_samples: List[float] = []
+
+    # Lag is measured on the server's loop, where streaming and graph scheduling happen
+    server.loop.call_soon_threadsafe(lambda: server.loop.create_task(measure_loop_lag(lag_samples, server_stop)))
+    memory_task = asyncio.create_task(sample_memory(memory_samples, stop))
+
+    rss_before = rss_mb()
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(args.timeout), limits=limits) as client:
+        start_gate = asyncio.Event()
+        tasks = [asyncio.create_task(run_client(client, url, body, start_gate)) for _ in range(args.clients)]
+        wall_started = time.perf_counter()
+        start_gate.set()
+        results = await asyncio.gather(*tasks)
+        wall_ms = (time.perf_counter() - wall_started) * 1000
+
+    stop.set()
+    server_stop.set()
+    await memory_task
+    rss_after = rss_mb()
+
+    ttfe = [r["ttfe_ms"] for r in results if r["ttfe_ms"] is not None]
+    gaps = [gap for r in results for gap in r["gaps_ms"]]
+    completion = [r["completion_ms"] for r in results if r["status"] == "ok"]
+    failures: Dict[str, int] = {}
+    for r in results:
+        if r["status"] != "ok":
+            failures[r["status"]] = failures.get(r["status"], 0) + 1
+
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": _environment(),
+        "wall_ms": wall_ms,
+        "clients_ok": len(completion),
+        "clients_failed": failures,
+        "errors": sorted({r["error"] for r in results if r["error"]})[:10],
+        "events_total": sum(r["events"] for r in results),
+        "ttfe_ms": _summary(ttfe),
+        "inter_event_ms": _summary(gaps),
+        "completion_ms": _summary(completion),
+        "loop_lag_ms": _summary(lag_samples),
+        "memory_mb": {
+            "before": rss_before,
+            "peak": max(memory_samples, default=rss_after),
+            "after": rss_after,
+            "growth": rss_after - rss_before,
+        },
+    }
+
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": _percentile(ordered, 50),
+        "p90": _percentile(ordered, 90),
+        "p99": _percentile(ordered, 99),
+        "max": ordered[-1],
+    }
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _environment() -> Dict[str, Optional[str]]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform()}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent SSE load test for /hedge-fund/run and /hedge-fund/backtest")
+    parser.add_argument("--endpoint", choices=["run", "backtest"], default="run")
+    parser.add_argument("--clients", type=int, default=20, help="Number of concurrent SSE clients")
+    parser.add_argument("--tickers", default="AAPL,MSFT,NVDA")
+    parser.add_argument("--analysts", default=DEFAULT_ANALYSTS, help="Comma-separated analyst keys")
+    parser.add_argument("--end-date", default=None, help="YYYY-MM-DD (defaults to today)")
+    parser.add_argument("--days", type=int, default=10, help="Trading days per backtest")
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean fake LLM latency")
+    parser.add_argument("--latency-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake LLM failure probability per call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-client timeout in seconds")
+    parser.add_argument("--port", type=int, default=None, help="Port for the in-process server (default: any free port)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--db-path", default=None, help="SQLite database for the server (default: a fresh temporary file)")
+    args = parser.parse_args()
+    args.port = args.port or _free_port()
+
+    # Keep background maintenance and disk caching out of the measurement: no retention sweeps,
+    # no scheduler ticks, and data-cache lookups that don't hit (or fill) the on-disk store
+    os.environ["RUN_RETENTION_INTERVAL_HOURS"] = "0"
+    os.environ["SCHEDULER_INTERVAL_SECONDS"] = "0"
+    os.environ["DATA_CACHE_PERSIST"] = "false"
+
+    # Migrations and the runs' rows go to a throwaway database, never the real hedge_fund.db.
+    # Set before the backend is imported, since the engine reads it at import time
+    with tempfile.TemporaryDirectory(prefix="sse_load_test_") as temp_dir:
+        os.environ["DATABASE_PATH"] = args.db_path or os.path.join(temp_dir, "hedge_fund.db")
+        os.environ["RUN_ARCHIVE_DIR"] = os.path.join(temp_dir, "archives")
+
+        server = ServerThread(args.port)
+        server.start()
+        try:
+            report = asyncio.run(run_load(args, server))
+        finally:
+            server.stop()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    return 0 if not report["clients_failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Measure how long it takes to import the backend app and flag heavy modules that
+leak into startup.
+
+Usage (from the repository root):
+    poetry run python -m app.backend.benchmarks.startup_time --runs 5 --max-seconds 2.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules that must only be imported on first use, never at backend startup
+LAZY_MODULES = [
+    "src.main",
+    "src.agents",
+    "src.llm.models",
+    "src.tools.api",
+    "langgraph",
+    "langchain_openai",
+    "langchain_anthropic",
+    "ollama",
+    "alembic",
+    "pandas",
+]
+
+# Runs in a fresh interpreter each time so nothing is already cached in sys.modules
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.backend.main
+elapsed = time.perf_counter() - started
+lazy = {lazy!r}
+leaked = sorted(m for m in lazy if any(name == m or name.startswith(m + ".") for name in sys.modules))
+print(json.dumps({{"seconds": elapsed, "leaked": leaked}}))
+"""
+
+
+def measure(runs: int) -> dict:
+    """Import app.backend.main in `runs` fresh interpreters and summarise the timings."""
+    samples = []
+    leaked = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(lazy=LAZY_MODULES)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        leaked.update(result["leaked"])
+
+    return {
+        "runs": runs,
+        "median_seconds": statistics.median(samples),
+        "max_seconds": max(samples),
+        "min_seconds": min(samples),
+        "leaked_modules": sorted(leaked),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backend import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold imports to time")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if report["leaked_modules"]:
+        print(f"FAIL: imported at startup: {', '.join(report['leaked_modules'])}", file=sys.stderr)
+        failed = True
+    if args.max_seconds is not None and report["median_seconds"] > args.max_seconds:
+        print(f"FAIL: median import time {report['median_seconds']:.3f}s > {args.max_seconds:.3f}s", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
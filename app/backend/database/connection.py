@@ -1,20 +1,33 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import json
 import os
+import time
 from pathlib import Path
 
+from app.backend.services.metrics import DB_SESSION_WAIT
+
 # Get the backend directory path
 BACKEND_DIR = Path(__file__).parent.parent
-DATABASE_PATH = BACKEND_DIR / "hedge_fund.db"
+
+# SQLite file for flows, runs and settings (override to point tools such as the load test elsewhere)
+DATABASE_PATH = Path(os.getenv("DATABASE_PATH", str(BACKEND_DIR / "hedge_fund.db")))
 
 # Database configuration - use absolute path
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
+
+def _compact_json_serializer(value) -> str:
+    """Serialize JSON columns without whitespace and with raw UTF-8 text"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    json_serializer=_compact_json_serializer,  # Keeps large analyst/portfolio payloads compact
 )
 
 # Create SessionLocal class
@@ -27,6 +40,10 @@ Base = declarative_base()
 def get_db():
     db = SessionLocal()
     try:
+        # Check out the connection up front so pool wait time is measurable
+        started = time.perf_counter()
+        db.connection()
+        DB_SESSION_WAIT.observe(time.perf_counter() - started)
         yield db
     finally:
         db.close() 
\ No newline at end of file
@@ -0,0 +1,35 @@
+import logging
+
+from sqlalchemy import inspect
+
+from app.backend.database.connection import BACKEND_DIR, engine
+from app.backend.database.models import Base
+
+logger = logging.getLogger(__name__)
+
+# Last revision whose schema matched what the old create_all() startup path produced
+LEGACY_SCHEMA_REVISION = "d5e78f9a1b2c"
+
+
+def run_migrations() -> None:
+    """Bring the database schema up to date with the Alembic migrations."""
+    # Imported here so only startup pays for loading Alembic
+    from alembic import command
+    from alembic.config import Config
+
+    # Built in code rather than from alembic.ini so the ini's logging config isn't applied
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+
+        if tables and "alembic_version" not in tables:
+            # Created by create_all() before migrations ran on startup: fill in any missing
+            # tables, then record it as the schema create_all() used to build
+            logger.info(f"Stamping unversioned database at revision {LEGACY_SCHEMA_REVISION}")
+            Base.metadata.create_all(bind=connection)
+            command.stamp(config, LEGACY_SCHEMA_REVISION)
+
+        command.upgrade(config, "head")
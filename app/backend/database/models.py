@@ -1,15 +1,22 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from .connection import Base
 
 
+def _utcnow() -> datetime:
+    # Python-side so updated_at keeps microseconds (SQLite's now() has one-second resolution),
+    # which the ETags of the flow and run endpoints rely on
+    return datetime.now(timezone.utc)
+
+
 class HedgeFundFlow(Base):
     """Table to store React Flow configurations (nodes, edges, viewport)"""
     __tablename__ = "hedge_fund_flows"
     
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=_utcnow)
     
     # Flow metadata
     name = Column(String(200), nullable=False)
@@ -24,6 +31,7 @@ class HedgeFundFlow(Base):
     # Additional metadata
     is_template = Column(Boolean, default=False)  # Mark as template for reuse
     tags = Column(JSON, nullable=True)  # Store tags for categorization
+    retention_policy = Column(JSON, nullable=True)  # Per-flow run retention overrides (max_age_days, max_runs)
 
 
 class HedgeFundFlowRun(Base):
@@ -33,7 +41,7 @@ class HedgeFundFlowRun(Base):
     id = Column(Integer, primary_key=True, index=True)
     flow_id = Column(Integer, ForeignKey("hedge_fund_flows.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=_utcnow)
     
     # Run execution tracking
     status = Column(String(50), nullable=False, default="IDLE")  # IDLE, IN_PROGRESS, COMPLETE, ERROR
@@ -54,11 +62,20 @@ class HedgeFundFlowRun(Base):
     
     # Metadata
     run_number = Column(Integer, nullable=False, default=1)  # Sequential run number for this flow
+    
+    # Archival (heavy JSON moved to a compressed file on disk, this row stays as a pointer)
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    archive_path = Column(String(500), nullable=True)  # Relative to the backend archive directory
 
 
 class HedgeFundFlowRunCycle(Base):
     """Individual analysis cycles within a trading session"""
     __tablename__ = "hedge_fund_flow_run_cycles"
+    __table_args__ = (
+        # Ordered read-back of a run's cycles (cycle replay / streaming); unique so concurrent
+        # writers can't hand out the same cycle number twice
+        Index("ix_hedge_fund_flow_run_cycles_run_cycle", "flow_run_id", "cycle_number", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     flow_run_id = Column(Integer, ForeignKey("hedge_fund_flow_runs.id"), nullable=False, index=True)
@@ -88,6 +105,7 @@ class HedgeFundFlowRunCycle(Base):
     llm_calls_count = Column(Integer, nullable=True, default=0)  # Number of LLM calls made
     api_calls_count = Column(Integer, nullable=True, default=0)  # Number of financial API calls made
     estimated_cost = Column(String(20), nullable=True)  # Estimated cost in USD
+    execution_timeline = Column(JSON, nullable=True)  # Node spans, LLM calls and data calls for this cycle
     
     # Metadata
     trigger_reason = Column(String(100), nullable=True)  # scheduled, manual, market_event, etc.
@@ -1,21 +1,53 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import asyncio
 
 from app.backend.routes import api_router
-from app.backend.database.connection import engine
-from app.backend.database.models import Base
+from app.backend.database.migrations import run_migrations
 from app.backend.services.ollama_service import ollama_service
+from app.backend.services.api_key_cache import last_used_tracker, run_last_used_flusher
+from app.backend.services.metrics import MetricsMiddleware
+from app.backend.services.compression import CompressionMiddleware
+from app.backend.services.persistent_data_cache import persistent_data_cache
+from app.backend.services.retention_service import RETENTION_INTERVAL_HOURS, run_retention_periodically
+from app.backend.services.scheduler import SCHEDULER_INTERVAL_SECONDS, run_scheduler_periodically
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Hedge Fund API", description="Backend API for AI Hedge Fund", version="0.1.0")
 
-# Initialize database tables (this is safe to run multiple times)
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Migrate the database, start background jobs, and clean up on shutdown."""
+    # Schema must be current before the first request; runs off the event loop
+    await asyncio.to_thread(run_migrations)
+    
+    background_tasks = [asyncio.create_task(run_last_used_flusher())]
+    if RETENTION_INTERVAL_HOURS > 0:
+        background_tasks.append(asyncio.create_task(run_retention_periodically(RETENTION_INTERVAL_HOURS)))
+    if SCHEDULER_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_scheduler_periodically(SCHEDULER_INTERVAL_SECONDS)))
+    
+    # Probe Ollama in the background so it never delays startup
+    background_tasks.append(asyncio.create_task(log_ollama_status()))
+    
+    yield
+    
+    for task in background_tasks:
+        task.cancel()
+    await ollama_service.stop_status_refresher()
+    try:
+        last_used_tracker.flush()
+    except Exception as e:
+        logger.warning(f"Could not flush API key last_used timestamps: {e}")
+    if persistent_data_cache is not None:
+        persistent_data_cache.close()
+
+
+app = FastAPI(title="AI Hedge Fund API", description="Backend API for AI Hedge Fund", version="0.1.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -26,15 +58,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (flows carry big nodes/edges/data payloads)
+app.add_middleware(CompressionMiddleware)
+
+# Record per-route request latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include all routes
 app.include_router(api_router)
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event to check Ollama availability."""
+async def log_ollama_status():
+    """Take the first Ollama status snapshot, log it, then keep it refreshed."""
     try:
         logger.info("Checking Ollama availability...")
-        status = await ollama_service.check_ollama_status()
+        status = await ollama_service.refresh_status()
         
         if status["installed"]:
             if status["running"]:
@@ -53,3 +90,5 @@ async def startup_event():
     except Exception as e:
         logger.warning(f"Could not check Ollama status: {e}")
         logger.info("ℹ Ollama integration is available if you install it later")
+    finally:
+        ollama_service.start_status_refresher()
@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Dict, Any
-from src.llm.models import ModelProvider
+from pydantic import AfterValidator, BaseModel, Field, field_validator
+from typing import Annotated, List, Literal, Optional, Dict, Any
 from enum import Enum
 from app.backend.services.graph import extract_base_agent_key
 
@@ -13,10 +12,44 @@ class FlowRunStatus(str, Enum):
     ERROR = "ERROR"
 
 
+class FlowRunCycleStatus(str, Enum):
+    IN_PROGRESS = "IN_PROGRESS"
+    COMPLETED = "COMPLETED"
+    ERROR = "ERROR"
+
+
+# Built-in offline provider used for benchmarking (not an actual LLM provider)
+FAKE_MODEL_PROVIDER = "Fake"
+
+
+def _validate_model_provider(value: str) -> Any:
+    """Coerce a provider name to src.llm.models.ModelProvider (or the fake provider).
+
+    The enum is imported on first validation because src.llm.models pulls in every
+    LangChain provider package, which would otherwise be paid at backend startup.
+    """
+    if value == FAKE_MODEL_PROVIDER:
+        return value
+    from src.llm.models import ModelProvider
+    return ModelProvider(value)
+
+
+ModelProviderName = Annotated[str, AfterValidator(_validate_model_provider)]
+
+
+class FakeLLMConfig(BaseModel):
+    """Behaviour of the fake provider: deterministic outputs after a sampled latency"""
+    latency_distribution: Literal["fixed", "uniform", "normal", "lognormal"] = "lognormal"
+    latency_ms: float = Field(200.0, ge=0)
+    latency_jitter_ms: float = Field(50.0, ge=0)
+    error_rate: float = Field(0.0, ge=0, le=1)
+    seed: int = 0
+
+
 class AgentModelConfig(BaseModel):
     agent_id: str
     model_name: Optional[str] = None
-    model_provider: Optional[ModelProvider] = None
+    model_provider: Optional[ModelProviderName] = None
 
 
 class PortfolioPosition(BaseModel):
@@ -64,16 +97,19 @@ class BaseHedgeFundRequest(BaseModel):
     graph_edges: List[GraphEdge]
     agent_models: Optional[List[AgentModelConfig]] = None
     model_name: Optional[str] = "gpt-4.1"
-    model_provider: Optional[ModelProvider] = ModelProvider.OPENAI
+    model_provider: Optional[ModelProviderName] = "OpenAI"
     margin_requirement: float = 0.0
     portfolio_positions: Optional[List[PortfolioPosition]] = None
     api_keys: Optional[Dict[str, str]] = None
+    fake_llm: Optional[FakeLLMConfig] = None
+    flow_run_id: Optional[int] = None  # When set, each graph run is recorded as a cycle of this flow run
+    llm_cache: Optional[bool] = None  # Replay identical LLM calls from the response cache; None uses LLM_CACHE_ENABLED
 
     def get_agent_ids(self) -> List[str]:
         """Extract agent IDs from graph structure"""
         return [node.id for node in self.graph_nodes]
 
-    def get_agent_model_config(self, agent_id: str) -> tuple[str, ModelProvider]:
+    def get_agent_model_config(self, agent_id: str) -> tuple[str, str]:
         """Get model configuration for a specific agent"""
         if self.agent_models:
             # Extract base agent key from unique node ID for matching
@@ -90,6 +126,16 @@ class BaseHedgeFundRequest(BaseModel):
         # Fallback to global model settings
         return self.model_name, self.model_provider
 
+    def uses_fake_provider(self, agent_id: str) -> bool:
+        """Check whether an agent is served by the built-in fake provider"""
+        _, model_provider = self.get_agent_model_config(agent_id)
+        return getattr(model_provider, "value", model_provider) == FAKE_MODEL_PROVIDER
+
+    def is_offline(self) -> bool:
+        """True when every agent uses the fake provider, so no LLM or data API is needed"""
+        agent_ids = self.get_agent_ids()
+        return bool(agent_ids) and all(self.uses_fake_provider(agent_id) for agent_id in agent_ids)
+
 
 class BacktestRequest(BaseHedgeFundRequest):
     start_date: str
@@ -97,6 +143,15 @@ class BacktestRequest(BaseHedgeFundRequest):
     initial_capital: float = 100000.0
 
 
+class BacktestReplayRequest(BaseModel):
+    flow_run_id: int  # Flow run whose recorded backtest days are replayed
+    tickers: Optional[List[str]] = None  # Defaults to every ticker priced on the first recorded day
+    initial_capital: float = 100000.0
+    margin_requirement: float = 0.0
+    portfolio_positions: Optional[List[PortfolioPosition]] = None
+    mark_to_market_only: bool = False  # Ignore the recorded decisions and only revalue the portfolio
+
+
 class BacktestDayResult(BaseModel):
     date: str
     portfolio_value: float
@@ -198,6 +253,10 @@ class FlowSummaryResponse(BaseModel):
 class FlowRunCreateRequest(BaseModel):
     """Request to create a new flow run"""
     request_data: Optional[Dict[str, Any]] = None
+    # Continuous and advisory runs are executed by the scheduler once set IN_PROGRESS
+    trading_mode: Literal["one-time", "continuous", "advisory"] = "one-time"
+    schedule: Optional[Literal["hourly", "daily", "weekly"]] = None
+    duration: Optional[Literal["1day", "1week", "1month"]] = None
 
 
 class FlowRunUpdateRequest(BaseModel):
@@ -220,6 +279,10 @@ class FlowRunResponse(BaseModel):
     request_data: Optional[Dict[str, Any]]
     results: Optional[Dict[str, Any]]
     error_message: Optional[str]
+    trading_mode: str = "one-time"
+    schedule: Optional[str] = None
+    duration: Optional[str] = None
+    archived_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -235,11 +298,84 @@ class FlowRunSummaryResponse(BaseModel):
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
     error_message: Optional[str]
+    archived_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+class FlowRunCycleResponse(BaseModel):
+    """Single analysis cycle within a flow run"""
+    id: int
+    flow_run_id: int
+    cycle_number: int
+    status: FlowRunCycleStatus
+    created_at: Optional[datetime]
+    started_at: datetime
+    completed_at: Optional[datetime]
+    analyst_signals: Optional[Dict[str, Any]]
+    trading_decisions: Optional[Dict[str, Any]]
+    executed_trades: Optional[Dict[str, Any]]
+    portfolio_snapshot: Optional[Dict[str, Any]]
+    performance_metrics: Optional[Dict[str, Any]]
+    error_message: Optional[str]
+    llm_calls_count: Optional[int]
+    api_calls_count: Optional[int]
+    estimated_cost: Optional[str]
+    trigger_reason: Optional[str]
+    market_conditions: Optional[Dict[str, Any]]
+    execution_timeline: Optional[Dict[str, Any]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class FlowRunTraceResponse(BaseModel):
+    """Execution timelines of a run's cycles, with per-agent and per-model totals"""
+    flow_run_id: int
+    total_cycles: int
+    llm_calls_count: int
+    api_calls_count: int
+    estimated_cost: float
+    by_agent: Dict[str, Dict[str, Any]]
+    by_model: Dict[str, Dict[str, Any]]
+    cycles: List[Dict[str, Any]]
+
+
+# Retention schemas
+class RetentionPolicy(BaseModel):
+    """Run retention rules for a flow (None disables the rule)"""
+    max_age_days: Optional[int] = Field(None, ge=1)
+    max_runs: Optional[int] = Field(None, ge=1)
+
+
+class RetentionPolicyResponse(BaseModel):
+    """Stored per-flow override and the policy actually applied"""
+    flow_id: int
+    override: Optional[RetentionPolicy] = None
+    effective: RetentionPolicy
+
+
+class RetentionApplyResponse(BaseModel):
+    """Summary of a retention pass"""
+    archived_run_ids: List[int]
+    archived_bytes: int
+    freed_pages: int
+
+
+# Data cache schemas
+class DataCacheStatsResponse(BaseModel):
+    """State of the shared in-memory data cache and its persistent store"""
+    memory: Dict[str, Any]
+    persistent: Optional[Dict[str, Any]] = None  # None when persistence is disabled
+
+
+class DataCachePurgeResponse(BaseModel):
+    """Result of a data cache purge"""
+    deleted_entries: int
+    memory_cleared: bool
+
+
 # API Key schemas
 class ApiKeyCreateRequest(BaseModel):
     """Request to create or update an API key"""
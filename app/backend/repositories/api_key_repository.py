@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from app.backend.database.models import ApiKey
+from app.backend.services.api_key_cache import api_key_cache
 
 
 class ApiKeyRepository:
@@ -30,6 +31,7 @@ class ApiKeyRepository:
             existing_key.is_active = is_active
             existing_key.updated_at = func.now()
             self.db.commit()
+            api_key_cache.invalidate()
             self.db.refresh(existing_key)
             return existing_key
         else:
@@ -42,6 +44,7 @@ class ApiKeyRepository:
             )
             self.db.add(api_key)
             self.db.commit()
+            api_key_cache.invalidate()
             self.db.refresh(api_key)
             return api_key
 
@@ -80,6 +83,7 @@ class ApiKeyRepository:
         
         api_key.updated_at = func.now()
         self.db.commit()
+        api_key_cache.invalidate()
         self.db.refresh(api_key)
         return api_key
 
@@ -91,6 +95,7 @@ class ApiKeyRepository:
         
         self.db.delete(api_key)
         self.db.commit()
+        api_key_cache.invalidate()
         return True
 
     def deactivate_api_key(self, provider: str) -> bool:
@@ -102,6 +107,7 @@ class ApiKeyRepository:
         api_key.is_active = False
         api_key.updated_at = func.now()
         self.db.commit()
+        api_key_cache.invalidate()
         return True
 
     def update_last_used(self, provider: str) -> bool:
@@ -117,6 +123,14 @@ class ApiKeyRepository:
         self.db.commit()
         return True
 
+    def bulk_update_last_used(self, timestamps: Dict[str, datetime]) -> int:
+        """Write several last_used timestamps in a single commit. Returns count of keys updated."""
+        api_keys = self.db.query(ApiKey).filter(ApiKey.provider.in_(list(timestamps))).all()
+        for api_key in api_keys:
+            api_key.last_used = timestamps[api_key.provider]
+        self.db.commit()
+        return len(api_keys)
+
     def bulk_create_or_update(self, api_keys_data: List[dict]) -> List[ApiKey]:
         """Bulk create or update multiple API keys"""
         results = []
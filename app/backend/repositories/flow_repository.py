@@ -1,4 +1,5 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.backend.database.models import HedgeFundFlow
 
@@ -38,6 +39,17 @@ class FlowRepository:
             query = query.filter(HedgeFundFlow.is_template == False)
         return query.order_by(HedgeFundFlow.updated_at.desc()).all()
     
+    def get_flows_version(self, include_templates: bool = True) -> Tuple:
+        """Get (count, max id, latest change) of the flow list, for ETags without loading the flows"""
+        query = self.db.query(
+            func.count(HedgeFundFlow.id),
+            func.max(HedgeFundFlow.id),
+            func.max(func.coalesce(HedgeFundFlow.updated_at, HedgeFundFlow.created_at)),
+        )
+        if not include_templates:
+            query = query.filter(HedgeFundFlow.is_template == False)
+        return tuple(query.one())
+    
     def get_flows_by_name(self, name: str) -> List[HedgeFundFlow]:
         """Search flows by name (case-insensitive partial match)"""
         return self.db.query(HedgeFundFlow).filter(
@@ -100,4 +112,15 @@ class FlowRepository:
             data=original.data,
             is_template=False,  # Copies are not templates by default
             tags=original.tags
-        ) 
\ No newline at end of file
+        )
+    
+    def update_retention_policy(self, flow_id: int, retention_policy: Optional[dict]) -> Optional[HedgeFundFlow]:
+        """Set (or clear with None) the run retention policy of a flow"""
+        flow = self.get_flow_by_id(flow_id)
+        if not flow:
+            return None
+        
+        flow.retention_policy = retention_policy
+        self.db.commit()
+        self.db.refresh(flow)
+        return flow
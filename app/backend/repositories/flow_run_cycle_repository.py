@@ -0,0 +1,167 @@
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import desc, func, insert
+from sqlalchemy.exc import IntegrityError
+from app.backend.database.models import HedgeFundFlowRunCycle
+from app.backend.models.schemas import FlowRunCycleStatus
+
+
+# Columns a caller may provide for a cycle (everything except the generated id/created_at)
+CYCLE_FIELDS = (
+    "cycle_number",
+    "started_at",
+    "completed_at",
+    "analyst_signals",
+    "trading_decisions",
+    "executed_trades",
+    "portfolio_snapshot",
+    "performance_metrics",
+    "status",
+    "error_message",
+    "llm_calls_count",
+    "api_calls_count",
+    "estimated_cost",
+    "execution_timeline",
+    "trigger_reason",
+    "market_conditions",
+)
+
+# Attempts at auto-numbering a cycle before giving up when concurrent writers keep taking the number
+MAX_NUMBERING_ATTEMPTS = 5
+
+
+class FlowRunCycleRepository:
+    """Repository for HedgeFundFlowRunCycle persistence and replay"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def create_cycle(self, flow_run_id: int, **fields: Any) -> HedgeFundFlowRunCycle:
+        """Create a single cycle for a flow run"""
+        for attempt in range(MAX_NUMBERING_ATTEMPTS):
+            row = self._build_row(flow_run_id, fields, self.get_next_cycle_number(flow_run_id))
+            cycle = HedgeFundFlowRunCycle(**row)
+            self.db.add(cycle)
+            try:
+                self.db.commit()
+            except IntegrityError:
+                # Another writer (scheduler, backtest) took the number first; renumber unless the caller fixed it
+                self.db.rollback()
+                if fields.get("cycle_number") is not None or attempt == MAX_NUMBERING_ATTEMPTS - 1:
+                    raise
+                continue
+            self.db.refresh(cycle)
+            return cycle
+    
+    def bulk_create_cycles(self, flow_run_id: int, cycles: List[Dict[str, Any]], chunk_size: int = 500) -> int:
+        """
+        Insert many cycles for a flow run in a single transaction.
+        Cycles without a cycle_number are numbered after the run's current last cycle.
+        Returns the number of inserted cycles.
+        """
+        if not cycles:
+            return 0
+        
+        auto_numbered = any(cycle.get("cycle_number") is None for cycle in cycles)
+        for attempt in range(MAX_NUMBERING_ATTEMPTS):
+            next_number = self.get_next_cycle_number(flow_run_id)
+            rows = []
+            for cycle in cycles:
+                row = self._build_row(flow_run_id, cycle, next_number)
+                next_number = max(next_number, row["cycle_number"]) + 1
+                rows.append(row)
+            
+            try:
+                # executemany-style INSERTs, committed once for the whole batch
+                for start in range(0, len(rows), chunk_size):
+                    self.db.execute(insert(HedgeFundFlowRunCycle), rows[start:start + chunk_size])
+                self.db.commit()
+                return len(rows)
+            except IntegrityError:
+                self.db.rollback()
+                if not auto_numbered or attempt == MAX_NUMBERING_ATTEMPTS - 1:
+                    raise
+            except Exception:
+                self.db.rollback()
+                raise
+    
+    def iter_cycles(self, flow_run_id: int, batch_size: int = 200) -> Iterator[HedgeFundFlowRunCycle]:
+        """Stream all cycles of a run in cycle_number order without loading them all at once"""
+        query = (
+            self.db.query(HedgeFundFlowRunCycle)
+            .filter(HedgeFundFlowRunCycle.flow_run_id == flow_run_id)
+            .order_by(HedgeFundFlowRunCycle.cycle_number)
+            .yield_per(batch_size)
+        )
+        for cycle in query:
+            yield cycle
+    
+    def get_cycles(self, flow_run_id: int, limit: int = 100, offset: int = 0) -> List[HedgeFundFlowRunCycle]:
+        """Get a page of cycles for a run, ordered by cycle_number"""
+        return (
+            self.db.query(HedgeFundFlowRunCycle)
+            .filter(HedgeFundFlowRunCycle.flow_run_id == flow_run_id)
+            .order_by(HedgeFundFlowRunCycle.cycle_number)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+    
+    def get_all_cycles(self, flow_run_id: int) -> List[HedgeFundFlowRunCycle]:
+        """Get every cycle for a run, ordered by cycle_number"""
+        return (
+            self.db.query(HedgeFundFlowRunCycle)
+            .filter(HedgeFundFlowRunCycle.flow_run_id == flow_run_id)
+            .order_by(HedgeFundFlowRunCycle.cycle_number)
+            .all()
+        )
+    
+    def get_latest_cycle(self, flow_run_id: int) -> Optional[HedgeFundFlowRunCycle]:
+        """Get the most recent cycle for a run"""
+        return (
+            self.db.query(HedgeFundFlowRunCycle)
+            .filter(HedgeFundFlowRunCycle.flow_run_id == flow_run_id)
+            .order_by(desc(HedgeFundFlowRunCycle.cycle_number))
+            .first()
+        )
+    
+    def get_cycle_count(self, flow_run_id: int) -> int:
+        """Get total count of cycles for a run"""
+        return (
+            self.db.query(HedgeFundFlowRunCycle)
+            .filter(HedgeFundFlowRunCycle.flow_run_id == flow_run_id)
+            .count()
+        )
+    
+    def delete_cycles_by_flow_run_id(self, flow_run_id: int) -> int:
+        """Delete all cycles for a run. Returns count of deleted cycles."""
+        deleted_count = (
+            self.db.query(HedgeFundFlowRunCycle)
+            .filter(HedgeFundFlowRunCycle.flow_run_id == flow_run_id)
+            .delete()
+        )
+        self.db.commit()
+        return deleted_count
+    
+    def get_next_cycle_number(self, flow_run_id: int) -> int:
+        """Get the next cycle number for a run"""
+        max_cycle_number = (
+            self.db.query(func.max(HedgeFundFlowRunCycle.cycle_number))
+            .filter(HedgeFundFlowRunCycle.flow_run_id == flow_run_id)
+            .scalar()
+        )
+        return (max_cycle_number or 0) + 1
+    
+    def _build_row(self, flow_run_id: int, fields: Dict[str, Any], default_cycle_number: int) -> Dict[str, Any]:
+        """Normalize caller-provided cycle fields into an insertable row"""
+        row = {key: fields[key] for key in CYCLE_FIELDS if key in fields}
+        row["flow_run_id"] = flow_run_id
+        if row.get("cycle_number") is None:
+            row["cycle_number"] = default_cycle_number
+        if row.get("started_at") is None:
+            row["started_at"] = datetime.utcnow()
+        
+        status = row.get("status") or FlowRunCycleStatus.COMPLETED
+        row["status"] = status.value if isinstance(status, FlowRunCycleStatus) else status
+        return row
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
@@ -12,7 +12,14 @@ class FlowRunRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create_flow_run(self, flow_id: int, request_data: Dict[str, Any] = None) -> HedgeFundFlowRun:
+    def create_flow_run(
+        self,
+        flow_id: int,
+        request_data: Dict[str, Any] = None,
+        trading_mode: str = "one-time",
+        schedule: Optional[str] = None,
+        duration: Optional[str] = None
+    ) -> HedgeFundFlowRun:
         """Create a new flow run"""
         # Get the next run number for this flow
         run_number = self._get_next_run_number(flow_id)
@@ -21,7 +28,10 @@ class FlowRunRepository:
             flow_id=flow_id,
             request_data=request_data,
             run_number=run_number,
-            status=FlowRunStatus.IDLE.value
+            status=FlowRunStatus.IDLE.value,
+            trading_mode=trading_mode,
+            schedule=schedule,
+            duration=duration
         )
         self.db.add(flow_run)
         self.db.commit()
@@ -43,6 +53,18 @@ class FlowRunRepository:
             .all()
         )
     
+    def get_flow_runs_version(self, flow_id: int) -> Tuple:
+        """Get (count, max id, latest change) of a flow's runs, for ETags without loading the runs"""
+        return tuple(
+            self.db.query(
+                func.count(HedgeFundFlowRun.id),
+                func.max(HedgeFundFlowRun.id),
+                func.max(func.coalesce(HedgeFundFlowRun.updated_at, HedgeFundFlowRun.created_at)),
+            )
+            .filter(HedgeFundFlowRun.flow_id == flow_id)
+            .one()
+        )
+    
     def get_active_flow_run(self, flow_id: int) -> Optional[HedgeFundFlowRun]:
         """Get the current active (IN_PROGRESS) run for a flow"""
         return (
@@ -130,4 +152,31 @@ class FlowRunRepository:
             .filter(HedgeFundFlowRun.flow_id == flow_id)
             .scalar()
         )
-        return (max_run_number or 0) + 1 
\ No newline at end of file
+        return (max_run_number or 0) + 1
+    
+    def get_archivable_flow_runs(self, flow_id: int) -> List[HedgeFundFlowRun]:
+        """Get finished, not yet archived runs for a flow, ordered by most recent first"""
+        return (
+            self.db.query(HedgeFundFlowRun)
+            .filter(
+                HedgeFundFlowRun.flow_id == flow_id,
+                HedgeFundFlowRun.archived_at.is_(None),
+                HedgeFundFlowRun.status.in_([FlowRunStatus.COMPLETE.value, FlowRunStatus.ERROR.value])
+            )
+            # created_at has one-second resolution; id breaks ties so the newest runs are kept
+            .order_by(desc(HedgeFundFlowRun.created_at), desc(HedgeFundFlowRun.id))
+            .all()
+        )
+    
+    def get_scheduled_flow_runs(self) -> List[HedgeFundFlowRun]:
+        """Get started continuous/advisory runs that the scheduler should execute"""
+        return (
+            self.db.query(HedgeFundFlowRun)
+            .filter(
+                HedgeFundFlowRun.trading_mode.in_(["continuous", "advisory"]),
+                HedgeFundFlowRun.status == FlowRunStatus.IN_PROGRESS.value,
+                HedgeFundFlowRun.archived_at.is_(None)
+            )
+            .order_by(HedgeFundFlowRun.id)
+            .all()
+        )
@@ -8,6 +8,9 @@ from app.backend.routes.flow_runs import router as flow_runs_router
 from app.backend.routes.ollama import router as ollama_router
 from app.backend.routes.language_models import router as language_models_router
 from app.backend.routes.api_keys import router as api_keys_router
+from app.backend.routes.retention import router as retention_router
+from app.backend.routes.metrics import router as metrics_router
+from app.backend.routes.data_cache import router as data_cache_router
 
 # Main API router
 api_router = APIRouter()
@@ -21,3 +24,6 @@ api_router.include_router(flow_runs_router, tags=["flow-runs"])
 api_router.include_router(ollama_router, tags=["ollama"])
 api_router.include_router(language_models_router, tags=["language-models"])
 api_router.include_router(api_keys_router, tags=["api-keys"])
+api_router.include_router(retention_router, tags=["retention"])
+api_router.include_router(metrics_router, tags=["metrics"])
+api_router.include_router(data_cache_router, tags=["data-cache"])
@@ -4,6 +4,8 @@ from typing import List
 
 from app.backend.database import get_db
 from app.backend.repositories.api_key_repository import ApiKeyRepository
+from app.backend.services.api_key_service import ApiKeyService
+from app.backend.services.api_key_cache import last_used_tracker
 from app.backend.models.schemas import (
     ApiKeyCreateRequest,
     ApiKeyUpdateRequest,
@@ -190,10 +192,10 @@ async def bulk_update_api_keys(request: ApiKeyBulkUpdateRequest, db: Session = D
 async def update_last_used(provider: str, db: Session = Depends(get_db)):
     """Update the last used timestamp for an API key"""
     try:
-        repo = ApiKeyRepository(db)
-        success = repo.update_last_used(provider)
-        if not success:
+        # Only active keys are tracked; the timestamp is written back by the batch flusher
+        if ApiKeyService(db).get_api_key(provider) is None:
             raise HTTPException(status_code=404, detail="API key not found")
+        last_used_tracker.mark_used(provider)
         return {"message": "Last used timestamp updated"}
     except HTTPException:
         raise
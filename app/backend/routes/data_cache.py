@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from app.backend.services.shared_data_cache import CACHED_FUNCTIONS, shared_data_cache
+from app.backend.models.schemas import DataCacheStatsResponse, DataCachePurgeResponse, ErrorResponse
+
+router = APIRouter(prefix="/data-cache")
+
+
+@router.get(
+    "/",
+    response_model=DataCacheStatsResponse,
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def get_data_cache_stats():
+    """Get hit rates and sizes of the market data cache"""
+    try:
+        store = shared_data_cache.store
+        return DataCacheStatsResponse(
+            memory=shared_data_cache.stats(),
+            persistent=store.stats() if store is not None else None,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve data cache stats: {str(e)}")
+
+
+@router.delete(
+    "/",
+    response_model=DataCachePurgeResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Unknown data function"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def purge_data_cache(
+    function: Optional[str] = Query(None, description="Only purge responses of this src.tools.api function"),
+    ticker: Optional[str] = Query(None, description="Only purge responses for this ticker"),
+    expired_only: bool = Query(False, description="Only purge responses past their freshness window"),
+):
+    """Purge cached market data so the next request refetches it from the provider"""
+    try:
+        if function is not None and function not in CACHED_FUNCTIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown data function: {function}")
+
+        store = shared_data_cache.store
+        deleted = store.purge(function=function, ticker=ticker, expired_only=expired_only) if store is not None else 0
+
+        # Memory entries expire on their own; anything else must not outlive the purged rows
+        memory_cleared = not expired_only
+        if memory_cleared:
+            shared_data_cache.clear()
+
+        return DataCachePurgeResponse(deleted_entries=deleted, memory_cleared=memory_cleared)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to purge data cache: {str(e)}")
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.backend.database import get_db
+from app.backend.database import get_db, SessionLocal
 from app.backend.repositories.flow_run_repository import FlowRunRepository
+from app.backend.repositories.flow_run_cycle_repository import FlowRunCycleRepository
 from app.backend.repositories.flow_repository import FlowRepository
+from app.backend.services.http_cache import conditional_get, make_etag, row_version
+from app.backend.services.retention_service import RetentionService
+from app.backend.services.run_timeline import summarize_timeline
 from app.backend.models.schemas import (
     FlowRunCreateRequest,
     FlowRunUpdateRequest,
     FlowRunResponse,
     FlowRunSummaryResponse,
+    FlowRunCycleResponse,
+    FlowRunTraceResponse,
     FlowRunStatus,
     ErrorResponse
 )
@@ -42,7 +49,10 @@ async def create_flow_run(
         run_repo = FlowRunRepository(db)
         flow_run = run_repo.create_flow_run(
             flow_id=flow_id,
-            request_data=request.request_data
+            request_data=request.request_data,
+            trading_mode=request.trading_mode,
+            schedule=request.schedule,
+            duration=request.duration
         )
         return FlowRunResponse.from_orm(flow_run)
     except HTTPException:
@@ -61,6 +71,8 @@ async def create_flow_run(
 )
 async def get_flow_runs(
     flow_id: int,
+    request: Request,
+    response: Response,
     limit: int = Query(50, ge=1, le=100, description="Maximum number of runs to return"),
     offset: int = Query(0, ge=0, description="Number of runs to skip"),
     db: Session = Depends(get_db)
@@ -73,8 +85,12 @@ async def get_flow_runs(
         if not flow:
             raise HTTPException(status_code=404, detail="Flow not found")
         
-        # Get flow runs
+        # Get flow runs, answering polling with 304 before loading them
         run_repo = FlowRunRepository(db)
+        etag = make_etag("flow-runs", flow_id, limit, offset, *run_repo.get_flow_runs_version(flow_id))
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
         flow_runs = run_repo.get_flow_runs_by_flow_id(flow_id, limit=limit, offset=offset)
         return [FlowRunSummaryResponse.from_orm(run) for run in flow_runs]
     except HTTPException:
@@ -91,7 +107,7 @@ async def get_flow_runs(
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
-async def get_active_flow_run(flow_id: int, db: Session = Depends(get_db)):
+async def get_active_flow_run(flow_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get the current active (IN_PROGRESS) run for the specified flow"""
     try:
         # Verify flow exists
@@ -103,6 +119,10 @@ async def get_active_flow_run(flow_id: int, db: Session = Depends(get_db)):
         # Get active flow run
         run_repo = FlowRunRepository(db)
         active_run = run_repo.get_active_flow_run(flow_id)
+        etag = make_etag("active-run", flow_id, active_run.id if active_run else None, row_version(active_run))
+        not_modified = conditional_get(request, response, etag, row_version(active_run))
+        if not_modified:
+            return not_modified
         return FlowRunResponse.from_orm(active_run) if active_run else None
     except HTTPException:
         raise
@@ -118,7 +138,7 @@ async def get_active_flow_run(flow_id: int, db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
-async def get_latest_flow_run(flow_id: int, db: Session = Depends(get_db)):
+async def get_latest_flow_run(flow_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get the most recent run for the specified flow"""
     try:
         # Verify flow exists
@@ -130,6 +150,10 @@ async def get_latest_flow_run(flow_id: int, db: Session = Depends(get_db)):
         # Get latest flow run
         run_repo = FlowRunRepository(db)
         latest_run = run_repo.get_latest_flow_run(flow_id)
+        etag = make_etag("latest-run", flow_id, latest_run.id if latest_run else None, row_version(latest_run))
+        not_modified = conditional_get(request, response, etag, row_version(latest_run))
+        if not_modified:
+            return not_modified
         return FlowRunResponse.from_orm(latest_run) if latest_run else None
     except HTTPException:
         raise
@@ -145,7 +169,7 @@ async def get_latest_flow_run(flow_id: int, db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
-async def get_flow_run(flow_id: int, run_id: int, db: Session = Depends(get_db)):
+async def get_flow_run(flow_id: int, run_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a specific flow run by ID"""
     try:
         # Verify flow exists
@@ -160,6 +184,9 @@ async def get_flow_run(flow_id: int, run_id: int, db: Session = Depends(get_db))
         if not flow_run or flow_run.flow_id != flow_id:
             raise HTTPException(status_code=404, detail="Flow run not found")
         
+        not_modified = conditional_get(request, response, make_etag("run", flow_run.id, row_version(flow_run)), row_version(flow_run))
+        if not_modified:
+            return not_modified
         return FlowRunResponse.from_orm(flow_run)
     except HTTPException:
         raise
@@ -167,6 +194,103 @@ async def get_flow_run(flow_id: int, run_id: int, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=f"Failed to retrieve flow run: {str(e)}")
 
 
+@router.get(
+    "/{run_id}/cycles",
+    responses={
+        200: {"description": "Newline-delimited JSON stream of cycles in cycle_number order"},
+        404: {"model": ErrorResponse, "description": "Flow or run not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def stream_flow_run_cycles(flow_id: int, run_id: int, db: Session = Depends(get_db)):
+    """Stream all cycles of a flow run as newline-delimited JSON, ordered by cycle_number"""
+    try:
+        # Verify run exists and belongs to this flow
+        run_repo = FlowRunRepository(db)
+        flow_run = run_repo.get_flow_run_by_id(run_id)
+        if not flow_run or flow_run.flow_id != flow_id:
+            raise HTTPException(status_code=404, detail="Flow run not found")
+
+        def cycle_generator():
+            # The request-scoped session is closed before streaming starts, so use our own
+            stream_db = SessionLocal()
+            try:
+                cycle_repo = FlowRunCycleRepository(stream_db)
+                for cycle in cycle_repo.iter_cycles(run_id):
+                    yield FlowRunCycleResponse.from_orm(cycle).model_dump_json() + "\n"
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(cycle_generator(), media_type="application/x-ndjson")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to stream flow run cycles: {str(e)}")
+
+
+@router.get(
+    "/{run_id}/trace",
+    response_model=FlowRunTraceResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Flow or run not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def get_flow_run_trace(flow_id: int, run_id: int, db: Session = Depends(get_db)):
+    """Get the execution timelines of a flow run with per-agent and per-model totals"""
+    try:
+        # Verify run exists and belongs to this flow
+        run_repo = FlowRunRepository(db)
+        flow_run = run_repo.get_flow_run_by_id(run_id)
+        if not flow_run or flow_run.flow_id != flow_id:
+            raise HTTPException(status_code=404, detail="Flow run not found")
+
+        by_agent, by_model, cycles = {}, {}, []
+        llm_calls_count = api_calls_count = 0
+        estimated_cost = 0.0
+        for cycle in FlowRunCycleRepository(db).iter_cycles(run_id):
+            llm_calls_count += cycle.llm_calls_count or 0
+            api_calls_count += cycle.api_calls_count or 0
+            estimated_cost += float(cycle.estimated_cost or 0)
+
+            timeline = cycle.execution_timeline or {}
+            summary = summarize_timeline(timeline)
+            _merge_totals(by_agent, summary["by_agent"])
+            _merge_totals(by_model, summary["by_model"])
+            cycles.append({
+                "cycle_number": cycle.cycle_number,
+                "status": cycle.status,
+                "trigger_reason": cycle.trigger_reason,
+                "started_at": cycle.started_at,
+                "completed_at": cycle.completed_at,
+                # None for cycles without a recorded timeline (e.g. archived or pre-timeline runs)
+                "timeline": cycle.execution_timeline,
+            })
+
+        return FlowRunTraceResponse(
+            flow_run_id=run_id,
+            total_cycles=len(cycles),
+            llm_calls_count=llm_calls_count,
+            api_calls_count=api_calls_count,
+            estimated_cost=estimated_cost,
+            by_agent=by_agent,
+            by_model=by_model,
+            cycles=cycles,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get flow run trace: {str(e)}")
+
+
+def _merge_totals(totals: dict, summary: dict) -> None:
+    """Add one cycle's per-key numeric totals into the run-wide totals"""
+    for key, values in summary.items():
+        merged = totals.setdefault(key, {})
+        for name, value in values.items():
+            merged[name] = merged.get(name, 0) + value
+
+
 @router.put(
     "/{run_id}",
     response_model=FlowRunResponse,
@@ -236,9 +360,12 @@ async def delete_flow_run(flow_id: int, run_id: int, db: Session = Depends(get_d
         if not existing_run or existing_run.flow_id != flow_id:
             raise HTTPException(status_code=404, detail="Flow run not found")
         
+        # Read before the delete: the row is detached once the session commits
+        archive_path = existing_run.archive_path
         success = run_repo.delete_flow_run(run_id)
         if not success:
             raise HTTPException(status_code=404, detail="Flow run not found")
+        RetentionService(db).delete_run_archive(archive_path)
         
         return {"message": "Flow run deleted successfully"}
     except HTTPException:
@@ -267,6 +394,7 @@ async def delete_all_flow_runs(flow_id: int, db: Session = Depends(get_db)):
         # Delete all flow runs
         run_repo = FlowRunRepository(db)
         deleted_count = run_repo.delete_flow_runs_by_flow_id(flow_id)
+        RetentionService(db).delete_flow_archives(flow_id)
         
         return {"message": f"Deleted {deleted_count} flow runs successfully"}
     except HTTPException:
@@ -300,4 +428,39 @@ async def get_flow_run_count(flow_id: int, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get flow run count: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to get flow run count: {str(e)}")
+
+
+@router.post(
+    "/{run_id}/restore",
+    response_model=FlowRunResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Flow, run or archive file not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+def restore_flow_run(flow_id: int, run_id: int, db: Session = Depends(get_db)):
+    """Bring an archived flow run's results back into the database"""
+    # Plain def: decompressing the archive is blocking, so this runs in FastAPI's threadpool
+    try:
+        # Verify flow exists
+        flow_repo = FlowRepository(db)
+        flow = flow_repo.get_flow_by_id(flow_id)
+        if not flow:
+            raise HTTPException(status_code=404, detail="Flow not found")
+        
+        run_repo = FlowRunRepository(db)
+        flow_run = run_repo.get_flow_run_by_id(run_id)
+        if not flow_run or flow_run.flow_id != flow_id:
+            raise HTTPException(status_code=404, detail="Flow run not found")
+        
+        try:
+            flow_run = RetentionService(db).restore_run(flow_run)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        
+        return FlowRunResponse.from_orm(flow_run)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to restore flow run: {str(e)}")
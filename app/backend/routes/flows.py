@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.backend.database import get_db
 from app.backend.repositories.flow_repository import FlowRepository
+from app.backend.services.http_cache import conditional_get, make_etag, row_version
+from app.backend.services.retention_service import RetentionService
 from app.backend.models.schemas import (
     FlowCreateRequest, 
     FlowUpdateRequest, 
@@ -49,10 +51,15 @@ async def create_flow(request: FlowCreateRequest, db: Session = Depends(get_db))
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
-async def get_flows(include_templates: bool = True, db: Session = Depends(get_db)):
+async def get_flows(request: Request, response: Response, include_templates: bool = True, db: Session = Depends(get_db)):
     """Get all flows (summary view)"""
     try:
         repo = FlowRepository(db)
+        # Answer polling with 304 before loading and serializing the flows
+        etag = make_etag("flows", include_templates, *repo.get_flows_version(include_templates=include_templates))
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
         flows = repo.get_all_flows(include_templates=include_templates)
         return [FlowSummaryResponse.from_orm(flow) for flow in flows]
     except Exception as e:
@@ -67,13 +74,16 @@ async def get_flows(include_templates: bool = True, db: Session = Depends(get_db
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
-async def get_flow(flow_id: int, db: Session = Depends(get_db)):
+async def get_flow(flow_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a specific flow by ID"""
     try:
         repo = FlowRepository(db)
         flow = repo.get_flow_by_id(flow_id)
         if not flow:
             raise HTTPException(status_code=404, detail="Flow not found")
+        not_modified = conditional_get(request, response, make_etag("flow", flow.id, row_version(flow)), row_version(flow))
+        if not_modified:
+            return not_modified
         return FlowResponse.from_orm(flow)
     except HTTPException:
         raise
@@ -128,6 +138,7 @@ async def delete_flow(flow_id: int, db: Session = Depends(get_db)):
         success = repo.delete_flow(flow_id)
         if not success:
             raise HTTPException(status_code=404, detail="Flow not found")
+        RetentionService(db).delete_flow_archives(flow_id)
         return {"message": "Flow deleted successfully"}
     except HTTPException:
         raise
@@ -2,34 +2,101 @@ from fastapi import APIRouter, HTTPException, Request, Depends
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import asyncio
+import logging
 
 from app.backend.database import get_db
-from app.backend.models.schemas import ErrorResponse, HedgeFundRequest, BacktestRequest, BacktestDayResult, BacktestPerformanceMetrics
+from app.backend.models.schemas import ErrorResponse, HedgeFundRequest, BacktestRequest, BacktestReplayRequest, BacktestDayResult, BacktestPerformanceMetrics, BacktestResponse
 from app.backend.models.events import StartEvent, ProgressUpdateEvent, ErrorEvent, CompleteEvent
 from app.backend.services.graph import create_graph, parse_hedge_fund_response, run_graph_async
 from app.backend.services.portfolio import create_portfolio
-from app.backend.services.backtest_service import BacktestService
 from app.backend.services.api_key_service import ApiKeyService
-from src.utils.progress import progress
-from src.utils.analysts import get_agents_list
+from app.backend.repositories.flow_run_repository import FlowRunRepository
+from app.backend.repositories.flow_run_cycle_repository import FlowRunCycleRepository
+from app.backend.services.ollama_service import ollama_service
+from app.backend.services.metrics import ACTIVE_BACKTESTS, ACTIVE_RUNS, SSE_QUEUE_DEPTH
+from app.backend.services.run_timeline import RunTimeline, save_timeline_cycle
+from app.backend.services.prefetch import RUN_PREFETCH_ENABLED, check_prefetch_hits, prefetch_market_data, required_calls
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/hedge-fund")
 
+
+async def reserve_ollama_models(request_data) -> tuple:
+    """Return the request's Ollama models and their memory reservation, rejecting runs that exceed the budget.
+
+    The reservation must be released with ollama_service.release_memory() when the run ends.
+    """
+    ollama_models = ollama_service.get_models_for_request(request_data)
+    if not ollama_models:
+        return ollama_models, None
+    budget = await ollama_service.reserve_memory(ollama_models)
+    if not budget["fits"]:
+        in_use = f" alongside {', '.join(budget['other_models'])}" if budget["other_models"] else ""
+        raise HTTPException(
+            status_code=400,
+            detail=f"Local models {', '.join(ollama_models)} need ~{budget['required_bytes'] / 1024 ** 3:.1f} GB{in_use}, "
+                   f"over the {budget['budget_bytes'] / 1024 ** 3:.1f} GB Ollama memory budget",
+        )
+    return ollama_models, budget["reservation_id"]
+
+
+async def warm_up_ollama_models(ollama_models: list):
+    """Pre-load local models before the graph starts, yielding a progress event per model."""
+    for result in await ollama_service.warm_up_models(ollama_models):
+        if not result["success"]:
+            status = f"Failed to load {result['model_name']}: {result['error']}"
+        elif result["already_loaded"]:
+            status = f"{result['model_name']} already loaded"
+        else:
+            status = f"Loaded {result['model_name']} in {result['elapsed_seconds']:.1f}s"
+        yield ProgressUpdateEvent(agent="ollama", ticker=None, status=status, timestamp=None, analysis=None).to_sse()
+
+async def prefetch_run_data(request_data: HedgeFundRequest):
+    """Prefetch market data for a run, yielding a progress event before and after."""
+    calls = required_calls(request_data.get_agent_ids())
+    functions = sorted({call.function for call in calls})
+    yield ProgressUpdateEvent(
+        agent="prefetch", ticker=None, status=f"Prefetching {', '.join(functions)}", timestamp=None, analysis=None
+    ).to_sse()
+    summary = await prefetch_market_data(
+        request_data.tickers,
+        calls=calls,
+        start_date=request_data.get_start_date(),
+        end_date=request_data.end_date,
+        api_key=(request_data.api_keys or {}).get("FINANCIAL_DATASETS_API_KEY"),
+    )
+    status = f"Prefetched {summary['requests']} datasets in {summary['seconds']:.1f}s"
+    if summary["failed"]:
+        status += f" ({summary['failed']} failed)"
+    yield ProgressUpdateEvent(agent="prefetch", ticker=None, status=status, timestamp=None, analysis=None).to_sse()
+
 @router.post(
     path="/run",
     responses={
         200: {"description": "Successful response with streaming updates"},
         400: {"model": ErrorResponse, "description": "Invalid request parameters"},
+        404: {"model": ErrorResponse, "description": "Flow run not found"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def run(request_data: HedgeFundRequest, request: Request, db: Session = Depends(get_db)):
+    reservation_id = None
     try:
+        # The timeline is saved as a cycle of this run, so it has to exist
+        if request_data.flow_run_id and not FlowRunRepository(db).get_flow_run_by_id(request_data.flow_run_id):
+            raise HTTPException(status_code=404, detail="Flow run not found")
+
+        from src.utils.progress import progress
+
         # Hydrate API keys from database if not provided
         if not request_data.api_keys:
             api_key_service = ApiKeyService(db)
             request_data.api_keys = api_key_service.get_api_keys_dict()
 
+        # Refuse runs whose local models can't be resident together (held until the stream ends)
+        ollama_models, reservation_id = await reserve_ollama_models(request_data)
+
         # Create the portfolio
         portfolio = create_portfolio(request_data.initial_cash, request_data.margin_requirement, request_data.tickers, request_data.portfolio_positions)
 
@@ -65,35 +132,68 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
             progress_queue = asyncio.Queue()
             run_task = None
             disconnect_task = None
+            prefetch = RUN_PREFETCH_ENABLED and not request_data.is_offline()
+            # Record a timeline for flow runs, and for prefetched runs to check the agents hit the data cache
+            timeline = RunTimeline() if request_data.flow_run_id or prefetch else None
 
             # Simple handler to add updates to the queue
             def progress_handler(agent_name, ticker, status, analysis, timestamp):
                 event = ProgressUpdateEvent(agent=agent_name, ticker=ticker, status=status, timestamp=timestamp, analysis=analysis)
                 progress_queue.put_nowait(event)
+                SSE_QUEUE_DEPTH.inc(endpoint="run")
+
+            async def save_timeline(status: str, **fields):
+                """Record the run as a flow-run cycle, whether it completed or failed."""
+                if not request_data.flow_run_id:
+                    return
+                try:
+                    await asyncio.to_thread(
+                        save_timeline_cycle,
+                        request_data.flow_run_id,
+                        timeline,
+                        trigger_reason="manual",
+                        status=status,
+                        **fields,
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to save execution timeline for flow run {request_data.flow_run_id}: {e}")
 
             # Register our handler with the progress tracker
             progress.register_handler(progress_handler)
 
             try:
+                ACTIVE_RUNS.inc()
+
+                # Send initial message
+                yield StartEvent().to_sse()
+
+                # Load local models up front so the first agent call doesn't pay for it
+                async for event in warm_up_ollama_models(ollama_models):
+                    yield event
+
+                # Load the data the selected agents need in parallel, so they start on a warm cache
+                if prefetch:
+                    async for event in prefetch_run_data(request_data):
+                        yield event
+
                 # Start the graph execution in a background task
                 run_task = asyncio.create_task(
                     run_graph_async(
                         graph=graph,
                         portfolio=portfolio,
                         tickers=request_data.tickers,
-                        start_date=request_data.start_date,
+                        # Same window as the prefetch, so the agents' price calls hit the data cache
+                        start_date=request_data.get_start_date(),
                         end_date=request_data.end_date,
                         model_name=request_data.model_name,
                         model_provider=model_provider,
                         request=request_data,  # Pass the full request for agent-specific model access
+                        timeline=timeline,
                     )
                 )
                 
                 # Start the disconnect detection task
                 disconnect_task = asyncio.create_task(wait_for_disconnect())
-                
-                # Send initial message
-                yield StartEvent().to_sse()
 
                 # Stream progress updates until run_task completes or client disconnects
                 while not run_task.done():
@@ -110,6 +210,7 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
                     # Either get a progress update or wait a bit
                     try:
                         event = await asyncio.wait_for(progress_queue.get(), timeout=1.0)
+                        SSE_QUEUE_DEPTH.dec(endpoint="run")
                         yield event.to_sse()
                     except asyncio.TimeoutError:
                         # Just continue the loop
@@ -121,16 +222,30 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
                 except asyncio.CancelledError:
                     print("Task was cancelled")
                     return
+                except Exception as e:
+                    await save_timeline(status="ERROR", error_message=str(e))
+                    raise
 
                 if not result or not result.get("messages"):
+                    await save_timeline(status="ERROR", error_message="Failed to generate hedge fund decisions")
                     yield ErrorEvent(message="Failed to generate hedge fund decisions").to_sse()
                     return
 
+                decisions = parse_hedge_fund_response(result.get("messages", [])[-1].content)
+                analyst_signals = result.get("data", {}).get("analyst_signals", {})
+
+                await save_timeline(status="COMPLETED", analyst_signals=analyst_signals, trading_decisions=decisions)
+
+                if prefetch:
+                    hits = check_prefetch_hits(timeline)
+                    status = f"Data cache served {hits['hit']}/{hits['hit'] + hits['miss']} prefetched calls"
+                    yield ProgressUpdateEvent(agent="prefetch", ticker=None, status=status, timestamp=None, analysis=None).to_sse()
+
                 # Send the final result
                 final_data = CompleteEvent(
                     data={
-                        "decisions": parse_hedge_fund_response(result.get("messages", [])[-1].content),
-                        "analyst_signals": result.get("data", {}).get("analyst_signals", {}),
+                        "decisions": decisions,
+                        "analyst_signals": analyst_signals,
                         "current_prices": result.get("data", {}).get("current_prices", {}),
                     }
                 )
@@ -142,6 +257,9 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
             finally:
                 # Clean up
                 progress.unregister_handler(progress_handler)
+                ACTIVE_RUNS.dec()
+                ollama_service.release_memory(reservation_id)
+                SSE_QUEUE_DEPTH.dec(progress_queue.qsize(), endpoint="run")
                 if run_task and not run_task.done():
                     run_task.cancel()
                     try:
@@ -155,8 +273,10 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
         return StreamingResponse(event_generator(), media_type="text/event-stream")
 
     except HTTPException as e:
+        ollama_service.release_memory(reservation_id)
         raise e
     except Exception as e:
+        ollama_service.release_memory(reservation_id)
         raise HTTPException(status_code=500, detail=f"An error occurred while processing the request: {str(e)}")
 
 @router.post(
@@ -164,17 +284,29 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
     responses={
         200: {"description": "Successful response with streaming backtest updates"},
         400: {"model": ErrorResponse, "description": "Invalid request parameters"},
+        404: {"model": ErrorResponse, "description": "Flow run not found"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def backtest(request_data: BacktestRequest, request: Request, db: Session = Depends(get_db)):
     """Run a continuous backtest over a time period with streaming updates."""
+    reservation_id = None
     try:
+        # The timeline is saved as a cycle of this run, so it has to exist
+        if request_data.flow_run_id and not FlowRunRepository(db).get_flow_run_by_id(request_data.flow_run_id):
+            raise HTTPException(status_code=404, detail="Flow run not found")
+
+        from src.utils.progress import progress
+        from app.backend.services.backtest_service import BacktestService
+
         # Hydrate API keys from database if not provided
         if not request_data.api_keys:
             api_key_service = ApiKeyService(db)
             request_data.api_keys = api_key_service.get_api_keys_dict()
 
+        # Refuse backtests whose local models can't be resident together (held until the stream ends)
+        ollama_models, reservation_id = await reserve_ollama_models(request_data)
+
         # Convert model_provider to string if it's an enum
         model_provider = request_data.model_provider
         if hasattr(model_provider, "value"):
@@ -203,6 +335,7 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
             model_name=request_data.model_name,
             model_provider=model_provider,
             request=request_data,  # Pass the full request for agent-specific model access
+            keep_warm_models=ollama_models,
         )
 
         # Function to detect client disconnection
@@ -226,6 +359,7 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
             def progress_handler(agent_name, ticker, status, analysis, timestamp):
                 event = ProgressUpdateEvent(agent=agent_name, ticker=ticker, status=status, timestamp=timestamp, analysis=analysis)
                 progress_queue.put_nowait(event)
+                SSE_QUEUE_DEPTH.inc(endpoint="backtest")
 
             # Progress callback to handle backtest-specific updates
             def progress_callback(update):
@@ -238,6 +372,7 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
                         analysis=None
                     )
                     progress_queue.put_nowait(event)
+                    SSE_QUEUE_DEPTH.inc(endpoint="backtest")
                 elif update["type"] == "backtest_result":
                     # Convert day result to a streaming event
                     backtest_result = BacktestDayResult(**update["data"])
@@ -254,11 +389,21 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
                         analysis=analysis_data
                     )
                     progress_queue.put_nowait(event)
+                    SSE_QUEUE_DEPTH.inc(endpoint="backtest")
 
             # Register our handler with the progress tracker to capture agent updates
             progress.register_handler(progress_handler)
             
             try:
+                ACTIVE_BACKTESTS.inc()
+
+                # Send initial message
+                yield StartEvent().to_sse()
+
+                # Load local models up front so the first day doesn't pay for it
+                async for event in warm_up_ollama_models(ollama_models):
+                    yield event
+
                 # Start the backtest in a background task
                 backtest_task = asyncio.create_task(
                     backtest_service.run_backtest_async(progress_callback=progress_callback)
@@ -266,9 +411,6 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
                 
                 # Start the disconnect detection task
                 disconnect_task = asyncio.create_task(wait_for_disconnect())
-                
-                # Send initial message
-                yield StartEvent().to_sse()
 
                 # Stream progress updates until backtest_task completes or client disconnects
                 while not backtest_task.done():
@@ -285,6 +427,7 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
                     # Either get a progress update or wait a bit
                     try:
                         event = await asyncio.wait_for(progress_queue.get(), timeout=1.0)
+                        SSE_QUEUE_DEPTH.dec(endpoint="backtest")
                         yield event.to_sse()
                     except asyncio.TimeoutError:
                         # Just continue the loop
@@ -318,6 +461,9 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
             finally:
                 # Clean up
                 progress.unregister_handler(progress_handler)
+                ACTIVE_BACKTESTS.dec()
+                ollama_service.release_memory(reservation_id)
+                SSE_QUEUE_DEPTH.dec(progress_queue.qsize(), endpoint="backtest")
                 if backtest_task and not backtest_task.done():
                     backtest_task.cancel()
                     try:
@@ -331,11 +477,63 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
         return StreamingResponse(event_generator(), media_type="text/event-stream")
 
     except HTTPException as e:
+        ollama_service.release_memory(reservation_id)
         raise e
     except Exception as e:
+        ollama_service.release_memory(reservation_id)
         raise HTTPException(status_code=500, detail=f"An error occurred while processing the backtest request: {str(e)}")
 
 
+@router.post(
+    path="/backtest/replay",
+    response_model=BacktestResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Flow run has no recorded backtest days"},
+        404: {"model": ErrorResponse, "description": "Flow run not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def replay_backtest(request_data: BacktestReplayRequest, db: Session = Depends(get_db)):
+    """Re-simulate a recorded backtest with new capital, margin or positions, reusing its stored decisions."""
+    try:
+        from app.backend.services.backtest_service import BacktestService, replay_days_from_cycles
+
+        if not FlowRunRepository(db).get_flow_run_by_id(request_data.flow_run_id):
+            raise HTTPException(status_code=404, detail="Flow run not found")
+
+        days = replay_days_from_cycles(FlowRunCycleRepository(db).get_all_cycles(request_data.flow_run_id))
+        days = [day for day in days if day["date"] and day["current_prices"]]
+        if not days:
+            raise HTTPException(status_code=400, detail="Flow run has no recorded backtest days to replay")
+
+        tickers = request_data.tickers or list(days[0]["current_prices"].keys())
+        portfolio = create_portfolio(
+            request_data.initial_capital,
+            request_data.margin_requirement,
+            tickers,
+            request_data.portfolio_positions,
+        )
+        backtest_service = BacktestService(
+            graph=None,
+            portfolio=portfolio,
+            tickers=tickers,
+            start_date=days[0]["date"],
+            end_date=days[-1]["date"],
+            initial_capital=request_data.initial_capital,
+        )
+        result = await backtest_service.replay_backtest_async(days, mark_to_market_only=request_data.mark_to_market_only)
+
+        return BacktestResponse(
+            results=[BacktestDayResult(**day_result) for day_result in result["results"]],
+            performance_metrics=BacktestPerformanceMetrics(**result["performance_metrics"]),
+            final_portfolio=result["final_portfolio"],
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to replay backtest: {str(e)}")
+
+
 @router.get(
     path="/agents",
     responses={
@@ -346,6 +544,8 @@ async def backtest(request_data: BacktestRequest, request: Request, db: Session
 async def get_agents():
     """Get the list of available agents."""
     try:
+        from src.utils.analysts import get_agents_list
+
         return {"agents": get_agents_list()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve agents: {str(e)}")
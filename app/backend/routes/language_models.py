@@ -2,14 +2,10 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 
 from app.backend.models.schemas import ErrorResponse
-from app.backend.services.ollama_service import OllamaService
-from src.llm.models import get_models_list
+from app.backend.services.ollama_service import ollama_service
 
 router = APIRouter(prefix="/language-models")
 
-# Initialize Ollama service
-ollama_service = OllamaService()
-
 @router.get(
     path="/",
     responses={
@@ -20,6 +16,8 @@ ollama_service = OllamaService()
 async def get_language_models():
     """Get the list of available cloud-based and Ollama language models."""
     try:
+        from src.llm.models import get_models_list
+
         # Start with cloud models
         models = get_models_list()
         
@@ -41,6 +39,8 @@ async def get_language_models():
 async def get_language_model_providers():
     """Get the list of available model providers with their models grouped."""
     try:
+        from src.llm.models import get_models_list
+
         models = get_models_list()
         
         # Group models by provider
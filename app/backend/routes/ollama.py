@@ -30,6 +30,24 @@ class RecommendedModel(BaseModel):
     model_name: str
     provider: str
 
+class WarmUpRequest(BaseModel):
+    model_names: List[str]
+    keep_alive: str | None = None
+
+class WarmUpResult(BaseModel):
+    model_name: str
+    success: bool
+    already_loaded: bool
+    load_seconds: float | None = None
+    elapsed_seconds: float
+    error: str | None = None
+
+class ResidentModel(BaseModel):
+    model_name: str
+    size_bytes: int
+    size_vram_bytes: int | None = None
+    expires_at: str | None = None
+
 class ProgressResponse(BaseModel):
     status: str
     percentage: float | None = None
@@ -48,7 +66,7 @@ class ProgressResponse(BaseModel):
 async def get_ollama_status():
     """Get Ollama installation and server status."""
     try:
-        status = await ollama_service.check_ollama_status()
+        status = await ollama_service.get_status()
         return OllamaStatusResponse(**status)
     except Exception as e:
         logger.error(f"Failed to check Ollama status: {e}")
@@ -66,7 +84,7 @@ async def start_ollama_server():
     """Start the Ollama server."""
     try:
         # First check if it's already running
-        status = await ollama_service.check_ollama_status()
+        status = await ollama_service.get_status()
         if not status["installed"]:
             raise HTTPException(status_code=400, detail="Ollama is not installed on this system")
         
@@ -98,7 +116,7 @@ async def stop_ollama_server():
     """Stop the Ollama server."""
     try:
         # First check if it's installed
-        status = await ollama_service.check_ollama_status()
+        status = await ollama_service.get_status()
         if not status["installed"]:
             raise HTTPException(status_code=400, detail="Ollama is not installed on this system")
         
@@ -132,7 +150,7 @@ async def download_model(request: ModelRequest):
         logger.info(f"Download request for model: {request.model_name}")
         
         # Check current status
-        status = await ollama_service.check_ollama_status()
+        status = await ollama_service.get_status()
         logger.debug(f"Current Ollama status: installed={status['installed']}, running={status['running']}")
         
         if not status["installed"]:
@@ -168,7 +186,7 @@ async def download_model_with_progress(request: ModelRequest):
         logger.info(f"Progress download request for model: {request.model_name}")
         
         # Check current status
-        status = await ollama_service.check_ollama_status()
+        status = await ollama_service.get_status()
         logger.debug(f"Current Ollama status: installed={status['installed']}, running={status['running']}")
         
         if not status["installed"]:
@@ -253,7 +271,7 @@ async def delete_model(model_name: str):
         logger.info(f"Delete request for model: {model_name}")
         
         # Check current status
-        status = await ollama_service.check_ollama_status()
+        status = await ollama_service.get_status()
         logger.debug(f"Current Ollama status: installed={status['installed']}, running={status['running']}")
         
         if not status["installed"]:
@@ -316,4 +334,50 @@ async def cancel_download(model_name: str):
         raise
     except Exception as e:
         logger.error(f"Unexpected error cancelling download for {model_name}: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to cancel download: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to cancel download: {str(e)}")
+
+@router.get(
+    "/models/resident",
+    response_model=List[ResidentModel],
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def get_resident_models():
+    """Get the models currently loaded in Ollama memory."""
+    try:
+        models = await ollama_service.get_resident_models()
+        return [ResidentModel(**model) for model in models]
+    except Exception as e:
+        logger.error(f"Failed to get resident models: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get resident models: {str(e)}")
+
+@router.post(
+    "/models/warmup",
+    response_model=List[WarmUpResult],
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad request"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def warm_up_models(request: WarmUpRequest):
+    """Load models into memory and keep them resident for keep_alive."""
+    try:
+        status = await ollama_service.get_status()
+        if not status["running"]:
+            raise HTTPException(status_code=400, detail="Ollama server is not running. Please start it first.")
+        
+        budget = await ollama_service.check_memory_budget(request.model_names)
+        if not budget["fits"]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Models need ~{budget['required_bytes'] / 1024 ** 3:.1f} GB, over the {budget['budget_bytes'] / 1024 ** 3:.1f} GB Ollama memory budget",
+            )
+        
+        results = await ollama_service.warm_up_models(request.model_names, keep_alive=request.keep_alive)
+        return [WarmUpResult(**result) for result in results]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error warming up models: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to warm up models: {str(e)}")
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.backend.database import get_db
+from app.backend.repositories.flow_repository import FlowRepository
+from app.backend.services.retention_service import RetentionService
+from app.backend.models.schemas import (
+    RetentionPolicy,
+    RetentionPolicyResponse,
+    RetentionApplyResponse,
+    ErrorResponse
+)
+
+router = APIRouter(prefix="/retention", tags=["retention"])
+
+
+def _policy_response(flow, service: RetentionService) -> RetentionPolicyResponse:
+    return RetentionPolicyResponse(
+        flow_id=flow.id,
+        override=RetentionPolicy(**flow.retention_policy) if flow.retention_policy else None,
+        effective=RetentionPolicy(**service.get_effective_policy(flow)),
+    )
+
+
+@router.get(
+    "/flows/{flow_id}/policy",
+    response_model=RetentionPolicyResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Flow not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def get_retention_policy(flow_id: int, db: Session = Depends(get_db)):
+    """Get the retention policy for a flow"""
+    try:
+        flow = FlowRepository(db).get_flow_by_id(flow_id)
+        if not flow:
+            raise HTTPException(status_code=404, detail="Flow not found")
+        return _policy_response(flow, RetentionService(db))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve retention policy: {str(e)}")
+
+
+@router.put(
+    "/flows/{flow_id}/policy",
+    response_model=RetentionPolicyResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Flow not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def update_retention_policy(flow_id: int, request: RetentionPolicy, db: Session = Depends(get_db)):
+    """Set the retention policy for a flow"""
+    try:
+        flow = FlowRepository(db).update_retention_policy(flow_id, request.model_dump())
+        if not flow:
+            raise HTTPException(status_code=404, detail="Flow not found")
+        return _policy_response(flow, RetentionService(db))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update retention policy: {str(e)}")
+
+
+@router.delete(
+    "/flows/{flow_id}/policy",
+    response_model=RetentionPolicyResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Flow not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def reset_retention_policy(flow_id: int, db: Session = Depends(get_db)):
+    """Clear a flow's retention override so the defaults apply"""
+    try:
+        flow = FlowRepository(db).update_retention_policy(flow_id, None)
+        if not flow:
+            raise HTTPException(status_code=404, detail="Flow not found")
+        return _policy_response(flow, RetentionService(db))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reset retention policy: {str(e)}")
+
+
+@router.post(
+    "/apply",
+    response_model=RetentionApplyResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Flow not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+def apply_retention(
+    flow_id: Optional[int] = Query(None, description="Only apply the policy of this flow"),
+    vacuum: bool = Query(True, description="Run an incremental VACUUM afterwards"),
+    db: Session = Depends(get_db)
+):
+    """Archive runs outside their flow's retention policy"""
+    # Plain def: gzip archiving and VACUUM are blocking, so FastAPI runs this in its threadpool
+    # instead of stalling the event loop (and every SSE stream) for the duration
+    try:
+        if flow_id is not None and not FlowRepository(db).get_flow_by_id(flow_id):
+            raise HTTPException(status_code=404, detail="Flow not found")
+        return RetentionApplyResponse(**RetentionService(db).apply_policies(flow_id=flow_id, vacuum=vacuum))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to apply retention policies: {str(e)}")
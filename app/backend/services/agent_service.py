@@ -1,8 +1,14 @@
+import time
 from functools import partial
-from typing import Callable
-from src.graph.state import AgentState
+from typing import TYPE_CHECKING, Callable
 
-def create_agent_function(agent_function: Callable, agent_id: str) -> Callable[[AgentState], dict]:
+from app.backend.services.metrics import AGENT_NODE_DURATION
+from app.backend.services.run_timeline import current_timeline
+
+if TYPE_CHECKING:
+    from src.graph.state import AgentState
+
+def create_agent_function(agent_function: Callable, agent_id: str) -> Callable[["AgentState"], dict]:
     """
     Creates a new function from an agent function that accepts an agent_id.
 
@@ -10,4 +16,22 @@ def create_agent_function(agent_function: Callable, agent_id: str) -> Callable[[
     :param agent_id: The ID to be passed to the agent.
     :return: A new function that can be called by LangGraph.
     """
-    return partial(agent_function, agent_id=agent_id) 
\ No newline at end of file
+    from app.backend.services.graph import extract_base_agent_key
+
+    node_function = partial(agent_function, agent_id=agent_id)
+    # Label by base agent key so unique node suffixes don't explode metric cardinality
+    metric_label = extract_base_agent_key(agent_id)
+
+    def timed_node(state):
+        started = time.perf_counter()
+        try:
+            timeline = current_timeline.get()
+            if timeline is None:
+                return node_function(state)
+            with timeline.node(agent_id):
+                return node_function(state)
+        finally:
+            AGENT_NODE_DURATION.observe(time.perf_counter() - started, agent=metric_label)
+
+    timed_node.__name__ = getattr(agent_function, "__name__", "agent")
+    return timed_node 
\ No newline at end of file
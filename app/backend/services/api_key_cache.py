@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Safety net for writes made by another process (the in-process writes invalidate immediately)
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "300"))
+
+# How often pending last_used timestamps are written back in one transaction
+LAST_USED_FLUSH_INTERVAL = float(os.getenv("API_KEY_LAST_USED_FLUSH_INTERVAL", "30"))
+
+
+class ApiKeyCache:
+    """Process-wide cache of active API keys (provider -> key value)."""
+
+    def __init__(self, ttl: float = API_KEY_CACHE_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._keys: Optional[Dict[str, str]] = None
+        self._loaded_at = 0.0
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Bumped on every invalidation; lets downstream caches key on the key set."""
+        return self._version
+
+    def get_all(self, loader: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        """Return the cached keys, calling loader() to (re)populate when needed."""
+        with self._lock:
+            if self._keys is not None and time.monotonic() - self._loaded_at < self._ttl:
+                return dict(self._keys)
+            version = self._version
+
+        keys = loader()
+
+        with self._lock:
+            # An invalidation raced with the load, so the result may already be stale
+            if self._version == version:
+                self._keys = dict(keys)
+                self._loaded_at = time.monotonic()
+        return dict(keys)
+
+    def invalidate(self) -> None:
+        """Drop the cached keys; called by ApiKeyRepository after every write."""
+        with self._lock:
+            self._keys = None
+            self._version += 1
+
+
+class LastUsedTracker:
+    """Collects last_used timestamps in memory and writes them back in batches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, datetime] = {}
+
+    def mark_used(self, provider: str) -> None:
+        with self._lock:
+            self._pending[provider] = datetime.utcnow()
+
+    def flush(self) -> int:
+        """Persist all pending timestamps in one transaction. Returns the number of keys written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        # Imported here because the repository itself imports this module for invalidation
+        from app.backend.database.connection import SessionLocal
+        from app.backend.repositories.api_key_repository import ApiKeyRepository
+
+        db = SessionLocal()
+        try:
+            return ApiKeyRepository(db).bulk_update_last_used(pending)
+        except Exception:
+            # Put the timestamps back (without overwriting newer ones) so the next flush retries them
+            with self._lock:
+                for provider, used_at in pending.items():
+                    self._pending.setdefault(provider, used_at)
+            raise
+        finally:
+            db.close()
+
+
+async def run_last_used_flusher(interval: float = LAST_USED_FLUSH_INTERVAL) -> None:
+    """Background loop flushing pending last_used timestamps."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(last_used_tracker.flush)
+        except Exception as e:
+            logger.warning(f"Failed to flush API key last_used timestamps: {e}")
+
+
+# Global instances
+api_key_cache = ApiKeyCache()
+last_used_tracker = LastUsedTracker()
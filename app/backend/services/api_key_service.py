@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import Dict, Optional
 from app.backend.repositories.api_key_repository import ApiKeyRepository
+from app.backend.services.api_key_cache import api_key_cache
 
 
 class ApiKeyService:
@@ -12,12 +13,14 @@ class ApiKeyService:
     def get_api_keys_dict(self) -> Dict[str, str]:
         """
         Load all active API keys from database and return as a dictionary
-        suitable for injecting into requests
+        suitable for injecting into requests (served from the process-wide cache)
         """
-        api_keys = self.repository.get_all_api_keys(include_inactive=False)
-        return {key.provider: key.key_value for key in api_keys}
+        return api_key_cache.get_all(self._load_api_keys_dict)
     
     def get_api_key(self, provider: str) -> Optional[str]:
         """Get a specific API key by provider"""
-        api_key = self.repository.get_api_key_by_provider(provider)
-        return api_key.key_value if api_key else None 
\ No newline at end of file
+        return self.get_api_keys_dict().get(provider)
+    
+    def _load_api_keys_dict(self) -> Dict[str, str]:
+        api_keys = self.repository.get_all_api_keys(include_inactive=False)
+        return {key.provider: key.key_value for key in api_keys} 
\ No newline at end of file
@@ -4,16 +4,16 @@ import pandas as pd
 import numpy as np
 from typing import Callable, Dict, List, Optional, Any
 import asyncio
+import logging
 
-from src.tools.api import (
-    get_company_news,
-    get_price_data,
-    get_prices,
-    get_financial_metrics,
-    get_insider_trades,
-)
 from app.backend.services.graph import run_graph_async, parse_hedge_fund_response
 from app.backend.services.portfolio import create_portfolio
+from app.backend.services.ollama_service import ollama_service
+from app.backend.services.prefetch import END_DATE, START_DATE, DataCall, prefetch_market_data
+from app.backend.services.run_timeline import RunTimeline, save_timeline_cycle
+
+logger = logging.getLogger(__name__)
+
 
 class BacktestService:
     """
@@ -32,6 +32,7 @@ class BacktestService:
         model_name: str = "gpt-4.1",
         model_provider: str = "OpenAI",
         request: dict = {},
+        keep_warm_models: Optional[List[str]] = None,
     ):
         """
         Initialize the backtest service.
@@ -45,6 +46,7 @@ class BacktestService:
         :param model_name: Which LLM model name to use.
         :param model_provider: Which LLM provider.
         :param request: Request object containing API keys and other metadata.
+        :param keep_warm_models: Ollama models to keep resident between backtest days.
         """
         self.graph = graph
         self.portfolio = portfolio
@@ -55,6 +57,11 @@ class BacktestService:
         self.model_name = model_name
         self.model_provider = model_provider
         self.request = request
+        self.keep_warm_models = keep_warm_models or []
+        # Fully fake-provider requests run without any data API (synthetic prices)
+        self.offline = hasattr(request, "is_offline") and request.is_offline()
+        # Each day is recorded as a cycle of this flow run (with its execution timeline)
+        self.flow_run_id = getattr(request, "flow_run_id", None)
         self.portfolio_values = []
 
     def execute_trade(self, ticker: str, action: str, quantity: float, current_price: float) -> int:
@@ -219,18 +226,55 @@ class BacktestService:
 
         return total_value
 
-    def prefetch_data(self):
-        """Pre-fetch all data needed for the backtest period."""
+    async def prefetch_data(self):
+        """Pre-fetch all data needed for the backtest period (concurrently across tickers)."""
         end_date_dt = datetime.strptime(self.end_date, "%Y-%m-%d")
         start_date_dt = end_date_dt - relativedelta(years=1)
         start_date_str = start_date_dt.strftime("%Y-%m-%d")
         api_key = self.request.api_keys.get("FINANCIAL_DATASETS_API_KEY")
 
-        for ticker in self.tickers:
-            get_prices(ticker, start_date_str, self.end_date, api_key=api_key)
-            get_financial_metrics(ticker, self.end_date, limit=10, api_key=api_key)
-            get_insider_trades(ticker, self.end_date, start_date=self.start_date, limit=1000, api_key=api_key)
-            get_company_news(ticker, self.end_date, start_date=self.start_date, limit=1000, api_key=api_key)
+        return await prefetch_market_data(
+            self.tickers,
+            calls=[
+                DataCall.of("get_prices", start_date=start_date_str, end_date=END_DATE),
+                DataCall.of("get_financial_metrics", end_date=END_DATE, limit=10),
+                DataCall.of("get_insider_trades", end_date=END_DATE, start_date=START_DATE, limit=1000),
+                DataCall.of("get_company_news", end_date=END_DATE, start_date=START_DATE, limit=1000),
+            ],
+            start_date=self.start_date,
+            end_date=self.end_date,
+            api_key=api_key,
+        )
+
+    async def _save_cycle(
+        self,
+        timeline: RunTimeline,
+        current_date_str: str,
+        current_prices: Dict[str, float],
+        decisions: Dict[str, Any],
+        analyst_signals: Dict[str, Any],
+        executed_trades: Dict[str, int],
+        total_value: float,
+        status: str,
+        error_message: Optional[str],
+    ):
+        """Persist one backtest day as a flow-run cycle; failures never abort the backtest."""
+        try:
+            await asyncio.to_thread(
+                save_timeline_cycle,
+                self.flow_run_id,
+                timeline,
+                analyst_signals=analyst_signals,
+                trading_decisions=decisions,
+                executed_trades=executed_trades,
+                portfolio_snapshot={**self.portfolio, "total_value": total_value},
+                market_conditions={"date": current_date_str, "current_prices": current_prices},
+                trigger_reason="backtest",
+                status=status,
+                error_message=error_message,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save cycle for {current_date_str}: {e}")
 
     def _update_performance_metrics(self, performance_metrics: Dict[str, Any]):
         """Update performance metrics using daily returns."""
@@ -279,16 +323,10 @@ class BacktestService:
             performance_metrics["max_drawdown"] = 0.0
             performance_metrics["max_drawdown_date"] = None
 
-    async def run_backtest_async(self, progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
-        """
-        Run the backtest asynchronously with optional progress callbacks.
-        Uses the pre-compiled graph for trading decisions.
-        """
-        # Pre-fetch all data at the start
-        self.prefetch_data()
-
-        dates = pd.date_range(self.start_date, self.end_date, freq="B")
-        performance_metrics = {
+    def _start_tracking(self, first_date: Optional[pd.Timestamp]) -> Dict[str, Any]:
+        """Reset the portfolio value history and return fresh performance metrics."""
+        self.portfolio_values = [{"Date": first_date, "Portfolio Value": self.initial_capital}] if first_date is not None else []
+        return {
             "sharpe_ratio": 0.0,
             "sortino_ratio": 0.0,
             "max_drawdown": 0.0,
@@ -297,12 +335,148 @@ class BacktestService:
             "net_exposure": 0.0,
         }
 
-        # Initialize portfolio values
-        if len(dates) > 0:
-            self.portfolio_values = [{"Date": dates[0], "Portfolio Value": self.initial_capital}]
-        else:
-            self.portfolio_values = []
+    def _execute_decisions(self, decisions: Dict[str, Any], current_prices: Dict[str, float]) -> Dict[str, int]:
+        """Execute each ticker's decision (hold when missing) and return the executed quantities."""
+        executed_trades = {}
+        for ticker in self.tickers:
+            decision = decisions.get(ticker, {"action": "hold", "quantity": 0})
+            action, quantity = decision.get("action", "hold"), decision.get("quantity", 0)
+            executed_quantity = self.execute_trade(ticker, action, quantity, current_prices[ticker])
+            executed_trades[ticker] = executed_quantity
+        return executed_trades
+
+    def _record_day(
+        self,
+        current_date: pd.Timestamp,
+        current_prices: Dict[str, float],
+        decisions: Dict[str, Any],
+        analyst_signals: Dict[str, Any],
+        executed_trades: Dict[str, int],
+        total_value: float,
+        performance_metrics: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Track the day's portfolio value and exposures and build its result."""
+        # Calculate exposures
+        long_exposure = sum(self.portfolio["positions"][t]["long"] * current_prices[t] for t in self.tickers)
+        short_exposure = sum(self.portfolio["positions"][t]["short"] * current_prices[t] for t in self.tickers)
+        gross_exposure = long_exposure + short_exposure
+        net_exposure = long_exposure - short_exposure
+        long_short_ratio = long_exposure / short_exposure if short_exposure > 1e-9 else None
+
+        # Track portfolio value
+        self.portfolio_values.append({
+            "Date": current_date,
+            "Portfolio Value": total_value,
+            "Long Exposure": long_exposure,
+            "Short Exposure": short_exposure,
+            "Gross Exposure": gross_exposure,
+            "Net Exposure": net_exposure,
+            "Long/Short Ratio": long_short_ratio,
+        })
+
+        # Calculate performance metrics for this day
+        portfolio_return = (total_value / self.initial_capital - 1) * 100
+        
+        # Update performance metrics if we have enough data
+        if len(self.portfolio_values) > 2:
+            self._update_performance_metrics(performance_metrics)
+
+        # Build detailed result for this date (similar to CLI format)
+        date_result = {
+            "date": current_date.strftime("%Y-%m-%d"),
+            "portfolio_value": total_value,
+            "cash": self.portfolio["cash"],
+            "decisions": decisions,
+            "executed_trades": executed_trades,
+            "analyst_signals": analyst_signals,
+            "current_prices": current_prices,
+            "long_exposure": long_exposure,
+            "short_exposure": short_exposure,
+            "gross_exposure": gross_exposure,
+            "net_exposure": net_exposure,
+            "long_short_ratio": long_short_ratio,
+            "portfolio_return": portfolio_return,
+            "performance_metrics": performance_metrics.copy(),
+            # Add detailed trading information for each ticker
+            "ticker_details": []
+        }
+
+        # Build ticker details (similar to CLI format_backtest_row)
+        for ticker in self.tickers:
+            ticker_signals = {}
+            for agent_name, signals in analyst_signals.items():
+                if ticker in signals:
+                    ticker_signals[agent_name] = signals[ticker]
+
+            bullish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bullish"])
+            bearish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bearish"])
+            neutral_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "neutral"])
+
+            # Calculate net position value
+            pos = self.portfolio["positions"][ticker]
+            long_val = pos["long"] * current_prices[ticker]
+            short_val = pos["short"] * current_prices[ticker]
+            net_position_value = long_val - short_val
+
+            # Get the action and quantity from the decisions
+            action = decisions.get(ticker, {}).get("action", "hold")
+            quantity = executed_trades.get(ticker, 0)
+
+            ticker_detail = {
+                "ticker": ticker,
+                "action": action,
+                "quantity": quantity,
+                "price": current_prices[ticker],
+                "shares_owned": pos["long"] - pos["short"],  # net shares
+                "long_shares": pos["long"],
+                "short_shares": pos["short"],
+                "position_value": net_position_value,
+                "bullish_count": bullish_count,
+                "bearish_count": bearish_count,
+                "neutral_count": neutral_count,
+            }
+            
+            date_result["ticker_details"].append(ticker_detail)
+
+        return date_result
+
+    def _finish(self, backtest_results: List[Dict[str, Any]], performance_metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute the final performance metrics and assemble the backtest result."""
+        # Ensure final performance metrics are calculated
+        if len(self.portfolio_values) > 1:
+            self._update_performance_metrics(performance_metrics)
+
+        # Calculate final exposures if we have results
+        if backtest_results:
+            final_result = backtest_results[-1]
+            performance_metrics["gross_exposure"] = final_result["gross_exposure"]
+            performance_metrics["net_exposure"] = final_result["net_exposure"]
+            performance_metrics["long_short_ratio"] = final_result["long_short_ratio"]
+
+        # Store final performance metrics
+        self.performance_metrics = performance_metrics
+
+        return {
+            "results": backtest_results,
+            "performance_metrics": performance_metrics,
+            "portfolio_values": self.portfolio_values,
+            "final_portfolio": self.portfolio,
+        }
+
+    async def run_backtest_async(self, progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        Run the backtest asynchronously with optional progress callbacks.
+        Uses the pre-compiled graph for trading decisions.
+        """
+        from src.tools.api import get_price_data
+        from app.backend.services.fake_llm import fake_price_data
+
+        # Pre-fetch all data at the start
+        if not self.offline:
+            await self.prefetch_data()
 
+        dates = pd.date_range(self.start_date, self.end_date, freq="B")
+        performance_metrics = self._start_tracking(dates[0] if len(dates) > 0 else None)
         backtest_results = []
 
         for i, current_date in enumerate(dates):
@@ -333,7 +507,10 @@ class BacktestService:
 
                 for ticker in self.tickers:
                     try:
-                        price_data = get_price_data(ticker, previous_date_str, current_date_str)
+                        if self.offline:
+                            price_data = fake_price_data(ticker, previous_date_str, current_date_str)
+                        else:
+                            price_data = get_price_data(ticker, previous_date_str, current_date_str)
                         if price_data.empty:
                             missing_data = True
                             break
@@ -359,7 +536,13 @@ class BacktestService:
             # Copy current portfolio state to the graph portfolio
             portfolio_for_graph.update(self.portfolio)
 
+            # The route warmed local models up once; re-pin them only when their keep-alive is running out
+            if self.keep_warm_models:
+                await ollama_service.keep_models_pinned(self.keep_warm_models)
+
             # Execute graph-based agent decisions
+            timeline = RunTimeline() if self.flow_run_id else None
+            cycle_status, cycle_error = "COMPLETED", None
             try:
                 result = await run_graph_async(
                     graph=self.graph,
@@ -370,6 +553,7 @@ class BacktestService:
                     model_name=self.model_name,
                     model_provider=self.model_provider,
                     request=self.request,
+                    timeline=timeline,
                 )
                 
                 # Parse the decisions from the graph result
@@ -384,100 +568,20 @@ class BacktestService:
                 print(f"Error running graph for {current_date_str}: {e}")
                 decisions = {}
                 analyst_signals = {}
+                cycle_status, cycle_error = "ERROR", str(e)
 
-            # Execute trades based on decisions
-            executed_trades = {}
-            for ticker in self.tickers:
-                decision = decisions.get(ticker, {"action": "hold", "quantity": 0})
-                action, quantity = decision.get("action", "hold"), decision.get("quantity", 0)
-                executed_quantity = self.execute_trade(ticker, action, quantity, current_prices[ticker])
-                executed_trades[ticker] = executed_quantity
-
-            # Calculate portfolio value
+            executed_trades = self._execute_decisions(decisions, current_prices)
             total_value = self.calculate_portfolio_value(current_prices)
 
-            # Calculate exposures
-            long_exposure = sum(self.portfolio["positions"][t]["long"] * current_prices[t] for t in self.tickers)
-            short_exposure = sum(self.portfolio["positions"][t]["short"] * current_prices[t] for t in self.tickers)
-            gross_exposure = long_exposure + short_exposure
-            net_exposure = long_exposure - short_exposure
-            long_short_ratio = long_exposure / short_exposure if short_exposure > 1e-9 else None
-
-            # Track portfolio value
-            self.portfolio_values.append({
-                "Date": current_date,
-                "Portfolio Value": total_value,
-                "Long Exposure": long_exposure,
-                "Short Exposure": short_exposure,
-                "Gross Exposure": gross_exposure,
-                "Net Exposure": net_exposure,
-                "Long/Short Ratio": long_short_ratio,
-            })
-
-            # Calculate performance metrics for this day
-            portfolio_return = (total_value / self.initial_capital - 1) * 100
-            
-            # Update performance metrics if we have enough data
-            if len(self.portfolio_values) > 2:
-                self._update_performance_metrics(performance_metrics)
-
-            # Build detailed result for this date (similar to CLI format)
-            date_result = {
-                "date": current_date_str,
-                "portfolio_value": total_value,
-                "cash": self.portfolio["cash"],
-                "decisions": decisions,
-                "executed_trades": executed_trades,
-                "analyst_signals": analyst_signals,
-                "current_prices": current_prices,
-                "long_exposure": long_exposure,
-                "short_exposure": short_exposure,
-                "gross_exposure": gross_exposure,
-                "net_exposure": net_exposure,
-                "long_short_ratio": long_short_ratio,
-                "portfolio_return": portfolio_return,
-                "performance_metrics": performance_metrics.copy(),
-                # Add detailed trading information for each ticker
-                "ticker_details": []
-            }
-
-            # Build ticker details (similar to CLI format_backtest_row)
-            for ticker in self.tickers:
-                ticker_signals = {}
-                for agent_name, signals in analyst_signals.items():
-                    if ticker in signals:
-                        ticker_signals[agent_name] = signals[ticker]
-
-                bullish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bullish"])
-                bearish_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "bearish"])
-                neutral_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "neutral"])
-
-                # Calculate net position value
-                pos = self.portfolio["positions"][ticker]
-                long_val = pos["long"] * current_prices[ticker]
-                short_val = pos["short"] * current_prices[ticker]
-                net_position_value = long_val - short_val
-
-                # Get the action and quantity from the decisions
-                action = decisions.get(ticker, {}).get("action", "hold")
-                quantity = executed_trades.get(ticker, 0)
-
-                ticker_detail = {
-                    "ticker": ticker,
-                    "action": action,
-                    "quantity": quantity,
-                    "price": current_prices[ticker],
-                    "shares_owned": pos["long"] - pos["short"],  # net shares
-                    "long_shares": pos["long"],
-                    "short_shares": pos["short"],
-                    "position_value": net_position_value,
-                    "bullish_count": bullish_count,
-                    "bearish_count": bearish_count,
-                    "neutral_count": neutral_count,
-                }
-                
-                date_result["ticker_details"].append(ticker_detail)
+            if timeline is not None:
+                await self._save_cycle(
+                    timeline, current_date_str, current_prices, decisions, analyst_signals, executed_trades, total_value,
+                    cycle_status, cycle_error,
+                )
 
+            date_result = self._record_day(
+                current_date, current_prices, decisions, analyst_signals, executed_trades, total_value, performance_metrics
+            )
             backtest_results.append(date_result)
 
             # Send intermediate result if callback provided
@@ -487,26 +591,51 @@ class BacktestService:
                     "data": date_result,
                 })
 
-        # Ensure final performance metrics are calculated
-        if len(self.portfolio_values) > 1:
-            self._update_performance_metrics(performance_metrics)
+        return self._finish(backtest_results, performance_metrics)
 
-        # Calculate final exposures if we have results
-        if backtest_results:
-            final_result = backtest_results[-1]
-            performance_metrics["gross_exposure"] = final_result["gross_exposure"]
-            performance_metrics["net_exposure"] = final_result["net_exposure"]
-            performance_metrics["long_short_ratio"] = final_result["long_short_ratio"]
+    async def replay_backtest_async(
+        self,
+        days: List[Dict[str, Any]],
+        mark_to_market_only: bool = False,
+        progress_callback: Optional[Callable] = None,
+    ) -> Dict[str, Any]:
+        """
+        Re-simulate a finished backtest from its stored per-day decisions, without the graph or any LLM call.
 
-        # Store final performance metrics
-        self.performance_metrics = performance_metrics
+        :param days: Ordered days as {"date", "current_prices", "decisions", "analyst_signals"}.
+        :param mark_to_market_only: Ignore the decisions and only revalue the starting portfolio.
+        """
+        days = [day for day in days if day.get("date") and day.get("current_prices")]
+        performance_metrics = self._start_tracking(pd.Timestamp(days[0]["date"]) if days else None)
+        backtest_results = []
 
-        return {
-            "results": backtest_results,
-            "performance_metrics": performance_metrics,
-            "portfolio_values": self.portfolio_values,
-            "final_portfolio": self.portfolio,
-        }
+        for i, day in enumerate(days):
+            current_prices = day["current_prices"]
+            if any(ticker not in current_prices for ticker in self.tickers):
+                continue
+
+            decisions = {} if mark_to_market_only else (day.get("decisions") or {})
+            analyst_signals = day.get("analyst_signals") or {}
+            executed_trades = self._execute_decisions(decisions, current_prices)
+            total_value = self.calculate_portfolio_value(current_prices)
+
+            date_result = self._record_day(
+                pd.Timestamp(day["date"]), current_prices, decisions, analyst_signals, executed_trades, total_value,
+                performance_metrics,
+            )
+            backtest_results.append(date_result)
+
+            if progress_callback:
+                progress_callback({
+                    "type": "backtest_result",
+                    "data": date_result,
+                })
+
+            # Long replays stay cooperative with the event loop
+            if i % 100 == 99:
+                await asyncio.sleep(0)
+
+        return self._finish(backtest_results, performance_metrics)
 
     def run_backtest_sync(self) -> Dict[str, Any]:
         """
@@ -533,4 +662,21 @@ class BacktestService:
         # Calculate additional metrics
         performance_df["Daily Return"] = performance_df["Portfolio Value"].pct_change().fillna(0)
         
-        return performance_df 
\ No newline at end of file
+        return performance_df 
+
+
+def replay_days_from_cycles(cycles) -> List[Dict[str, Any]]:
+    """Per-day inputs for replay_backtest_async from the cycles a backtest recorded (in cycle order)."""
+    days = []
+    for cycle in cycles:
+        # Days whose graph failed were held in the original run and are replayed the same way
+        if cycle.trigger_reason != "backtest":
+            continue
+        market_conditions = cycle.market_conditions or {}
+        days.append({
+            "date": market_conditions.get("date"),
+            "current_prices": market_conditions.get("current_prices") or {},
+            "decisions": cycle.trading_decisions or {},
+            "analyst_signals": cycle.analyst_signals or {},
+        })
+    return days
@@ -0,0 +1,127 @@
+import functools
+import inspect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from app.backend.services.metrics import DATA_API_CALLS, DATA_API_DURATION
+from app.backend.services.run_timeline import current_timeline
+from app.backend.services.shared_data_cache import CACHED_FUNCTIONS, shared_data_cache
+from app.backend.services.src_patching import rebind_src_references
+
+logger = logging.getLogger(__name__)
+
+# src.tools.api functions the agents and backtester call for market data
+DATA_API_FUNCTIONS = (
+    "get_prices",
+    "get_price_data",
+    "get_financial_metrics",
+    "search_line_items",
+    "get_insider_trades",
+    "get_company_news",
+    "get_market_cap",
+)
+
+_install_lock = threading.Lock()
+_originals: Dict[str, Callable] = {}
+
+# Outcome of the most recent src.data.cache lookup in this context (None = no lookup seen)
+_cache_lookup: ContextVar[Optional[bool]] = ContextVar("data_api_cache_lookup", default=None)
+
+
+def install_data_api_instrumentation() -> None:
+    """Wrap the src.tools.api data functions with the shared data cache, call counters and latency timing.
+
+    Calls from offline runs (every agent on the "Fake" provider) get synthetic data instead.
+
+    Agents bind these functions with `from src.tools.api import ...`, so besides the
+    module attribute every already-imported src module holding the original is rebound.
+    Safe to call repeatedly; the wrappers are installed once.
+    """
+    import src.tools.api as api
+
+    with _install_lock:
+        if not _originals:
+            for name in DATA_API_FUNCTIONS:
+                original = getattr(api, name, None)
+                if original is None:
+                    continue
+                _originals[name] = original
+                # Calls are counted and timed outside the shared cache, so hits show up as fast calls
+                served = shared_data_cache.wrap(name, original, on_lookup=_cache_lookup.set) if name in CACHED_FUNCTIONS else original
+                # Synthetic data bypasses the shared cache so it never mixes with real data
+                served = _serve_offline(name, served)
+                setattr(api, name, _instrument(name, served))
+            _instrument_cache(getattr(api, "_cache", None))
+            logger.debug(f"Instrumented {len(_originals)} data API functions")
+
+        for name in _originals:
+            rebind_src_references(api, name, getattr(api, name))
+
+
+def _instrument(name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timeline = current_timeline.get()
+        start_ms = timeline.offset_ms() if timeline else None
+        lookup_token = _cache_lookup.set(None)
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            DATA_API_DURATION.observe(time.perf_counter() - started, function=name)
+            DATA_API_CALLS.inc(function=name, status=status)
+            cache_hit = _cache_lookup.get()
+            _cache_lookup.reset(lookup_token)
+            if timeline is not None:
+                timeline.record_data_call(name, start_ms, cache_hit, status)
+
+    wrapper.__wrapped_data_api__ = func
+    return wrapper
+
+
+def _serve_offline(name: str, func: Callable) -> Callable:
+    # Imported here: fake_llm depends on the request schemas, which import the graph module
+    from app.backend.services.fake_llm import current_fake_run, fake_data_call
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        run = current_fake_run.get()
+        if run is None or not run.offline:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return fake_data_call(name, run, dict(bound.arguments))
+
+    return wrapper
+
+
+def _instrument_cache(cache) -> None:
+    """Note whether each lookup on the src.data.cache instance hit, for the run timeline."""
+    if cache is None:
+        return
+    for name in dir(cache):
+        if not name.startswith("get_"):
+            continue
+        method = getattr(cache, name)
+        if callable(method):
+            setattr(cache, name, _record_cache_lookup(method))
+
+
+def _record_cache_lookup(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        result = method(*args, **kwargs)
+        _cache_lookup.set(bool(result))
+        return result
+
+    return wrapper
+
@@ -0,0 +1,330 @@
+import enum
+import functools
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import typing
+from collections import Counter
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+from app.backend.models.schemas import FAKE_MODEL_PROVIDER, FakeLLMConfig
+from app.backend.services.src_patching import rebind_src_references
+
+_install_lock = threading.Lock()
+_original_get_model: Optional[Callable] = None
+
+
+class FakeRun:
+    """Per graph run state of the fake provider: its config, tickers and call attempts."""
+
+    def __init__(self, request=None):
+        self.config = getattr(request, "fake_llm", None) or FakeLLMConfig()
+        self.tickers = list(getattr(request, "tickers", None) or [])
+        # Only fully offline runs get synthetic market data; mixed runs call the real API
+        self.offline = hasattr(request, "is_offline") and request.is_offline()
+        self._attempts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def rng(self, *parts) -> random.Random:
+        """Deterministic RNG for a call; retries of the same call get the next sequence."""
+        key = ":".join(str(p) for p in parts)
+        with self._lock:
+            attempt = self._attempts[key]
+            self._attempts[key] += 1
+        return _rng(self.config, key, attempt)
+
+
+# The fake provider state of the graph run in this context (None outside runs)
+current_fake_run: ContextVar[Optional[FakeRun]] = ContextVar("fake_llm_run", default=None)
+
+
+class FakeProviderError(RuntimeError):
+    """Injected provider failure (FakeLLMConfig.error_rate)."""
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model served for the "Fake" provider.
+
+    Each call sleeps for a latency sampled from the run's FakeLLMConfig, fails with its
+    error_rate and otherwise answers with JSON that validates against the requested
+    structured output schema. Answers depend only on the seed and the prompt, so the
+    real agents run unchanged and repeat runs make the same decisions.
+    """
+
+    model_name: str = "fake"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        run = current_fake_run.get() or FakeRun()
+        schema = kwargs.get("fake_schema")
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        rng = run.rng(self.model_name, getattr(schema, "__name__", ""), digest)
+
+        time.sleep(_sample_latency(run.config, rng))
+        if run.config.error_rate and rng.random() < run.config.error_rate:
+            raise FakeProviderError(f"Injected {FAKE_MODEL_PROVIDER} provider error")
+
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            content = json.dumps(fake_structured_output(schema, rng, run.tickers))
+        else:
+            content = json.dumps({"response": f"Fake response {digest[:8]}"})
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        """Parse the JSON answer into the schema; every method behaves like json_mode."""
+        def parse(message: AIMessage):
+            if isinstance(schema, type) and issubclass(schema, BaseModel):
+                return schema.model_validate_json(message.content)
+            return json.loads(message.content)
+
+        return self.bind(fake_schema=schema) | RunnableLambda(parse)
+
+
+def install_fake_llm() -> None:
+    """Serve the "Fake" provider from src.llm.models.get_model.
+
+    Safe to call repeatedly, before or after the client pool is installed.
+    """
+    global _original_get_model
+    import src.llm.models as models
+
+    with _install_lock:
+        if _original_get_model is None:
+            _original_get_model = models.get_model
+            models.get_model = _with_fake_provider(_original_get_model)
+        rebind_src_references(models, "get_model", models.get_model)
+
+
+def _with_fake_provider(get_model: Callable) -> Callable:
+    @functools.wraps(get_model)
+    def wrapper(model_name, model_provider, *args, **kwargs):
+        if getattr(model_provider, "value", model_provider) == FAKE_MODEL_PROVIDER:
+            return FakeChatModel(model_name=model_name or "fake")
+        return get_model(model_name, model_provider, *args, **kwargs)
+
+    return wrapper
+
+
+def fake_structured_output(schema: type, rng: random.Random, tickers: List[str]) -> Dict[str, Any]:
+    """Random JSON-ready values for every field of a pydantic schema (dict fields keyed by ticker)."""
+    return {name: _fake_value(field.annotation, field.metadata, rng, tickers, name) for name, field in schema.model_fields.items()}
+
+
+def _fake_value(annotation, metadata, rng: random.Random, tickers: List[str], name: str) -> Any:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Annotated:
+        return _fake_value(args[0], [*metadata, *args[1:]], rng, tickers, name)
+    if origin is typing.Literal:
+        return rng.choice(args)
+    if origin is typing.Union or type(annotation).__name__ == "UnionType":
+        options = [arg for arg in args if arg is not type(None)]
+        return _fake_value(options[0], metadata, rng, tickers, name) if options else None
+    if origin in (list, tuple, set):
+        item = args[0] if args else str
+        return [_fake_value(item, [], rng, tickers, name) for _ in range(rng.randint(1, 3))]
+    if origin is dict:
+        value = args[1] if len(args) == 2 else str
+        return {ticker: _fake_value(value, [], rng, tickers, name) for ticker in tickers or ["item"]}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return fake_structured_output(annotation, rng, tickers)
+        if issubclass(annotation, enum.Enum):
+            return rng.choice(list(annotation)).value
+        if issubclass(annotation, bool):
+            return rng.random() < 0.5
+        if issubclass(annotation, (int, float)):
+            low, high = _bounds(metadata)
+            if issubclass(annotation, int):
+                return rng.randint(math.ceil(low), math.floor(high))
+            return round(rng.uniform(low, high), 1)
+    return f"Fake {name.replace('_', ' ')}"
+
+
+def _bounds(metadata) -> tuple:
+    """(low, high) from ge/gt/le/lt constraints, defaulting to 0..100."""
+    low, high = 0.0, 100.0
+    for constraint in metadata:
+        for attr in ("ge", "gt"):
+            if getattr(constraint, attr, None) is not None:
+                low = float(getattr(constraint, attr))
+        for attr in ("le", "lt"):
+            if getattr(constraint, attr, None) is not None:
+                high = float(getattr(constraint, attr))
+    return low, max(low, high)
+
+
+# Synthetic market data served by the data API wrappers for offline runs
+def fake_data_call(name: str, run: FakeRun, arguments: Dict[str, Any]) -> Any:
+    """Answer a src.tools.api call with deterministic synthetic data."""
+    ticker = arguments.get("ticker")
+    end_date = arguments.get("end_date")
+    rng = _rng(run.config, name, ticker, end_date, arguments.get("start_date"), arguments.get("limit"))
+
+    if name == "get_price_data":
+        return fake_price_data(ticker, arguments["start_date"], end_date)
+    if name == "get_prices":
+        from src.data.models import Price
+
+        frame = fake_price_data(ticker, arguments["start_date"], end_date)
+        return [
+            Price(time=f"{day:%Y-%m-%d}T00:00:00Z", open=row.open, close=row.close, high=row.high, low=row.low, volume=int(row.volume))
+            for day, row in frame.iterrows()
+        ]
+    if name == "get_market_cap":
+        return fake_price(ticker, end_date) * _fake_shares(ticker)
+    if name == "get_financial_metrics":
+        from src.data.models import FinancialMetrics
+
+        period = arguments.get("period", "ttm")
+        return [
+            FinancialMetrics(**_fake_record(FinancialMetrics, rng, ticker=ticker, report_period=day, period=period, currency="USD"))
+            for day in _report_periods(end_date, period, arguments.get("limit"))
+        ]
+    if name == "search_line_items":
+        from src.data.models import LineItem
+
+        period = arguments.get("period", "ttm")
+        return [
+            LineItem(
+                ticker=ticker, report_period=day, period=period, currency="USD",
+                **{item: _fake_number(item, rng) for item in arguments.get("line_items") or []},
+            )
+            for day in _report_periods(end_date, period, arguments.get("limit"))
+        ]
+    if name in ("get_insider_trades", "get_company_news"):
+        from src.data.models import CompanyNews, InsiderTrade
+
+        model = InsiderTrade if name == "get_insider_trades" else CompanyNews
+        start = _to_date(arguments.get("start_date") or _to_date(end_date) - timedelta(days=90))
+        span = max((_to_date(end_date) - start).days, 0)
+        count = min(arguments.get("limit") or 10, 10)
+        return [
+            model(**_fake_record(model, rng, ticker=ticker, day=(start + timedelta(days=rng.randint(0, span))).isoformat()))
+            for _ in range(count)
+        ]
+    raise ValueError(f"No fake data for {name}")
+
+
+def _fake_record(model: type, rng: random.Random, day: Optional[str] = None, **fixed) -> Dict[str, Any]:
+    """Plausible values for a src.data.models record, by field name."""
+    values = dict(fixed)
+    for name, field in model.model_fields.items():
+        if name in values:
+            continue
+        if name.endswith("date") or name in ("date", "time", "report_period"):
+            values[name] = day or fixed.get("report_period")
+        elif name == "sentiment":
+            values[name] = rng.choice(("positive", "negative", "neutral"))
+        elif name.startswith("is_"):
+            values[name] = rng.random() < 0.3
+        elif _is_number(field.annotation):
+            values[name] = _fake_number(name, rng)
+        else:
+            values[name] = f"Fake {name.replace('_', ' ')}"
+    return values
+
+
+def _is_number(annotation) -> bool:
+    return annotation in (int, float) or any(arg in (int, float) for arg in typing.get_args(annotation))
+
+
+def _fake_number(name: str, rng: random.Random) -> float:
+    """Scale a synthetic value by what the field name says it measures."""
+    if name == "transaction_shares":
+        return float(rng.randint(-20_000, 20_000))
+    if any(part in name for part in ("growth", "margin", "return_on", "yield", "payout")):
+        return round(rng.uniform(-0.05, 0.35), 4)
+    if any(part in name for part in ("ratio", "turnover", "days")):
+        return round(rng.uniform(0.5, 30), 2)
+    if "per_share" in name or "price" in name:
+        return round(rng.uniform(1, 50), 2)
+    return float(rng.randint(10_000_000, 50_000_000_000))
+
+
+def _fake_shares(ticker: str) -> int:
+    return random.Random(f"{ticker}:shares").randint(50_000_000, 5_000_000_000)
+
+
+def _report_periods(end_date, period: str, limit: Optional[int]) -> List[str]:
+    """Report dates going back from end_date, one per period (at most 8)."""
+    step = 365 if period == "annual" else 91
+    end = _to_date(end_date)
+    return [(end - timedelta(days=step * i)).isoformat() for i in range(min(limit or 8, 8))]
+
+
+def fake_price(ticker: str, day) -> float:
+    """Deterministic synthetic close price for a ticker on a day."""
+    day = _to_date(day)
+    base = 20 + random.Random(ticker).uniform(0, 480)
+    phase = random.Random(f"{ticker}:phase").uniform(0, 2 * math.pi)
+    noise = random.Random(f"{ticker}:{day.isoformat()}").uniform(-0.01, 0.01)
+    trend = 0.15 * math.sin(day.toordinal() / 30 + phase)
+    return round(base * (1 + trend + noise), 2)
+
+
+def fake_price_data(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Synthetic business-day price frame shaped like src.tools.api.get_price_data."""
+    dates = pd.date_range(start_date, end_date, freq="B")
+    closes = [fake_price(ticker, d) for d in dates]
+    df = pd.DataFrame(
+        {
+            "open": closes,
+            "close": closes,
+            "high": [c * 1.01 for c in closes],
+            "low": [c * 0.99 for c in closes],
+            "volume": [1_000_000] * len(closes),
+        },
+        index=pd.DatetimeIndex(dates, name="Date"),
+    )
+    return df
+
+
+def _rng(config: FakeLLMConfig, *parts) -> random.Random:
+    # String seeds are hashed with sha512, so results don't depend on PYTHONHASHSEED
+    return random.Random(":".join(str(p) for p in (config.seed, *parts)))
+
+
+def _sample_latency(config: FakeLLMConfig, rng: random.Random) -> float:
+    """Sample one call latency in seconds."""
+    mean, jitter = config.latency_ms, config.latency_jitter_ms
+    if config.latency_distribution == "fixed" or mean == 0:
+        latency_ms = mean
+    elif config.latency_distribution == "uniform":
+        latency_ms = rng.uniform(mean - jitter, mean + jitter)
+    elif config.latency_distribution == "normal":
+        latency_ms = rng.gauss(mean, jitter)
+    else:
+        # Lognormal with the requested mean/stddev (long tail like real providers)
+        sigma2 = math.log(1 + (jitter / mean) ** 2)
+        latency_ms = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+    return max(latency_ms, 0.0) / 1000
+
+
+def _to_date(day) -> date:
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return datetime.strptime(str(day)[:10], "%Y-%m-%d").date()
@@ -1,15 +1,16 @@
 import asyncio
 import json
 import re
-from langchain_core.messages import HumanMessage
-from langgraph.graph import END, StateGraph
+from typing import TYPE_CHECKING
 
 from app.backend.services.agent_service import create_agent_function
-from src.agents.portfolio_manager import portfolio_management_agent
-from src.agents.risk_manager import risk_management_agent
-from src.main import start
-from src.utils.analysts import ANALYST_CONFIG
-from src.graph.state import AgentState
+from app.backend.services.metrics import GRAPH_RUN_DURATION
+from app.backend.services.run_timeline import create_timeline_callback, current_timeline
+
+# LangGraph and the agent modules (which pull in every LLM provider) are imported on
+# first use so that importing the backend stays fast.
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
 
 
 def extract_base_agent_key(unique_id: str) -> str:
@@ -33,8 +34,26 @@ def extract_base_agent_key(unique_id: str) -> str:
 
 
 # Helper function to create the agent graph
-def create_graph(graph_nodes: list, graph_edges: list) -> StateGraph:
+def create_graph(graph_nodes: list, graph_edges: list) -> "StateGraph":
     """Create the workflow based on the React Flow graph structure."""
+    from langgraph.graph import END, StateGraph
+    from src.agents.portfolio_manager import portfolio_management_agent
+    from src.agents.risk_manager import risk_management_agent
+    from src.main import start
+    from src.utils.analysts import ANALYST_CONFIG
+    from src.graph.state import AgentState
+    # fake_llm depends on the request schemas, which import this module
+    from app.backend.services.fake_llm import install_fake_llm
+    from app.backend.services.data_api import install_data_api_instrumentation
+    from app.backend.services.llm_pool import install_llm_client_pool
+    from app.backend.services.llm_cache import install_llm_response_cache
+
+    # Agents are imported by now, so their data API and get_model references get patched too
+    install_data_api_instrumentation()
+    install_fake_llm()
+    install_llm_client_pool()
+    install_llm_response_cache()
+
     graph = StateGraph(AgentState)
     graph.add_node("start_node", start)
 
@@ -129,17 +148,19 @@ def create_graph(graph_nodes: list, graph_edges: list) -> StateGraph:
     return graph
 
 
-async def run_graph_async(graph, portfolio, tickers, start_date, end_date, model_name, model_provider, request=None):
+async def run_graph_async(graph, portfolio, tickers, start_date, end_date, model_name, model_provider, request=None, timeline=None):
     """Async wrapper for run_graph to work with asyncio."""
     # Use run_in_executor to run the synchronous function in a separate thread
     # so it doesn't block the event loop
     loop = asyncio.get_running_loop()
-    result = await loop.run_in_executor(None, lambda: run_graph(graph, portfolio, tickers, start_date, end_date, model_name, model_provider, request))  # Use default executor
+    provider_label = getattr(model_provider, "value", model_provider)
+    with GRAPH_RUN_DURATION.time(provider=provider_label, model=model_name):
+        result = await loop.run_in_executor(None, lambda: run_graph(graph, portfolio, tickers, start_date, end_date, model_name, model_provider, request, timeline))  # Use default executor
     return result
 
 
 def run_graph(
-    graph: StateGraph,
+    graph: "StateGraph",
     portfolio: dict,
     tickers: list[str],
     start_date: str,
@@ -147,34 +168,62 @@ def run_graph(
     model_name: str,
     model_provider: str,
     request=None,
+    timeline=None,
 ) -> dict:
     """
     Run the graph with the given portfolio, tickers,
     start date, end date, show reasoning, model name,
     and model provider.
+
+    When a RunTimeline is given, node spans, LLM calls and data calls are recorded into it.
+    A request's llm_cache flag overrides the server default for the LLM response cache,
+    and its fake_llm settings drive agents on the "Fake" provider.
     """
-    return graph.invoke(
-        {
-            "messages": [
-                HumanMessage(
-                    content="Make trading decisions based on the provided data.",
-                )
-            ],
-            "data": {
-                "tickers": tickers,
-                "portfolio": portfolio,
-                "start_date": start_date,
-                "end_date": end_date,
-                "analyst_signals": {},
-            },
-            "metadata": {
-                "show_reasoning": False,
-                "model_name": model_name,
-                "model_provider": model_provider,
-                "request": request,  # Pass the request for agent-specific model access
+    from langchain_core.messages import HumanMessage
+    from app.backend.services.fake_llm import FakeRun, current_fake_run
+    from app.backend.services.llm_cache import llm_cache_enabled
+
+    # Set in the worker thread: run_in_executor does not carry context variables over
+    config = None
+    timeline_token = None
+    if timeline is not None:
+        timeline_token = current_timeline.set(timeline)
+        config = {"callbacks": [create_timeline_callback(timeline)]}
+    llm_cache_token = None
+    if getattr(request, "llm_cache", None) is not None:
+        llm_cache_token = llm_cache_enabled.set(request.llm_cache)
+    fake_run_token = current_fake_run.set(FakeRun(request))
+
+    try:
+        return graph.invoke(
+            {
+                "messages": [
+                    HumanMessage(
+                        content="Make trading decisions based on the provided data.",
+                    )
+                ],
+                "data": {
+                    "tickers": tickers,
+                    "portfolio": portfolio,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "analyst_signals": {},
+                },
+                "metadata": {
+                    "show_reasoning": False,
+                    "model_name": model_name,
+                    "model_provider": model_provider,
+                    "request": request,  # Pass the request for agent-specific model access
+                },
             },
-        },
-    )
+            config=config,
+        )
+    finally:
+        if timeline_token is not None:
+            current_timeline.reset(timeline_token)
+        if llm_cache_token is not None:
+            llm_cache_enabled.reset(llm_cache_token)
+        current_fake_run.reset(fake_run_token)
 
 
 def parse_hedge_fund_response(response):
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Optional
+
+from app.backend.database.connection import BACKEND_DIR
+from app.backend.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Server-wide default; requests can opt in or out with `llm_cache`
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+
+LLM_CACHE_DB_PATH = Path(os.getenv("LLM_CACHE_DB_PATH", str(BACKEND_DIR / "llm_cache.db")))
+
+# Least recently used responses are evicted beyond this size
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "512"))
+
+LLM_CACHE_REQUESTS = registry.counter("llm_cache_requests_total", "LLM response cache lookups", ["result"])
+LLM_CACHE_BYTES = registry.gauge("llm_cache_bytes", "Size of the stored LLM responses")
+
+# Whether model calls in the current context read and write the cache
+llm_cache_enabled: ContextVar[bool] = ContextVar("llm_cache_enabled", default=LLM_CACHE_ENABLED)
+
+# Set by a lookup that hit, read back by the timeline callback for the same model call
+last_lookup_hit: ContextVar[bool] = ContextVar("llm_cache_last_lookup_hit", default=False)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_cache_last_accessed ON llm_cache (last_accessed);
+"""
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+class LLMResponseStore:
+    """Content-addressed SQLite store of LLM generations with size-bounded LRU eviction.
+
+    The key is a SHA-256 of LangChain's llm_string (provider class, model, temperature
+    and every other model parameter) and the serialized prompt messages, so only a
+    byte-identical call to an identically configured model replays a response.
+    """
+
+    def __init__(self, path: Path = LLM_CACHE_DB_PATH, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT payload FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE llm_cache SET last_accessed = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+        return row[0] if row else None
+
+    def put(self, key: str, payload: str) -> None:
+        size = len(payload.encode())
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            previous = conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, size, created_at, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now),
+            )
+            self._bytes += size - (previous[0] if previous else 0)
+            self._evict(conn, keep=key)
+            conn.commit()
+            LLM_CACHE_BYTES.set(self._bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+            self._bytes = 0
+            LLM_CACHE_BYTES.set(0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {"path": str(self.path), "entries": entries, "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        # Caller holds the lock; drop least recently used responses other than the one just written
+        rows = conn.execute(
+            "SELECT key, size FROM llm_cache WHERE key != ? ORDER BY last_accessed", (keep,)
+        )
+        evicted = []
+        for key, size in rows:
+            if self._bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._bytes -= size
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Caller holds the lock; opened on first use
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            LLM_CACHE_BYTES.set(self._bytes)
+            self._conn = conn
+        return self._conn
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+
+def install_llm_response_cache() -> None:
+    """Register the store as LangChain's global LLM cache (gated per context by llm_cache_enabled)."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from langchain_core.globals import set_llm_cache
+
+        set_llm_cache(_create_langchain_cache(llm_response_store))
+        _installed = True
+
+
+def _create_langchain_cache(store: LLMResponseStore):
+    from langchain_core._api import LangChainBetaWarning
+    from langchain_core.caches import BaseCache
+    from langchain_core.load import dumpd, load
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation, GenerationChunk
+
+    # Everything update() stores: generations of chat and completion models and their messages
+    allowed_objects = [Generation, GenerationChunk, ChatGeneration, ChatGenerationChunk, AIMessage, AIMessageChunk]
+    # load() is marked beta; with an explicit allowlist the warning on every replay is just noise
+    warnings.filterwarnings("ignore", message="The function `load` is in beta", category=LangChainBetaWarning)
+
+    class LangChainResponseCache(BaseCache):
+        def lookup(self, prompt: str, llm_string: str) -> Optional[Any]:
+            last_lookup_hit.set(False)
+            if not llm_cache_enabled.get():
+                return None
+            try:
+                payload = store.get(cache_key(prompt, llm_string))
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+                return None
+            if payload is None:
+                LLM_CACHE_REQUESTS.inc(result="miss")
+                return None
+            LLM_CACHE_REQUESTS.inc(result="hit")
+            last_lookup_hit.set(True)
+            return [load(generation, allowed_objects=allowed_objects) for generation in json.loads(payload)]
+
+        def update(self, prompt: str, llm_string: str, return_val) -> None:
+            if not llm_cache_enabled.get():
+                return
+            try:
+                store.put(cache_key(prompt, llm_string), json.dumps([dumpd(generation) for generation in return_val]))
+            except Exception as e:
+                logger.warning(f"LLM cache update failed: {e}")
+
+        def clear(self, **kwargs) -> None:
+            store.clear()
+
+    return LangChainResponseCache()
+
+
+# Global instance
+llm_response_store = LLMResponseStore()
@@ -0,0 +1,161 @@
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.backend.services.metrics import registry
+from app.backend.services.src_patching import rebind_src_references
+
+logger = logging.getLogger(__name__)
+
+# Clients unused for this long are dropped (with their HTTP connection pools)
+LLM_POOL_IDLE_SECONDS = float(os.getenv("LLM_POOL_IDLE_SECONDS", "600"))
+
+# Upper bound on pooled clients; the least recently used one is dropped beyond it (0 disables pooling)
+LLM_POOL_MAX_SIZE = int(os.getenv("LLM_POOL_MAX_SIZE", "32"))
+
+LLM_POOL_SIZE = registry.gauge("llm_client_pool_size", "Chat model clients currently pooled")
+LLM_POOL_REQUESTS = registry.counter("llm_client_pool_requests_total", "Chat model client lookups", ["provider", "result"])
+LLM_POOL_EVICTIONS = registry.counter("llm_client_pool_evictions_total", "Pooled chat model clients dropped", ["reason"])
+
+_install_lock = threading.Lock()
+_original_get_model: Optional[Callable] = None
+
+
+class LLMClientPool:
+    """Reuses LangChain chat model instances across agents, runs and backtest days.
+
+    src.llm.models.get_model builds a new client (and HTTP connection pool) per call;
+    pooled clients keep their connections and TLS sessions alive between calls.
+    Clients are keyed by every get_model argument (provider, model, API keys,
+    parameters); API keys only enter the key as a digest.
+    """
+
+    def __init__(self, max_size: int = LLM_POOL_MAX_SIZE, idle_seconds: float = LLM_POOL_IDLE_SECONDS):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        # key -> (client, last used monotonic time)
+        self._clients: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    def get(self, factory: Callable[[], Any], provider: str, arguments: Dict[str, Any]) -> Any:
+        """Return the pooled client for these get_model arguments, calling factory() on a miss."""
+        if self.max_size <= 0:
+            return factory()
+        try:
+            key = _digest(arguments)
+        except TypeError:
+            return factory()  # Unhashable arguments can't be pooled
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                LLM_POOL_REQUESTS.inc(provider=provider, result="hit")
+                return entry[0]
+
+        # Built outside the lock; two concurrent misses may both build, and the last one is kept
+        client = factory()
+        LLM_POOL_REQUESTS.inc(provider=provider, result="miss")
+        if client is None:
+            return client
+
+        with self._lock:
+            self._clients[key] = (client, time.monotonic())
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                LLM_POOL_EVICTIONS.inc(reason="capacity")
+            LLM_POOL_SIZE.set(len(self._clients))
+        return client
+
+    def evict_idle(self) -> int:
+        """Drop clients idle for longer than idle_seconds. Returns the number dropped."""
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            LLM_POOL_SIZE.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._clients), "max_size": self.max_size, "idle_seconds": self.idle_seconds}
+
+    def _evict_idle(self, now: float) -> int:
+        # Caller holds the lock; entries are in last-used order, so stop at the first recent one
+        evicted = 0
+        while self._clients:
+            key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_seconds:
+                break
+            del self._clients[key]
+            evicted += 1
+        if evicted:
+            LLM_POOL_EVICTIONS.inc(evicted, reason="idle")
+        LLM_POOL_SIZE.set(len(self._clients))
+        return evicted
+
+
+def install_llm_client_pool() -> None:
+    """Serve src.llm.models.get_model from the pool.
+
+    Safe to call repeatedly, before or after the fake provider is installed.
+    """
+    global _original_get_model
+    import src.llm.models as models
+
+    with _install_lock:
+        if _original_get_model is None:
+            _original_get_model = models.get_model
+            models.get_model = _pooled(_original_get_model)
+        rebind_src_references(models, "get_model", models.get_model)
+
+
+def _pooled(get_model: Callable) -> Callable:
+    signature = inspect.signature(get_model)
+
+    @functools.wraps(get_model)
+    def wrapper(*args, **kwargs):
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError:
+            return get_model(*args, **kwargs)  # Let get_model raise its own error
+        bound.apply_defaults()
+        # Positional and keyword calls with the same values share a client
+        arguments = dict(bound.arguments)
+        provider = arguments.get("model_provider", "unknown")
+        return llm_client_pool.get(
+            lambda: get_model(*args, **kwargs), str(getattr(provider, "value", provider)), arguments
+        )
+
+    return wrapper
+
+
+def _digest(arguments: Any) -> str:
+    """Stable key for get_model arguments that doesn't keep API keys in the pool."""
+    return hashlib.sha256(repr(_freeze(arguments)).encode()).hexdigest()
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if hasattr(value, "value"):  # Enums such as ModelProvider
+        return _freeze(value.value)
+    hash(value)
+    return value
+
+
+# Global instance
+llm_client_pool = LLMClientPool()
@@ -7,15 +7,28 @@ import time
 import re
 import json
 import queue
+import shutil
 import threading
+import uuid
 from pathlib import Path
 from typing import Dict, List, Optional, AsyncGenerator
 import logging
 import signal
-import ollama
 
 logger = logging.getLogger(__name__)
 
+# Seconds between background refreshes of the cached status snapshot
+OLLAMA_STATUS_REFRESH_INTERVAL = float(os.getenv("OLLAMA_STATUS_REFRESH_INTERVAL", "30"))
+
+# How long warmed-up models stay resident (Ollama duration string, e.g. "30m", "-1" = forever)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# Memory budget for all local models resident or reserved by running runs at once, in GB (0 = unlimited)
+OLLAMA_MEMORY_BUDGET_GB = float(os.getenv("OLLAMA_MEMORY_BUDGET_GB", "0"))
+
+# Loaded models need more memory than their weights on disk (KV cache, context buffers)
+OLLAMA_MEMORY_OVERHEAD = float(os.getenv("OLLAMA_MEMORY_OVERHEAD", "1.2"))
+
 class OllamaService:
     """Service for managing Ollama integration in the backend."""
     
@@ -23,20 +36,74 @@ class OllamaService:
         self._download_progress = {}
         self._download_processes = {}
         
-        # Initialize async client
-        self._async_client = ollama.AsyncClient()
-        self._sync_client = ollama.Client()
+        # Cached status snapshot served to request handlers
+        self._status_snapshot: Optional[Dict[str, any]] = None
+        self._status_lock = asyncio.Lock()
+        self._status_task: Optional[asyncio.Task] = None
+        
+        # Models each in-flight run holds against the memory budget, by reservation id
+        self._reservations: Dict[str, List[str]] = {}
+        self._reservation_lock = asyncio.Lock()
+        
+        # When each warmed-up model's keep-alive runs out (monotonic seconds)
+        self._pinned_until: Dict[str, float] = {}
+        
+        # Clients are created on first use (importing ollama is slow)
+        self._async_client_instance = None
+        self._sync_client_instance = None
+    
+    @property
+    def _async_client(self):
+        if self._async_client_instance is None:
+            import ollama
+            self._async_client_instance = ollama.AsyncClient()
+        return self._async_client_instance
+    
+    @property
+    def _sync_client(self):
+        if self._sync_client_instance is None:
+            import ollama
+            self._sync_client_instance = ollama.Client()
+        return self._sync_client_instance
     
     # =============================================================================
     # PUBLIC API METHODS
     # =============================================================================
     
+    async def get_status(self) -> Dict[str, any]:
+        """Return the cached status snapshot, probing only if none exists yet."""
+        if self._status_snapshot is None:
+            return await self.refresh_status()
+        return dict(self._status_snapshot)
+    
+    async def refresh_status(self) -> Dict[str, any]:
+        """Probe Ollama now and replace the cached status snapshot."""
+        async with self._status_lock:
+            status = await self.check_ollama_status()
+            status["checked_at"] = time.time()
+            self._status_snapshot = status
+            return dict(status)
+    
+    def start_status_refresher(self, interval: float = OLLAMA_STATUS_REFRESH_INTERVAL) -> None:
+        """Start the background task keeping the status snapshot fresh."""
+        if self._status_task is None or self._status_task.done():
+            self._status_task = asyncio.create_task(self._refresh_status_periodically(interval))
+    
+    async def stop_status_refresher(self) -> None:
+        """Cancel the background status refresh task."""
+        if self._status_task is not None:
+            self._status_task.cancel()
+            try:
+                await self._status_task
+            except asyncio.CancelledError:
+                pass
+            self._status_task = None
+    
     async def check_ollama_status(self) -> Dict[str, any]:
-        """Check Ollama installation and server status."""
+        """Check Ollama installation and server status (live probe, prefer get_status())."""
         try:
             is_installed = await self._check_installation()
-            is_running = await self._check_server_running()
-            models, server_url = await self._get_server_info(is_running)
+            is_running, models, server_url = await self._get_server_info()
             
             status = {
                 "installed": is_installed,
@@ -58,6 +125,7 @@ class OllamaService:
         """Start the Ollama server."""
         try:
             success = await self._execute_server_start()
+            await self.refresh_status()
             
             message = "Ollama server started successfully" if success else "Failed to start Ollama server"
             return {"success": success, "message": message}
@@ -70,6 +138,7 @@ class OllamaService:
         """Stop the Ollama server."""
         try:
             success = await self._execute_server_stop()
+            await self.refresh_status()
             
             message = "Ollama server stopped successfully" if success else "Failed to stop Ollama server"
             return {"success": success, "message": message}
@@ -82,6 +151,7 @@ class OllamaService:
         """Download an Ollama model."""
         try:
             success = await self._execute_model_download(model_name)
+            await self.refresh_status()
             
             message = f"Model {model_name} downloaded successfully" if success else f"Failed to download model {model_name}"
             return {"success": success, "message": message}
@@ -92,13 +162,17 @@ class OllamaService:
     
     async def download_model_with_progress(self, model_name: str) -> AsyncGenerator[str, None]:
         """Download an Ollama model with progress streaming."""
-        async for progress_data in self._stream_model_download(model_name):
-            yield progress_data
+        try:
+            async for progress_data in self._stream_model_download(model_name):
+                yield progress_data
+        finally:
+            await self.refresh_status()
     
     async def delete_model(self, model_name: str) -> Dict[str, any]:
         """Delete an Ollama model."""
         try:
             success = await self._execute_model_deletion(model_name)
+            await self.refresh_status()
             
             message = f"Model {model_name} deleted successfully" if success else f"Failed to delete model {model_name}"
             return {"success": success, "message": message}
@@ -130,7 +204,7 @@ class OllamaService:
         3. Model is in our recommended list (OLLAMA_MODELS)
         """
         try:
-            status = await self.check_ollama_status()
+            status = await self.get_status()
             
             if not status.get("server_running", False):
                 logger.debug("Ollama server not running, returning no models for API")
@@ -149,6 +223,128 @@ class OllamaService:
             logger.error(f"Error getting available models for API: {e}")
             return []  # Return empty list on error to not break the API
     
+    def get_models_for_request(self, request) -> List[str]:
+        """Return the distinct Ollama model names referenced by a hedge fund request."""
+        model_names = []
+        for agent_id in request.get_agent_ids():
+            model_name, model_provider = request.get_agent_model_config(agent_id)
+            if getattr(model_provider, "value", model_provider) == "Ollama" and model_name not in model_names:
+                model_names.append(model_name)
+        return model_names
+    
+    async def get_resident_models(self) -> List[Dict[str, any]]:
+        """Get the models currently loaded in Ollama memory."""
+        try:
+            response = await self._async_client.ps()
+        except Exception as e:
+            logger.debug(f"Failed to list resident models: {e}")
+            return []
+        
+        return [
+            {
+                "model_name": model.model,
+                "size_bytes": model.size,
+                "size_vram_bytes": getattr(model, "size_vram", None),
+                "expires_at": model.expires_at.isoformat() if getattr(model, "expires_at", None) else None,
+            }
+            for model in response.models
+        ]
+    
+    async def check_memory_budget(self, model_names: List[str]) -> Dict[str, any]:
+        """Estimate the memory needed to hold the given models next to every resident or reserved model."""
+        budget_bytes = int(OLLAMA_MEMORY_BUDGET_GB * 1024 ** 3)
+        required_bytes = 0
+        other_models = []
+        if model_names:
+            resident = {model["model_name"]: model["size_bytes"] for model in await self.get_resident_models()}
+            reserved = {name for names in self._reservations.values() for name in names}
+            other_models = sorted((set(resident) | reserved) - set(model_names))
+            on_disk = await self._get_model_disk_sizes()
+            # A model shared by several runs (or already loaded) is only counted once
+            for model_name in list(model_names) + other_models:
+                if model_name in resident:
+                    required_bytes += resident[model_name]
+                else:
+                    required_bytes += int(on_disk.get(model_name, 0) * OLLAMA_MEMORY_OVERHEAD)
+        
+        return {
+            "models": model_names,
+            "other_models": other_models,
+            "required_bytes": required_bytes,
+            "budget_bytes": budget_bytes or None,
+            "fits": not budget_bytes or required_bytes <= budget_bytes,
+        }
+    
+    async def reserve_memory(self, model_names: List[str]) -> Dict[str, any]:
+        """Check the budget and, if the models fit, hold them against it until release_memory().
+        
+        The result is check_memory_budget()'s plus a reservation_id (None when they don't fit).
+        """
+        async with self._reservation_lock:
+            budget = await self.check_memory_budget(model_names)
+            budget["reservation_id"] = None
+            if budget["fits"] and model_names:
+                budget["reservation_id"] = uuid.uuid4().hex
+                self._reservations[budget["reservation_id"]] = list(model_names)
+            return budget
+    
+    def release_memory(self, reservation_id: Optional[str]) -> None:
+        """Drop a run's reservation once it has finished (no-op for None or an unknown id)."""
+        if reservation_id:
+            self._reservations.pop(reservation_id, None)
+    
+    async def warm_up_models(self, model_names: List[str], keep_alive: Optional[str] = None) -> List[Dict[str, any]]:
+        """Load models into memory ahead of a run and pin them for keep_alive.
+        
+        Models are loaded one at a time so they don't compete for memory. A model that
+        is already resident only has its keep-alive extended.
+        """
+        keep_alive = keep_alive or OLLAMA_KEEP_ALIVE
+        resident = {model["model_name"] for model in await self.get_resident_models()}
+        
+        results = []
+        for model_name in model_names:
+            started = time.perf_counter()
+            try:
+                # An empty prompt loads the model without generating anything
+                response = await self._async_client.generate(model=model_name, prompt="", keep_alive=keep_alive)
+                load_duration = getattr(response, "load_duration", None)
+                results.append({
+                    "model_name": model_name,
+                    "success": True,
+                    "already_loaded": model_name in resident,
+                    "load_seconds": round(load_duration / 1e9, 3) if load_duration else 0.0,
+                    "elapsed_seconds": round(time.perf_counter() - started, 3),
+                    "error": None,
+                })
+                self._pinned_until[model_name] = time.monotonic() + _duration_seconds(keep_alive)
+                if model_name not in resident:
+                    logger.info(f"Warmed up Ollama model {model_name} in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                logger.warning(f"Failed to warm up Ollama model {model_name}: {e}")
+                results.append({
+                    "model_name": model_name,
+                    "success": False,
+                    "already_loaded": False,
+                    "load_seconds": None,
+                    "elapsed_seconds": round(time.perf_counter() - started, 3),
+                    "error": str(e),
+                })
+        return results
+    
+    async def keep_models_pinned(self, model_names: List[str]) -> List[Dict[str, any]]:
+        """Re-pin models whose keep-alive from warm_up_models() is more than half used up.
+        
+        Models pinned recently are left alone, so calling this often (e.g. once per
+        backtest day) doesn't cost an Ollama round trip each time.
+        """
+        renew_within = _duration_seconds(OLLAMA_KEEP_ALIVE) / 2
+        now = time.monotonic()
+        expiring = [name for name in model_names if self._pinned_until.get(name, 0.0) - now < renew_within]
+        if not expiring:
+            return []
+        return await self.warm_up_models(expiring)
+    
     def get_download_progress(self, model_name: str) -> Optional[Dict[str, any]]:
         """Get current download progress for a model."""
         return self._download_progress.get(model_name)
@@ -175,7 +371,15 @@ class OllamaService:
     # PRIVATE HELPER METHODS
     # =============================================================================
     
-
+    async def _refresh_status_periodically(self, interval: float) -> None:
+        """Refresh the status snapshot every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_status()
+            except Exception as e:
+                logger.debug(f"Background Ollama status refresh failed: {e}")
+    
     def _create_error_status(self, error: str) -> Dict[str, any]:
         """Create error status response."""
         return {
@@ -193,16 +397,8 @@ class OllamaService:
         return await loop.run_in_executor(None, self._is_ollama_installed)
     
     def _is_ollama_installed(self) -> bool:
-        """Check if Ollama is installed on the system."""
-        system = platform.system().lower()
-        command = ["which", "ollama"] if system in ["darwin", "linux"] else ["where", "ollama"]
-        shell = system == "windows"
-        
-        try:
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=shell)
-            return result.returncode == 0
-        except Exception:
-            return False
+        """Check if Ollama is installed on the system (PATH lookup, no subprocess)."""
+        return shutil.which("ollama") is not None
     
     async def _check_server_running(self) -> bool:
         """Check if the Ollama server is running using the ollama client."""
@@ -214,20 +410,26 @@ class OllamaService:
             logger.debug(f"Ollama server not reachable: {e}")
             return False
     
-    async def _get_server_info(self, is_running: bool) -> tuple[List[str], str]:
-        """Get server information (models and URL) if server is running."""
-        if not is_running:
-            return [], ""
-        
+    async def _get_server_info(self) -> tuple[bool, List[str], str]:
+        """Get running state, models and URL from a single list() call."""
         try:
             response = await self._async_client.list()
             models = [model.model for model in response.models]
             server_url = getattr(self._async_client, 'host', 'http://localhost:11434')
             logger.debug(f"Found {len(models)} locally available models")
-            return models, server_url
+            return True, models, server_url
+        except Exception as e:
+            logger.debug(f"Ollama server not reachable: {e}")
+            return False, [], ""
+    
+    async def _get_model_disk_sizes(self) -> Dict[str, int]:
+        """Get the on-disk size of every downloaded model."""
+        try:
+            response = await self._async_client.list()
+            return {model.model: model.size or 0 for model in response.models}
         except Exception as e:
-            logger.debug(f"Failed to get server info: {e}")
-            return [], ""
+            logger.debug(f"Failed to get model sizes: {e}")
+            return {}
     
     async def _execute_server_start(self) -> bool:
         """Execute server start operation."""
@@ -515,5 +717,21 @@ class OllamaService:
         
         return api_models
 
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _duration_seconds(keep_alive: str) -> float:
+    """Seconds in an Ollama keep_alive value ("30m", "1h30m", "300", negative = forever)."""
+    value = str(keep_alive).strip()
+    if value.startswith("-"):
+        return float("inf")
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
 # Global service instance
 ollama_service = OllamaService() 
\ No newline at end of file
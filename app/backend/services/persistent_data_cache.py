@@ -0,0 +1,237 @@
+import importlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.backend.database.connection import BACKEND_DIR
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding src.tools.api responses across restarts (kept apart from hedge_fund.db)
+DATA_CACHE_DB_PATH = Path(os.getenv("DATA_CACHE_DB_PATH", str(BACKEND_DIR / "data_cache.db")))
+
+# Set to "false" to keep the data cache in memory only
+DATA_CACHE_PERSIST = os.getenv("DATA_CACHE_PERSIST", "true").lower() == "true"
+
+# Seconds a response stays fresh, as (historical, current). A response is "current" when its
+# end_date is today or later, since the provider may still add data for it; None = never expires.
+FRESHNESS_RULES: Dict[str, Tuple[Optional[float], float]] = {
+    "get_prices": (None, 15 * 60),
+    "get_financial_metrics": (None, 12 * 3600),
+    "search_line_items": (None, 12 * 3600),
+    "get_insider_trades": (None, 6 * 3600),
+    "get_company_news": (None, 3600),
+    "get_market_cap": (None, 3600),
+}
+DEFAULT_FRESHNESS = (None, 3600)
+
+# Seconds an empty response (None or no items) is kept, historical or not. Empty usually means a
+# provider hiccup or a missing/invalid api_key (which isn't part of the key), not "no data ever"
+DATA_CACHE_EMPTY_TTL = float(os.getenv("DATA_CACHE_EMPTY_TTL", "600"))
+
+# Marks "not in the store" (None is a valid cached market cap)
+MISSING = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_cache (
+    key TEXT PRIMARY KEY,
+    range_key TEXT NOT NULL,
+    function TEXT NOT NULL,
+    ticker TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_data_cache_range ON data_cache (range_key, start_date, end_date);
+CREATE INDEX IF NOT EXISTS ix_data_cache_function_ticker ON data_cache (function, ticker);
+"""
+
+
+class PersistentDataCache:
+    """SQLite-backed store for data API responses, shared by every run and kept across restarts.
+
+    Responses are stored as JSON together with the import path of their pydantic model,
+    so they come back as the same objects src.tools.api returns.
+    """
+
+    def __init__(self, path: Path = DATA_CACHE_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # =============================================================================
+    # PUBLIC API METHODS
+    # =============================================================================
+
+    def get(self, key: str) -> Any:
+        """Return a fresh response stored under key, or MISSING."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload FROM data_cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return MISSING
+        return _decode(row[0])
+
+    def get_covering_range(self, range_key: str, start_date: str, end_date: str) -> Tuple[Any, Optional[str], Optional[str]]:
+        """Return the smallest fresh stored range containing [start_date, end_date] as (value, start, end)."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload, start_date, end_date FROM data_cache "
+                "WHERE range_key = ? AND start_date <= ? AND end_date >= ? AND (expires_at IS NULL OR expires_at > ?) "
+                "ORDER BY size LIMIT 1",
+                (range_key, start_date, end_date, time.time()),
+            ).fetchone()
+        if row is None:
+            return MISSING, None, None
+        return _decode(row[0]), row[1], row[2]
+
+    def put(
+        self,
+        key: str,
+        function: str,
+        value: Any,
+        ticker: Optional[str] = None,
+        end_date: Optional[str] = None,
+        start_date: Optional[str] = None,
+        range_key: Optional[str] = None,
+    ) -> bool:
+        """Store a response with the freshness rule of its function. Returns False if it can't be encoded."""
+        payload = _encode(value)
+        if payload is None:
+            return False
+
+        historical_ttl, current_ttl = FRESHNESS_RULES.get(function, DEFAULT_FRESHNESS)
+        ttl = current_ttl if _is_current(end_date) else historical_ttl
+        if _is_empty(value):
+            ttl = DATA_CACHE_EMPTY_TTL if ttl is None else min(ttl, DATA_CACHE_EMPTY_TTL)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO data_cache "
+                "(key, range_key, function, ticker, start_date, end_date, payload, size, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, range_key or key, function, ticker, start_date, end_date, payload, len(payload), now,
+                 now + ttl if ttl is not None else None),
+            )
+            conn.commit()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and sizes per function, plus the database file size."""
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                "SELECT function, COUNT(*), COALESCE(SUM(size), 0), "
+                "SUM(CASE WHEN expires_at IS NOT NULL AND expires_at <= ? THEN 1 ELSE 0 END) "
+                "FROM data_cache GROUP BY function",
+                (time.time(),),
+            ).fetchall()
+            tickers = conn.execute("SELECT COUNT(DISTINCT ticker) FROM data_cache").fetchone()[0]
+
+        functions = {
+            function: {"entries": count, "bytes": size, "expired": expired}
+            for function, count, size, expired in rows
+        }
+        return {
+            "path": str(self.path),
+            "file_bytes": self.path.stat().st_size if self.path.exists() else 0,
+            "entries": sum(f["entries"] for f in functions.values()),
+            "bytes": sum(f["bytes"] for f in functions.values()),
+            "tickers": tickers,
+            "functions": functions,
+        }
+
+    def purge(self, function: Optional[str] = None, ticker: Optional[str] = None, expired_only: bool = False) -> int:
+        """Delete stored responses matching all given filters. Returns the number deleted."""
+        clauses, params = [], []
+        if function:
+            clauses.append("function = ?")
+            params.append(function)
+        if ticker:
+            clauses.append("ticker = ?")
+            params.append(ticker)
+        if expired_only:
+            clauses.append("expires_at IS NOT NULL AND expires_at <= ?")
+            params.append(time.time())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute(f"DELETE FROM data_cache{where}", params).rowcount
+            conn.commit()
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # =============================================================================
+    # PRIVATE HELPER METHODS
+    # =============================================================================
+
+    def _connection(self) -> sqlite3.Connection:
+        # Caller holds the lock; opened on first use so importing the backend never touches the file
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+
+def _is_current(end_date: Optional[str]) -> bool:
+    if not end_date:
+        return True
+    return str(end_date)[:10] >= date.today().isoformat()
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (list, dict)) and not value)
+
+
+def _encode(value: Any) -> Optional[str]:
+    """JSON payload recording the model class of list items (None if the value isn't storable)."""
+    try:
+        if isinstance(value, list):
+            if value and hasattr(value[0], "model_dump"):
+                model = type(value[0])
+                return json.dumps({
+                    "model": f"{model.__module__}:{model.__qualname__}",
+                    "items": [item.model_dump(mode="json") for item in value],
+                })
+            return json.dumps({"model": None, "items": value})
+        return json.dumps({"value": value})
+    except (TypeError, ValueError) as e:
+        logger.debug(f"Not persisting data cache value: {e}")
+        return None
+
+
+def _decode(payload: str) -> Any:
+    data = json.loads(payload)
+    if "value" in data:
+        return data["value"]
+    if not data["model"]:
+        return data["items"]
+    module_name, qualname = data["model"].split(":", 1)
+    model = getattr(importlib.import_module(module_name), qualname)
+    return [model.model_validate(item) for item in data["items"]]
+
+
+# Global instance (None when persistence is disabled)
+persistent_data_cache: Optional[PersistentDataCache] = PersistentDataCache() if DATA_CACHE_PERSIST else None
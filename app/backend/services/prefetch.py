@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.backend.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Set to "false" to let /run start the graph without the prefetch stage
+RUN_PREFETCH_ENABLED = os.getenv("RUN_PREFETCH_ENABLED", "true").lower() == "true"
+
+# Data requests in flight at once during a prefetch
+PREFETCH_MAX_CONCURRENCY = int(os.getenv("PREFETCH_MAX_CONCURRENCY", "8"))
+
+# Placeholders in DataCall arguments, filled in with the run's dates
+START_DATE = "<start_date>"
+END_DATE = "<end_date>"
+
+PREFETCH_DATA_CALLS = registry.counter(
+    "prefetch_data_calls_total", "Agent data calls after a /run prefetch, by whether the data cache served them", ["function", "result"]
+)
+
+
+class DataCall(NamedTuple):
+    """One src.tools.api call made per ticker; ticker and api_key are added when it runs."""
+    function: str
+    arguments: Tuple[Tuple[str, Any], ...]
+
+    @classmethod
+    def of(cls, function: str, **arguments: Any) -> "DataCall":
+        return cls(function, tuple(sorted(arguments.items())))
+
+
+# The calls each agent makes per ticker (by base agent key), argument for argument: the
+# shared data cache keys on every bound argument, so a prefetch with another limit or
+# start_date is a different entry. Investor persona agents not listed use the default.
+AGENT_DATA_CALLS: Dict[str, List[DataCall]] = {
+    "technical_analyst": [DataCall.of("get_prices", start_date=START_DATE, end_date=END_DATE)],
+    "fundamentals_analyst": [DataCall.of("get_financial_metrics", end_date=END_DATE, period="ttm", limit=10)],
+    "sentiment_analyst": [
+        DataCall.of("get_insider_trades", end_date=END_DATE, limit=1000),
+        DataCall.of("get_company_news", end_date=END_DATE, limit=100),
+    ],
+    "news_sentiment_analyst": [DataCall.of("get_company_news", end_date=END_DATE, limit=100)],
+    "valuation_analyst": [
+        DataCall.of("get_financial_metrics", end_date=END_DATE, period="ttm", limit=8),
+        DataCall.of("get_market_cap", end_date=END_DATE),
+    ],
+    "growth_analyst": [
+        DataCall.of("get_financial_metrics", end_date=END_DATE, period="ttm", limit=12),
+        DataCall.of("get_insider_trades", end_date=END_DATE, limit=1000),
+    ],
+    # Sizes positions from prices; one is added for every portfolio manager
+    "risk_management_agent": [DataCall.of("get_prices", start_date=START_DATE, end_date=END_DATE)],
+    "portfolio_manager": [],
+}
+DEFAULT_AGENT_DATA_CALLS: List[DataCall] = [
+    DataCall.of("get_financial_metrics", end_date=END_DATE, period="ttm", limit=10),
+    DataCall.of("get_market_cap", end_date=END_DATE),
+]
+
+
+def agent_data_calls(agent_id: str) -> List[DataCall]:
+    """The data calls a graph node makes per ticker."""
+    from app.backend.services.graph import extract_base_agent_key
+
+    return AGENT_DATA_CALLS.get(extract_base_agent_key(agent_id), DEFAULT_AGENT_DATA_CALLS)
+
+
+def required_calls(agent_ids: Iterable[str]) -> Set[DataCall]:
+    """Union of the data calls the given graph nodes (and their risk managers) will make."""
+    calls: Set[DataCall] = set()
+    for agent_id in agent_ids:
+        calls.update(agent_data_calls(agent_id))
+        if agent_id.startswith("portfolio_manager"):
+            calls.update(AGENT_DATA_CALLS["risk_management_agent"])
+    return calls
+
+
+async def prefetch_market_data(
+    tickers: List[str],
+    calls: Iterable[DataCall],
+    start_date: str,
+    end_date: str,
+    api_key: Optional[str],
+    max_concurrency: int = PREFETCH_MAX_CONCURRENCY,
+) -> Dict[str, float]:
+    """Make the given data calls for every ticker concurrently so later identical calls hit the data cache.
+
+    Failures are logged and counted but never raised: agents fetch whatever is missing
+    themselves. Returns {"requests", "failed", "seconds"}.
+    """
+    from app.backend.services.data_api import install_data_api_instrumentation
+    import src.tools.api as api
+
+    # Route the prefetch through the shared data cache
+    install_data_api_instrumentation()
+
+    dates = {START_DATE: start_date, END_DATE: end_date}
+
+    def run_call(call: DataCall, ticker: str):
+        arguments = {name: dates.get(value, value) if isinstance(value, str) else value for name, value in call.arguments}
+        return getattr(api, call.function)(ticker=ticker, api_key=api_key, **arguments)
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    failed = 0
+
+    async def fetch(call: DataCall, ticker: str):
+        nonlocal failed
+        async with semaphore:
+            try:
+                await asyncio.to_thread(run_call, call, ticker)
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Prefetch of {call.function} for {ticker} failed: {e}")
+
+    jobs = [(call, ticker) for call in calls for ticker in tickers]
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch(call, ticker) for call, ticker in jobs))
+    return {"requests": len(jobs), "failed": failed, "seconds": time.perf_counter() - started}
+
+
+def check_prefetch_hits(timeline) -> Dict[str, int]:
+    """Count the run's data calls that the prefetch should have served, by hit or miss.
+
+    Only calls an agent makes to a function listed for it count; a miss means the
+    prefetch arguments no longer match that agent's call and is logged.
+    """
+    counts = {"hit": 0, "miss": 0}
+    for call in timeline.data_calls:
+        agent = call["agent"]
+        if agent is None or call["function"] not in {listed.function for listed in agent_data_calls(agent)}:
+            continue
+        result = "hit" if call["cache_hit"] else "miss"
+        counts[result] += 1
+        PREFETCH_DATA_CALLS.inc(function=call["function"], result=result)
+        if result == "miss":
+            logger.warning(f"Prefetch missed {call['function']} called by {call['agent']}")
+    return counts
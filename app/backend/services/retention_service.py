@@ -0,0 +1,235 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.backend.database.connection import BACKEND_DIR, SessionLocal, engine
+from app.backend.database.models import HedgeFundFlow, HedgeFundFlowRun
+from app.backend.repositories.flow_repository import FlowRepository
+from app.backend.repositories.flow_run_repository import FlowRunRepository
+from app.backend.repositories.flow_run_cycle_repository import FlowRunCycleRepository
+
+logger = logging.getLogger(__name__)
+
+# Where archived run payloads are written (one gzip'd JSON file per run)
+ARCHIVE_DIR = Path(os.getenv("RUN_ARCHIVE_DIR", str(BACKEND_DIR / "archives")))
+
+# Defaults applied to flows without their own retention_policy (unset = rule disabled)
+DEFAULT_MAX_AGE_DAYS = int(os.getenv("RUN_RETENTION_MAX_AGE_DAYS", "0")) or None
+DEFAULT_MAX_RUNS = int(os.getenv("RUN_RETENTION_MAX_RUNS", "0")) or None
+
+# How often the background retention job runs (0 disables it)
+RETENTION_INTERVAL_HOURS = float(os.getenv("RUN_RETENTION_INTERVAL_HOURS", "24"))
+
+# Heavy JSON columns moved into the archive file; everything else stays on the row
+RUN_ARCHIVE_FIELDS = ("request_data", "initial_portfolio", "final_portfolio", "results")
+CYCLE_ARCHIVE_FIELDS = (
+    "analyst_signals",
+    "trading_decisions",
+    "executed_trades",
+    "portfolio_snapshot",
+    "performance_metrics",
+    "market_conditions",
+    "execution_timeline",
+)
+
+
+class RetentionService:
+    """Archives old flow runs to compressed files and reclaims SQLite space."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.flow_repo = FlowRepository(db)
+        self.run_repo = FlowRunRepository(db)
+        self.cycle_repo = FlowRunCycleRepository(db)
+
+    # =============================================================================
+    # PUBLIC API METHODS
+    # =============================================================================
+
+    def get_effective_policy(self, flow: HedgeFundFlow) -> Dict[str, Optional[int]]:
+        """Merge the flow's retention_policy over the process-wide defaults."""
+        policy = {"max_age_days": DEFAULT_MAX_AGE_DAYS, "max_runs": DEFAULT_MAX_RUNS}
+        if flow.retention_policy:
+            policy.update({k: v for k, v in flow.retention_policy.items() if k in policy})
+        return policy
+
+    def find_runs_to_archive(self, flow: HedgeFundFlow) -> List[HedgeFundFlowRun]:
+        """Return finished runs of a flow that fall outside its retention policy."""
+        policy = self.get_effective_policy(flow)
+        max_age_days, max_runs = policy["max_age_days"], policy["max_runs"]
+        if not max_age_days and not max_runs:
+            return []
+
+        # Newest first, so max_runs keeps the most recent finished runs intact
+        runs = self.run_repo.get_archivable_flow_runs(flow.id)
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days) if max_age_days else None
+
+        to_archive = []
+        for index, run in enumerate(runs):
+            too_many = max_runs is not None and index >= max_runs
+            too_old = cutoff is not None and run.created_at is not None and run.created_at.replace(tzinfo=None) < cutoff
+            if too_many or too_old:
+                to_archive.append(run)
+        return to_archive
+
+    def apply_policies(self, flow_id: Optional[int] = None, vacuum: bool = True) -> Dict[str, Any]:
+        """Archive every run outside its flow's policy, then reclaim free pages."""
+        if flow_id is not None:
+            flow = self.flow_repo.get_flow_by_id(flow_id)
+            flows = [flow] if flow else []
+        else:
+            flows = self.flow_repo.get_all_flows()
+
+        archived_run_ids = []
+        archived_bytes = 0
+        for flow in flows:
+            for run in self.find_runs_to_archive(flow):
+                try:
+                    archived_bytes += self.archive_run(run)
+                    archived_run_ids.append(run.id)
+                except Exception as e:
+                    logger.error(f"Failed to archive run {run.id} of flow {flow.id}: {e}")
+
+        freed_pages = self.incremental_vacuum() if vacuum and archived_run_ids else 0
+        if archived_run_ids:
+            logger.info(f"Archived {len(archived_run_ids)} runs ({archived_bytes} bytes), freed {freed_pages} pages")
+
+        return {
+            "archived_run_ids": archived_run_ids,
+            "archived_bytes": archived_bytes,
+            "freed_pages": freed_pages,
+        }
+
+    def archive_run(self, run: HedgeFundFlowRun) -> int:
+        """Move a run's heavy JSON (and its cycles') to disk. Returns the archive size in bytes."""
+        if run.archived_at is not None:
+            return 0
+
+        cycles = self.cycle_repo.get_all_cycles(run.id)
+        payload = {
+            "run_id": run.id,
+            "flow_id": run.flow_id,
+            "run": {field: getattr(run, field) for field in RUN_ARCHIVE_FIELDS},
+            "cycles": {
+                str(cycle.id): {field: getattr(cycle, field) for field in CYCLE_ARCHIVE_FIELDS}
+                for cycle in cycles
+            },
+        }
+
+        relative_path = Path(f"flow_{run.flow_id}") / f"run_{run.id}.json.gz"
+        archive_file = ARCHIVE_DIR / relative_path
+        self._write_archive(archive_file, payload)
+
+        try:
+            for field in RUN_ARCHIVE_FIELDS:
+                setattr(run, field, None)
+            for cycle in cycles:
+                for field in CYCLE_ARCHIVE_FIELDS:
+                    setattr(cycle, field, None)
+            run.archived_at = datetime.utcnow()
+            run.archive_path = relative_path.as_posix()
+            self.db.commit()
+        except Exception:
+            # Keep the database as the source of truth if the pointer could not be written
+            self.db.rollback()
+            archive_file.unlink(missing_ok=True)
+            raise
+
+        return archive_file.stat().st_size
+
+    def restore_run(self, run: HedgeFundFlowRun) -> HedgeFundFlowRun:
+        """Load an archived run's payload back into the database and drop the archive file."""
+        if run.archived_at is None:
+            return run
+
+        archive_file = ARCHIVE_DIR / run.archive_path
+        if not archive_file.exists():
+            raise FileNotFoundError(f"Archive file for run {run.id} not found: {archive_file}")
+
+        with gzip.open(archive_file, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+
+        for field, value in payload.get("run", {}).items():
+            if field in RUN_ARCHIVE_FIELDS:
+                setattr(run, field, value)
+
+        archived_cycles = payload.get("cycles", {})
+        for cycle in self.cycle_repo.get_all_cycles(run.id):
+            for field, value in archived_cycles.get(str(cycle.id), {}).items():
+                if field in CYCLE_ARCHIVE_FIELDS:
+                    setattr(cycle, field, value)
+
+        run.archived_at = None
+        run.archive_path = None
+        self.db.commit()
+        self.db.refresh(run)
+
+        archive_file.unlink(missing_ok=True)
+        return run
+
+    def delete_run_archive(self, archive_path: Optional[str]) -> None:
+        """Remove a run's archive file (call after the run row itself is deleted)."""
+        if archive_path:
+            (ARCHIVE_DIR / archive_path).unlink(missing_ok=True)
+
+    def delete_flow_archives(self, flow_id: int) -> None:
+        """Remove every archive file of a flow (call after its runs are deleted)."""
+        shutil.rmtree(ARCHIVE_DIR / f"flow_{flow_id}", ignore_errors=True)
+
+    def incremental_vacuum(self) -> int:
+        """Return free pages to the filesystem. Returns the number of pages freed."""
+        # PRAGMA/VACUUM cannot run inside a transaction, so use an autocommit connection
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            auto_vacuum = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+            if auto_vacuum != 2:
+                # Switching an existing database to INCREMENTAL only takes effect after one full VACUUM
+                logger.info("Enabling incremental auto_vacuum (one-time full VACUUM)")
+                conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+                before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                conn.exec_driver_sql("VACUUM")
+                return before
+
+            before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            # sqlite frees one page per step, so the result must be fully consumed
+            conn.exec_driver_sql("PRAGMA incremental_vacuum").fetchall()
+            after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            return before - after
+
+    # =============================================================================
+    # PRIVATE HELPER METHODS
+    # =============================================================================
+
+    def _write_archive(self, archive_file: Path, payload: Dict[str, Any]) -> None:
+        """Write the payload atomically so a crash never leaves a truncated archive."""
+        archive_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = archive_file.with_suffix(archive_file.suffix + ".tmp")
+        with gzip.open(tmp_file, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), ensure_ascii=False, default=str)
+        os.replace(tmp_file, archive_file)
+
+
+async def run_retention_periodically(interval_hours: float = RETENTION_INTERVAL_HOURS) -> None:
+    """Background loop applying retention policies for all flows."""
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            await asyncio.to_thread(_apply_all_policies)
+        except Exception as e:
+            logger.warning(f"Retention job failed: {e}")
+
+
+def _apply_all_policies() -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return RetentionService(db).apply_policies()
+    finally:
+        db.close()
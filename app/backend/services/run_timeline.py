@@ -0,0 +1,247 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+# USD per million (input, output) tokens; matched by longest model-name prefix
+MODEL_PRICING = {
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "o3": (2.00, 8.00),
+    "o4-mini": (1.10, 4.40),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-opus-4": (15.00, 75.00),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "llama-3.3-70b": (0.59, 0.79),
+    "grok-4": (3.00, 15.00),
+}
+
+# Timeline of the graph run executing in the current context (None when not recording)
+current_timeline: ContextVar[Optional["RunTimeline"]] = ContextVar("current_timeline", default=None)
+
+# Agent node executing in the current context, used to attribute LLM and data calls
+current_node: ContextVar[Optional[str]] = ContextVar("current_node", default=None)
+
+
+def estimate_cost(model_name: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    """Estimate the USD cost of a call from the pricing table (0 for unknown/local models)."""
+    if not model_name:
+        return 0.0
+    matches = [prefix for prefix in MODEL_PRICING if model_name.startswith(prefix)]
+    if not matches:
+        return 0.0
+    input_price, output_price = MODEL_PRICING[max(matches, key=len)]
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+class RunTimeline:
+    """Records node spans, LLM calls and data calls for one graph run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.nodes: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.data_calls: List[Dict[str, Any]] = []
+
+    def offset_ms(self) -> float:
+        """Milliseconds since the timeline started (monotonic)."""
+        return round((time.perf_counter() - self._origin) * 1000, 3)
+
+    @contextmanager
+    def node(self, name: str) -> Iterator[None]:
+        """Record a node span and attribute calls made inside it to the node."""
+        token = current_node.set(name)
+        start_ms = self.offset_ms()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            end_ms = self.offset_ms()
+            current_node.reset(token)
+            with self._lock:
+                self.nodes.append({
+                    "node": name,
+                    "start_ms": start_ms,
+                    "end_ms": end_ms,
+                    "duration_ms": round(end_ms - start_ms, 3),
+                    "status": status,
+                })
+
+    def record_llm_call(
+        self,
+        start_ms: float,
+        model_name: Optional[str],
+        provider: Optional[str],
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        status: str = "ok",
+        cache_hit: bool = False,
+    ) -> None:
+        end_ms = self.offset_ms()
+        with self._lock:
+            self.llm_calls.append({
+                "agent": current_node.get(),
+                "model": model_name,
+                "provider": provider,
+                "start_ms": start_ms,
+                "latency_ms": round(end_ms - start_ms, 3),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                # Replayed responses cost nothing
+                "estimated_cost": 0.0 if cache_hit else estimate_cost(model_name, input_tokens, output_tokens),
+                "status": status,
+                "cache_hit": cache_hit,
+            })
+
+    def record_data_call(self, function: str, start_ms: float, cache_hit: Optional[bool], status: str = "ok") -> None:
+        end_ms = self.offset_ms()
+        with self._lock:
+            self.data_calls.append({
+                "agent": current_node.get(),
+                "function": function,
+                "start_ms": start_ms,
+                "latency_ms": round(end_ms - start_ms, 3),
+                "cache_hit": cache_hit,
+                "status": status,
+            })
+
+    @property
+    def estimated_cost(self) -> float:
+        return sum(call["estimated_cost"] for call in self.llm_calls)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "duration_ms": self.offset_ms(),
+                "nodes": list(self.nodes),
+                "llm_calls": list(self.llm_calls),
+                "data_calls": list(self.data_calls),
+            }
+
+
+def summarize_timeline(timeline: Dict[str, Any]) -> Dict[str, Any]:
+    """Aggregate a stored timeline by agent and by provider/model."""
+    by_agent: Dict[str, Dict[str, Any]] = {}
+    for node in timeline.get("nodes", []):
+        agent = by_agent.setdefault(node["node"], _empty_agent_summary())
+        agent["node_ms"] += node["duration_ms"]
+    for call in timeline.get("llm_calls", []):
+        agent = by_agent.setdefault(call["agent"] or "unknown", _empty_agent_summary())
+        agent["llm_calls"] += 1
+        agent["llm_ms"] += call["latency_ms"]
+        agent["estimated_cost"] += call["estimated_cost"]
+    for call in timeline.get("data_calls", []):
+        agent = by_agent.setdefault(call["agent"] or "unknown", _empty_agent_summary())
+        agent["data_calls"] += 1
+        agent["data_ms"] += call["latency_ms"]
+
+    by_model: Dict[str, Dict[str, Any]] = {}
+    for call in timeline.get("llm_calls", []):
+        key = f"{call['provider'] or 'unknown'}/{call['model'] or 'unknown'}"
+        model = by_model.setdefault(key, {"calls": 0, "latency_ms": 0.0, "input_tokens": 0, "output_tokens": 0, "estimated_cost": 0.0})
+        model["calls"] += 1
+        model["latency_ms"] += call["latency_ms"]
+        model["input_tokens"] += call["input_tokens"]
+        model["output_tokens"] += call["output_tokens"]
+        model["estimated_cost"] += call["estimated_cost"]
+
+    return {"by_agent": by_agent, "by_model": by_model}
+
+
+def _empty_agent_summary() -> Dict[str, Any]:
+    return {"node_ms": 0.0, "llm_calls": 0, "llm_ms": 0.0, "data_calls": 0, "data_ms": 0.0, "estimated_cost": 0.0}
+
+
+def create_timeline_callback(timeline: RunTimeline):
+    """Build a LangChain callback handler that records every LLM call into the timeline."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class TimelineCallbackHandler(BaseCallbackHandler):
+        def __init__(self):
+            self._pending: Dict[Any, tuple] = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._start(serialized, run_id, kwargs)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._start(serialized, run_id, kwargs)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            pending = self._pending.pop(run_id, None)
+            if pending is None:
+                return
+            start_ms, model_name, provider = pending
+            input_tokens, output_tokens = _token_usage(response)
+            # Imported here: the cache module depends on the database layer
+            from app.backend.services.llm_cache import last_lookup_hit
+            timeline.record_llm_call(
+                start_ms, model_name, provider, input_tokens, output_tokens, cache_hit=last_lookup_hit.get()
+            )
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            pending = self._pending.pop(run_id, None)
+            if pending is not None:
+                start_ms, model_name, provider = pending
+                timeline.record_llm_call(start_ms, model_name, provider, status="error")
+
+        def _start(self, serialized, run_id, kwargs):
+            params = kwargs.get("invocation_params") or {}
+            model_name = params.get("model") or params.get("model_name")
+            provider = (serialized or {}).get("id", [None])[-1]
+            self._pending[run_id] = (timeline.offset_ms(), model_name, provider)
+
+    return TimelineCallbackHandler()
+
+
+def _token_usage(response) -> tuple:
+    """Extract (input, output) token counts from an LLMResult across providers."""
+    usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage") or {}
+    input_tokens = usage.get("prompt_tokens") or usage.get("input_tokens") or 0
+    output_tokens = usage.get("completion_tokens") or usage.get("output_tokens") or 0
+    if input_tokens or output_tokens:
+        return input_tokens, output_tokens
+
+    # Newer chat models report usage on the message instead
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            input_tokens += metadata.get("input_tokens", 0)
+            output_tokens += metadata.get("output_tokens", 0)
+    return input_tokens, output_tokens
+
+
+def save_timeline_cycle(flow_run_id: int, timeline: RunTimeline, **fields: Any):
+    """Persist one flow-run cycle with the timeline and its call counts/cost."""
+    # Imported here so node/data instrumentation can import this module without the database layer
+    from app.backend.database.connection import SessionLocal
+    from app.backend.repositories.flow_run_cycle_repository import FlowRunCycleRepository
+
+    db = SessionLocal()
+    try:
+        return FlowRunCycleRepository(db).create_cycle(
+            flow_run_id,
+            llm_calls_count=len(timeline.llm_calls),
+            api_calls_count=len(timeline.data_calls),
+            estimated_cost=f"{timeline.estimated_cost:.6f}",
+            execution_timeline=timeline.to_dict(),
+            started_at=timeline.started_at,
+            completed_at=datetime.now(timezone.utc),
+            **fields,
+        )
+    finally:
+        db.close()
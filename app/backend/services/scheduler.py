@@ -0,0 +1,318 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.backend.database.connection import SessionLocal
+from app.backend.models.schemas import FlowRunCycleStatus, FlowRunStatus, HedgeFundRequest
+from app.backend.repositories.flow_repository import FlowRepository
+from app.backend.repositories.flow_run_repository import FlowRunRepository
+from app.backend.repositories.flow_run_cycle_repository import FlowRunCycleRepository
+from app.backend.services.api_key_service import ApiKeyService
+from app.backend.services.graph import create_graph, parse_hedge_fund_response, run_graph_async
+from app.backend.services.portfolio import create_portfolio
+from app.backend.services.run_timeline import RunTimeline, save_timeline_cycle
+
+logger = logging.getLogger(__name__)
+
+# How often due runs are looked for (0 disables the scheduler)
+SCHEDULER_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_INTERVAL_SECONDS", "60"))
+
+# Graph executions running at once across all scheduled flows
+SCHEDULER_MAX_CONCURRENT_CYCLES = int(os.getenv("SCHEDULER_MAX_CONCURRENT_CYCLES", "2"))
+
+# Market data requests in flight at once while prefetching shared tickers
+SCHEDULER_MAX_CONCURRENT_FETCHES = int(os.getenv("SCHEDULER_MAX_CONCURRENT_FETCHES", "4"))
+
+SCHEDULE_INTERVALS = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+RUN_DURATIONS = {
+    "1day": timedelta(days=1),
+    "1week": timedelta(weeks=1),
+    "1month": timedelta(days=30),
+}
+DEFAULT_SCHEDULE = "daily"
+
+
+class FlowRunScheduler:
+    """Executes due continuous/advisory flow runs as cycles.
+
+    Runs that are due in the same tick have their market data fetched once per
+    ticker before any graph starts, so agents of every flow read it from the data
+    cache. Continuous runs paper-trade the decisions and carry the portfolio from
+    cycle to cycle; advisory runs only record the decisions.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_cycles: int = SCHEDULER_MAX_CONCURRENT_CYCLES,
+        max_concurrent_fetches: int = SCHEDULER_MAX_CONCURRENT_FETCHES,
+    ):
+        self._cycle_semaphore = asyncio.Semaphore(max(1, max_concurrent_cycles))
+        self._fetch_semaphore = asyncio.Semaphore(max(1, max_concurrent_fetches))
+        # Runs with a cycle still executing are never started again until it finishes
+        self._in_flight: Set[int] = set()
+
+    # =============================================================================
+    # PUBLIC API METHODS
+    # =============================================================================
+
+    async def tick(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Run one cycle for every due run. Returns the run ids started and completed."""
+        now = now or datetime.now(timezone.utc)
+        due_runs, completed_run_ids = await asyncio.to_thread(self._collect_due_runs, now, set(self._in_flight))
+        if not due_runs:
+            return {"started_run_ids": [], "completed_run_ids": completed_run_ids}
+
+        self._in_flight.update(run["run_id"] for run in due_runs)
+        try:
+            requests = {}
+            for run in due_runs:
+                try:
+                    requests[run["run_id"]] = await asyncio.to_thread(self._build_request, run, now)
+                except Exception as e:
+                    await self._save_failed_cycle(run, f"Invalid request data: {e}")
+
+            shared_prices = await self.prefetch_shared_data(list(requests.values()))
+            await asyncio.gather(
+                *(self.run_cycle(run, requests[run["run_id"]], shared_prices) for run in due_runs if run["run_id"] in requests)
+            )
+        finally:
+            self._in_flight.difference_update(run["run_id"] for run in due_runs)
+
+        return {"started_run_ids": [run["run_id"] for run in due_runs], "completed_run_ids": completed_run_ids}
+
+    async def prefetch_shared_data(self, requests: List[HedgeFundRequest]) -> Dict[str, float]:
+        """Fetch each (ticker, window) once for all requests. Returns the latest close per ticker."""
+        windows: Dict[Tuple[str, str, str], Optional[str]] = {}
+        for request in requests:
+            if request.is_offline():
+                continue
+            api_key = (request.api_keys or {}).get("FINANCIAL_DATASETS_API_KEY")
+            for ticker in request.tickers:
+                key = (ticker, request.get_start_date(), request.end_date)
+                # The data is the same whichever flow's key fetches it
+                windows[key] = windows.get(key) or api_key
+
+        async def fetch(ticker: str, start_date: str, end_date: str, api_key: Optional[str]):
+            async with self._fetch_semaphore:
+                try:
+                    return ticker, await asyncio.to_thread(self._fetch_ticker_data, ticker, start_date, end_date, api_key)
+                except Exception as e:
+                    logger.warning(f"Scheduler prefetch failed for {ticker}: {e}")
+                    return ticker, None
+
+        results = await asyncio.gather(*(fetch(*key, api_key) for key, api_key in windows.items()))
+        return {ticker: price for ticker, price in results if price is not None}
+
+    async def run_cycle(self, run: Dict[str, Any], request: HedgeFundRequest, shared_prices: Dict[str, float]) -> None:
+        """Execute one graph run for a scheduled flow run and persist it as a cycle."""
+        async with self._cycle_semaphore:
+            timeline = RunTimeline()
+            try:
+                graph = create_graph(graph_nodes=request.graph_nodes, graph_edges=request.graph_edges).compile()
+                portfolio = run["portfolio"] or create_portfolio(
+                    request.initial_cash, request.margin_requirement, request.tickers, request.portfolio_positions
+                )
+                model_provider = getattr(request.model_provider, "value", request.model_provider)
+
+                result = await run_graph_async(
+                    graph=graph,
+                    portfolio=portfolio,
+                    tickers=request.tickers,
+                    start_date=request.get_start_date(),
+                    end_date=request.end_date,
+                    model_name=request.model_name,
+                    model_provider=model_provider,
+                    request=request,
+                    timeline=timeline,
+                )
+                if not result or not result.get("messages"):
+                    raise RuntimeError("Failed to generate hedge fund decisions")
+
+                decisions = parse_hedge_fund_response(result["messages"][-1].content) or {}
+                current_prices = {**shared_prices, **result.get("data", {}).get("current_prices", {})}
+                current_prices = {ticker: current_prices[ticker] for ticker in request.tickers if ticker in current_prices}
+
+                executed_trades = None
+                if run["trading_mode"] == "continuous":
+                    executed_trades, portfolio = self._paper_trade(request, portfolio, decisions, current_prices)
+
+                await asyncio.to_thread(
+                    save_timeline_cycle,
+                    run["run_id"],
+                    timeline,
+                    analyst_signals=result.get("data", {}).get("analyst_signals", {}),
+                    trading_decisions=decisions,
+                    executed_trades=executed_trades,
+                    portfolio_snapshot=portfolio,
+                    market_conditions={"date": request.end_date, "current_prices": current_prices},
+                    trigger_reason="scheduled",
+                    status=FlowRunCycleStatus.COMPLETED.value,
+                )
+            except Exception as e:
+                logger.error(f"Scheduled cycle for flow run {run['run_id']} failed: {e}")
+                await self._save_failed_cycle(run, str(e), timeline)
+
+    # =============================================================================
+    # PRIVATE HELPER METHODS
+    # =============================================================================
+
+    def _collect_due_runs(self, now: datetime, in_flight: Set[int]) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """Find runs whose next cycle is due and complete runs past their duration."""
+        db = SessionLocal()
+        try:
+            run_repo = FlowRunRepository(db)
+            cycle_repo = FlowRunCycleRepository(db)
+            flow_repo = FlowRepository(db)
+
+            due_runs, completed_run_ids = [], []
+            for flow_run in run_repo.get_scheduled_flow_runs():
+                if flow_run.id in in_flight:
+                    continue
+
+                latest_cycle = cycle_repo.get_latest_cycle(flow_run.id)
+                started_at = _as_utc(flow_run.started_at) or now
+                duration = RUN_DURATIONS.get(flow_run.duration)
+                if duration is not None and now >= started_at + duration:
+                    if latest_cycle is not None and latest_cycle.portfolio_snapshot is not None:
+                        flow_run.final_portfolio = latest_cycle.portfolio_snapshot
+                    run_repo.update_flow_run(
+                        flow_run.id,
+                        status=FlowRunStatus.COMPLETE,
+                        results={"total_cycles": cycle_repo.get_cycle_count(flow_run.id)},
+                    )
+                    completed_run_ids.append(flow_run.id)
+                    continue
+
+                interval = SCHEDULE_INTERVALS[flow_run.schedule or DEFAULT_SCHEDULE]
+                if latest_cycle is not None and now < _as_utc(latest_cycle.started_at) + interval:
+                    continue
+
+                flow = flow_repo.get_flow_by_id(flow_run.flow_id)
+                due_runs.append({
+                    "run_id": flow_run.id,
+                    "trading_mode": flow_run.trading_mode,
+                    "request_data": flow_run.request_data or {},
+                    "flow_nodes": flow.nodes if flow else [],
+                    "flow_edges": flow.edges if flow else [],
+                    # Continuous runs pick up where the previous cycle left the portfolio
+                    "portfolio": (latest_cycle.portfolio_snapshot if latest_cycle else None) or flow_run.initial_portfolio,
+                })
+            return due_runs, completed_run_ids
+        finally:
+            db.close()
+
+    def _build_request(self, run: Dict[str, Any], now: datetime) -> HedgeFundRequest:
+        """Validate the stored request for this cycle, falling back to the flow's graph."""
+        request_data = {"graph_nodes": run["flow_nodes"], "graph_edges": run["flow_edges"], **run["request_data"]}
+        # Every cycle analyses the market as of the moment it runs
+        request_data.update(end_date=now.strftime("%Y-%m-%d"), start_date=None, flow_run_id=None)
+        request = HedgeFundRequest(**request_data)
+
+        if not request.api_keys:
+            db = SessionLocal()
+            try:
+                request.api_keys = ApiKeyService(db).get_api_keys_dict()
+            finally:
+                db.close()
+        return request
+
+    def _fetch_ticker_data(self, ticker: str, start_date: str, end_date: str, api_key: Optional[str]) -> Optional[float]:
+        """Warm the data cache for one ticker and return its latest close."""
+        from src.tools.api import get_company_news, get_financial_metrics, get_insider_trades, get_prices
+
+        prices = get_prices(ticker, start_date, end_date, api_key=api_key)
+        get_financial_metrics(ticker, end_date, limit=10, api_key=api_key)
+        get_insider_trades(ticker, end_date, start_date=start_date, limit=1000, api_key=api_key)
+        get_company_news(ticker, end_date, start_date=start_date, limit=1000, api_key=api_key)
+        return float(prices[-1].close) if prices else None
+
+    def _paper_trade(
+        self,
+        request: HedgeFundRequest,
+        portfolio: Dict[str, Any],
+        decisions: Dict[str, Any],
+        current_prices: Dict[str, float],
+    ) -> Tuple[Dict[str, int], Dict[str, Any]]:
+        """Apply decisions to the portfolio with the backtester's trade rules."""
+        from app.backend.services.backtest_service import BacktestService
+
+        broker = BacktestService(
+            graph=None,
+            portfolio=portfolio,
+            tickers=request.tickers,
+            start_date=request.get_start_date(),
+            end_date=request.end_date,
+            initial_capital=request.initial_cash,
+            request=request,
+        )
+        executed_trades = {}
+        for ticker in request.tickers:
+            if ticker not in current_prices:
+                continue  # No price, no trade
+            decision = decisions.get(ticker, {"action": "hold", "quantity": 0})
+            executed_trades[ticker] = broker.execute_trade(
+                ticker, decision.get("action", "hold"), decision.get("quantity", 0), current_prices[ticker]
+            )
+
+        snapshot = dict(broker.portfolio)
+        if len(current_prices) == len(request.tickers):
+            snapshot["total_value"] = broker.calculate_portfolio_value(current_prices)
+        return executed_trades, snapshot
+
+    async def _save_failed_cycle(self, run: Dict[str, Any], error_message: str, timeline: Optional[RunTimeline] = None) -> None:
+        try:
+            await asyncio.to_thread(
+                save_timeline_cycle,
+                run["run_id"],
+                timeline or RunTimeline(),
+                portfolio_snapshot=run["portfolio"],
+                trigger_reason="scheduled",
+                status=FlowRunCycleStatus.ERROR.value,
+                error_message=error_message,
+            )
+        except Exception as e:
+            logger.error(f"Failed to record failed cycle for flow run {run['run_id']}: {e}")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; they are stored in UTC
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+async def run_scheduler_periodically(interval_seconds: float = SCHEDULER_INTERVAL_SECONDS) -> None:
+    """Background loop executing due scheduled flow runs.
+
+    Ticks run as their own tasks so a long cycle never delays other flows becoming due;
+    runs still executing are skipped by the next tick.
+    """
+    ticks: Set[asyncio.Task] = set()
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            task = asyncio.create_task(flow_run_scheduler.tick())
+            ticks.add(task)
+            task.add_done_callback(_on_tick_done(ticks))
+    finally:
+        for task in ticks:
+            task.cancel()
+
+
+def _on_tick_done(ticks: Set[asyncio.Task]):
+    def callback(task: asyncio.Task) -> None:
+        ticks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Scheduler tick failed: {task.exception()}")
+
+    return callback
+
+
+# Global instance
+flow_run_scheduler = FlowRunScheduler()
@@ -0,0 +1,367 @@
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.backend.services.metrics import registry
+from app.backend.services.persistent_data_cache import MISSING, PersistentDataCache, persistent_data_cache
+
+logger = logging.getLogger(__name__)
+
+# Memory budget for cached results across all runs (0 disables the cache)
+DATA_CACHE_MAX_MB = float(os.getenv("DATA_CACHE_MAX_MB", "256"))
+
+# Results whose range reaches today can still change; they expire after this many seconds
+DATA_CACHE_VOLATILE_TTL = float(os.getenv("DATA_CACHE_VOLATILE_TTL", "900"))
+
+# Functions served from the cache; get_price_data is built on get_prices and so is covered by it
+CACHED_FUNCTIONS = (
+    "get_prices",
+    "get_financial_metrics",
+    "search_line_items",
+    "get_insider_trades",
+    "get_company_news",
+    "get_market_cap",
+)
+
+# Arguments that don't change the returned data
+IGNORED_ARGUMENTS = ("api_key",)
+
+DATA_CACHE_REQUESTS = registry.counter(
+    "data_cache_requests_total",
+    "Shared data cache lookups by outcome (hit, subset_hit, disk_hit, coalesced, miss)",
+    ["function", "result"],
+)
+DATA_CACHE_BYTES = registry.gauge("data_cache_bytes", "Approximate memory held by the shared data cache")
+DATA_CACHE_EVICTIONS = registry.counter("data_cache_evictions_total", "Entries evicted to stay within the memory budget")
+
+
+class _Flight:
+    """One in-progress fetch that identical concurrent requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "start_date", "end_date")
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float], start_date: Optional[str] = None, end_date: Optional[str] = None):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.start_date = start_date
+        self.end_date = end_date
+
+
+class SharedDataCache:
+    """Process-wide cache in front of the src.tools.api data functions.
+
+    Identical requests made concurrently (e.g. two runs analysing the same ticker)
+    share one provider call. Price requests are also served from any cached range
+    that contains them. Entries are evicted least-recently-used first once the
+    approximate memory budget is exceeded. Memory misses fall through to the
+    persistent store (when configured) before reaching the provider.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = int(DATA_CACHE_MAX_MB * 1024 * 1024),
+        volatile_ttl: float = DATA_CACHE_VOLATILE_TTL,
+        store: Optional[PersistentDataCache] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.volatile_ttl = volatile_ttl
+        self.store = store
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._bytes = 0
+        self._stats: Dict[str, int] = {"hit": 0, "subset_hit": 0, "disk_hit": 0, "coalesced": 0, "miss": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # =============================================================================
+    # PUBLIC API METHODS
+    # =============================================================================
+
+    def wrap(self, name: str, func: Callable, on_lookup: Optional[Callable[[bool], Any]] = None) -> Callable:
+        """Return func served through the cache; on_lookup(True) is called when a call is served without fetching."""
+        signature = inspect.signature(func)
+        is_prices = name == "get_prices"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return func(*args, **kwargs)  # Let the function raise its own error
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in IGNORED_ARGUMENTS}
+
+            try:
+                key = (name, _freeze(arguments))
+            except TypeError:
+                # Unhashable arguments: not cacheable
+                return func(*args, **kwargs)
+
+            def fetch():
+                return func(*args, **kwargs)
+
+            if is_prices:
+                value, result = self._get_prices(key, arguments, fetch)
+            else:
+                value, result = self._get_exact(key, arguments, fetch)
+
+            self._count(result)
+            DATA_CACHE_REQUESTS.inc(function=name, result=result)
+            if on_lookup is not None and result != "miss":
+                on_lookup(True)
+            return _copy(value)
+
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters, hit rate and memory use."""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hit"] + stats["subset_hit"] + stats["disk_hit"] + stats["coalesced"] + stats["miss"]
+            stats.update(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                in_flight=len(self._flights),
+                hit_rate=(lookups - stats["miss"]) / lookups if lookups else None,
+            )
+            return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            DATA_CACHE_BYTES.set(0)
+
+    # =============================================================================
+    # PRIVATE HELPER METHODS
+    # =============================================================================
+
+    def _get_exact(self, key: Hashable, arguments: Dict[str, Any], fetch: Callable) -> Tuple[Any, str]:
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry.value, "hit"
+
+        (value, source), coalesced = self._single_flight(key, lambda: self._load_or_fetch(key, arguments, fetch))
+        if not coalesced:
+            self._store(key, value, _end_date_of(arguments))
+        return value, "coalesced" if coalesced else source
+
+    def _get_prices(self, key: Hashable, arguments: Dict[str, Any], fetch: Callable) -> Tuple[Any, str]:
+        start_date, end_date = arguments.get("start_date"), arguments.get("end_date")
+        # One range entry per ticker and any other option (e.g. interval)
+        range_key = (key[0], _freeze({k: v for k, v in arguments.items() if k not in ("start_date", "end_date")}))
+
+        entry = self._lookup(range_key)
+        if entry is not None and _covers(entry, start_date, end_date):
+            exact = entry.start_date == start_date and entry.end_date == end_date
+            value = entry.value if exact else [price for price in entry.value if start_date <= _day(price) <= end_date]
+            return value, "hit" if exact else "subset_hit"
+
+        (value, source), coalesced = self._single_flight(
+            key, lambda: self._load_or_fetch_prices(key, range_key, arguments, fetch)
+        )
+        if not coalesced:
+            self._store_price_range(range_key, value, start_date, end_date)
+        return value, "coalesced" if coalesced else source
+
+    def _load_or_fetch(self, key: Hashable, arguments: Dict[str, Any], fetch: Callable) -> Tuple[Any, str]:
+        """Read through the persistent store. Returns (value, "disk_hit" or "miss")."""
+        if self.store is None:
+            return fetch(), "miss"
+
+        stored = self._store_call(self.store.get, repr(key))
+        if stored is not MISSING:
+            return stored, "disk_hit"
+
+        value = fetch()
+        self._store_call(
+            self.store.put, repr(key), key[0], value, ticker=arguments.get("ticker"), end_date=_end_date_of(arguments)
+        )
+        return value, "miss"
+
+    def _load_or_fetch_prices(self, key: Hashable, range_key: Hashable, arguments: Dict[str, Any], fetch: Callable) -> Tuple[Any, str]:
+        """Like _load_or_fetch, but any stored range containing the request can serve it."""
+        start_date, end_date = arguments.get("start_date"), arguments.get("end_date")
+        if self.store is None or not start_date or not end_date:
+            return fetch(), "miss"
+
+        stored = self._store_call(self.store.get_covering_range, repr(range_key), start_date, end_date)
+        if stored is not MISSING:
+            prices, _, _ = stored
+            if prices is not MISSING:
+                return [price for price in prices if start_date <= _day(price) <= end_date], "disk_hit"
+
+        value = fetch()
+        self._store_call(
+            self.store.put, repr(key), key[0], value, ticker=arguments.get("ticker"),
+            end_date=end_date, start_date=start_date, range_key=repr(range_key),
+        )
+        return value, "miss"
+
+    def _store_call(self, method: Callable, *args, **kwargs) -> Any:
+        """Call the persistent store; a broken cache file must never fail a data call."""
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Persistent data cache error: {e}")
+            return MISSING
+
+    def _single_flight(self, key: Hashable, fetch: Callable) -> Tuple[Any, bool]:
+        """Run fetch once per key at a time. Returns (value, waited_on_another_caller)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fetch()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _lookup(self, key: Hashable) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: Hashable, value: Any, end_date: Optional[str], start_date: Optional[str] = None) -> None:
+        if value is None:
+            return
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        # Empty results are likely transient (provider error, missing api_key), so they expire like volatile ones
+        expires_at = time.monotonic() + self.volatile_ttl if _is_volatile(end_date) or not value else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(value, size, expires_at, start_date, end_date)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+                DATA_CACHE_EVICTIONS.inc()
+            DATA_CACHE_BYTES.set(self._bytes)
+
+    def _store_price_range(self, range_key: Hashable, prices: List[Any], start_date: str, end_date: str) -> None:
+        """Cache a fetched range, merging it with an overlapping cached range of the same ticker."""
+        if prices is None or not start_date or not end_date:
+            return
+        with self._lock:
+            existing = self._entries.get(range_key)
+        if existing is not None and existing.start_date <= end_date and start_date <= existing.end_date:
+            merged = {_day_key(price): price for price in existing.value}
+            merged.update({_day_key(price): price for price in prices})
+            prices = [merged[k] for k in sorted(merged)]
+            start_date, end_date = min(start_date, existing.start_date), max(end_date, existing.end_date)
+        self._store(range_key, list(prices), end_date, start_date)
+
+    def _remove(self, key: Hashable) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _count(self, result: str) -> None:
+        with self._lock:
+            self._stats[result] += 1
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable form of call arguments (raises TypeError for unhashable values)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+def _copy(value: Any) -> Any:
+    # Callers may append to or sort the list they get back; the cached one must not change
+    return list(value) if isinstance(value, list) else value
+
+
+def _covers(entry: _Entry, start_date: Optional[str], end_date: Optional[str]) -> bool:
+    if not (entry.start_date and entry.end_date and start_date and end_date):
+        return False
+    return entry.start_date <= start_date and end_date <= entry.end_date
+
+
+def _day(price: Any) -> str:
+    return _day_key(price)[:10]
+
+
+def _day_key(price: Any) -> str:
+    value = price.get("time") if isinstance(price, dict) else getattr(price, "time", None)
+    return str(value or "")
+
+
+def _end_date_of(arguments: Dict[str, Any]) -> Optional[str]:
+    return arguments.get("end_date")
+
+
+def _is_volatile(end_date: Optional[str]) -> bool:
+    """Results up to today (or undated) may still gain data, so they only live for the TTL."""
+    if not end_date:
+        return True
+    return str(end_date)[:10] >= date.today().isoformat()
+
+
+def _estimate_size(value: Any, depth: int = 0) -> int:
+    """Approximate deep size in bytes (models are measured through their attribute dicts)."""
+    size = sys.getsizeof(value)
+    if depth > 4:
+        return size
+    if isinstance(value, dict):
+        return size + sum(_estimate_size(k, depth + 1) + _estimate_size(v, depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return size + sum(_estimate_size(v, depth + 1) for v in value)
+    attributes = getattr(value, "__dict__", None)
+    if attributes:
+        return size + _estimate_size(attributes, depth + 1)
+    return size
+
+
+# Global instance
+shared_data_cache = SharedDataCache(store=persistent_data_cache)
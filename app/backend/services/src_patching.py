@@ -0,0 +1,24 @@
+import sys
+from typing import Any, Callable
+
+
+def rebind_src_references(module: Any, name: str, replacement: Callable) -> None:
+    """Point `from <module> import <name>` bindings in loaded src modules at replacement.
+
+    Such modules keep their own reference to whatever the attribute was when they were
+    imported. A reference is stale when replacement wraps it (directly or through the
+    `__wrapped__` chain of earlier wrappers), so installers can run in any order and
+    repeatedly.
+    """
+    stale = []
+    wrapped = getattr(replacement, "__wrapped__", None)
+    while wrapped is not None:
+        stale.append(wrapped)
+        wrapped = getattr(wrapped, "__wrapped__", None)
+
+    for module_name, loaded in list(sys.modules.items()):
+        if loaded is None or loaded is module or not module_name.startswith("src."):
+            continue
+        current = getattr(loaded, name, None)
+        if any(current is reference for reference in stale):
+            setattr(loaded, name, replacement)